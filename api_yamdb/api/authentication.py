@@ -0,0 +1,119 @@
+import threading
+import time
+
+from collections import OrderedDict
+
+from django.conf import settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+
+from .metrics import cache_lookup
+from .routers import pin_primary
+
+USER_CACHE_SIZE = getattr(settings, 'AUTH_USER_CACHE_SIZE', 10000)
+USER_CACHE_TTL = getattr(settings, 'AUTH_USER_CACHE_TTL', 30)
+
+
+class UserCache:
+    """
+    Ограниченный LRU-кэш пользователей в памяти процесса. Хранятся значения
+    полей, а не сам объект: каждый запрос получает собственный экземпляр.
+    """
+
+    def __init__(self, maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, model):
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+            hit = entry is not None and entry[0] >= now
+            if hit:
+                self.entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.entries.pop(key, None)
+                self.misses += 1
+        cache_lookup('user', hit)
+        if not hit:
+            return None
+        _, db, values = entry
+        return model.from_db(
+            db, [field.attname for field in model._meta.concrete_fields],
+            values,
+        )
+
+    def set(self, key, user):
+        values = [
+            getattr(user, field.attname)
+            for field in user._meta.concrete_fields
+        ]
+        with self.lock:
+            self.entries[key] = (
+                time.monotonic() + self.ttl, user._state.db, values
+            )
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        """Удаляет все записи пользователя, по какому бы токену их ни взяли."""
+        with self.lock:
+            for key in [key for key in self.entries if key[0] == user_id]:
+                del self.entries[key]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self.lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self.entries),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+            }
+
+
+user_cache = UserCache()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT-аутентификация без запроса к базе на каждый вызов: пользователь
+    берётся из `user_cache` по паре (id пользователя, jti токена).
+    Сохранение и удаление пользователя сбрасывают его записи в текущем
+    процессе, в остальных процессах они живут не дольше TTL.
+    """
+
+    def get_user(self, validated_token):
+        key = (
+            validated_token.get(api_settings.USER_ID_CLAIM),
+            validated_token.get(api_settings.JTI_CLAIM),
+        )
+        if key[0] is None:
+            return super().get_user(validated_token)
+        user = user_cache.get(key, self.user_model)
+        if user is None:
+            user = self.load_user(validated_token)
+            user_cache.set(key, user)
+        return user
+
+    def load_user(self, validated_token):
+        try:
+            return super().get_user(validated_token)
+        except AuthenticationFailed as e:
+            if e.detail.get('code') != 'user_not_found':
+                raise
+        # Только что созданный пользователь мог ещё не дойти до реплики.
+        with pin_primary():
+            return super().get_user(validated_token)
@@ -0,0 +1,273 @@
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import AutoField
+from django.utils.encoding import smart_str
+from rest_framework import serializers, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.relations import ManyRelatedField
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.validators import UniqueValidator
+
+from .cache import bump_versions
+from .serializers import PreloadedSlugRelatedField
+
+BULK_MAX_ITEMS = getattr(settings, 'API_BULK_MAX_ITEMS', 10000)
+BULK_BATCH_SIZE = getattr(settings, 'API_BULK_BATCH_SIZE', 1000)
+
+NOT_FOUND_ERROR = 'Объект не найден.'
+DUPLICATE_ERROR = 'Значение повторяется в запросе.'
+
+
+def get_relation(field):
+    if isinstance(field, ManyRelatedField):
+        return field.child_relation
+    return field
+
+
+def get_item_values(items, field):
+    """Все значения поля из элементов массива, приведённые к строкам."""
+    values = set()
+    for item in items:
+        if not isinstance(item, dict) or item.get(field) is None:
+            continue
+        value = item[field]
+        if isinstance(value, list):
+            values.update(smart_str(element) for element in value)
+        elif not isinstance(value, dict):
+            values.add(smart_str(value))
+    return values
+
+
+def bulk_create(model, objects, using):
+    """
+    bulk_create в Django 2.2 не ограничивает явный batch_size лимитами
+    бэкенда (на SQLite — числом параметров запроса), поэтому пачка
+    урезается здесь.
+    """
+    fields = [
+        field for field in model._meta.concrete_fields
+        if not isinstance(field, AutoField)
+    ]
+    batch_size = min(
+        BULK_BATCH_SIZE,
+        connections[using].ops.bulk_batch_size(fields, objects),
+    )
+    model._default_manager.db_manager(using).bulk_create(
+        objects, batch_size=max(batch_size, 1)
+    )
+
+
+class BulkMixin:
+    """
+    Действие `bulk`: POST создаёт, PATCH частично обновляет объекты из
+    JSON-массива (объект ищется по `bulk_lookup_field`). Массив проверяется
+    за один проход: связи по slug и уникальные поля проверяются одним
+    запросом на поле, а запись идёт пачками в одной транзакции. В ответе —
+    значения `bulk_lookup_field` в порядке массива. Если хотя бы один
+    элемент с ошибкой, ничего не записывается, а ответ содержит ошибки
+    по позициям массива.
+    """
+    bulk_lookup_field = 'id'
+    bulk_resource = None
+
+    @action(detail=False, methods=('post', 'patch'), url_path='bulk')
+    def bulk(self, request):
+        items = request.data
+        if not isinstance(items, list) or not items:
+            raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [
+                'Ожидается непустой список объектов.'
+            ]})
+        if len(items) > BULK_MAX_ITEMS:
+            raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [
+                f'За один запрос можно передать не больше '
+                f'{BULK_MAX_ITEMS} объектов.'
+            ]})
+        partial = request.method == 'PATCH'
+        serializer = self.get_bulk_serializer(items, partial)
+        instances = self.get_bulk_instances(items) if partial else None
+        validated, errors = self.validate_bulk(serializer, items, instances)
+        if any(errors):
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic(using=self.queryset.db):
+            if partial:
+                objects = self.perform_bulk_update(validated)
+            else:
+                objects = self.perform_bulk_create(validated)
+            self.perform_bulk_saved(objects, created=not partial)
+        bump_versions(self.bulk_resource)
+        lookup = self.bulk_lookup_field
+        return Response(
+            [{lookup: getattr(obj, lookup)} for obj in objects],
+            status=status.HTTP_200_OK if partial else status.HTTP_201_CREATED,
+        )
+
+    def get_bulk_serializer(self, items, partial):
+        """
+        Один сериализатор на весь массив. Проверки UniqueValidator снимаются
+        с полей: уникальность проверяет `validate_bulk` сразу для всех.
+        """
+        serializer = self.get_serializer(partial=partial)
+        self.unique_messages = {}
+        for name, field in serializer.fields.items():
+            validators = []
+            for validator in field.validators:
+                if isinstance(validator, UniqueValidator):
+                    self.unique_messages[name] = validator.message
+                else:
+                    validators.append(validator)
+            field.validators = validators
+        serializer.context['preloaded'] = self.preload_relations(
+            serializer, items
+        )
+        return serializer
+
+    def preload_relations(self, serializer, items):
+        preloaded = {}
+        for name, field in serializer.fields.items():
+            relation = get_relation(field)
+            if field.read_only or not isinstance(
+                relation, PreloadedSlugRelatedField
+            ):
+                continue
+            slug_field = relation.slug_field
+            queryset = relation.get_queryset().filter(**{
+                f'{slug_field}__in': get_item_values(items, name)
+            })
+            preloaded[(queryset.model, slug_field)] = {
+                smart_str(getattr(obj, slug_field)): obj for obj in queryset
+            }
+        return preloaded
+
+    def get_bulk_instances(self, items):
+        lookup = self.bulk_lookup_field
+        values = get_item_values(items, lookup)
+        return {
+            smart_str(getattr(obj, lookup)): obj
+            for obj in self.queryset.filter(**{f'{lookup}__in': values})
+        }
+
+    def validate_bulk(self, serializer, items, instances):
+        validated = []
+        errors = []
+        for item in items:
+            item_errors = {}
+            instance = None
+            if instances is not None:
+                key = item.get(self.bulk_lookup_field) if isinstance(
+                    item, dict
+                ) else None
+                instance = instances.get(smart_str(key))
+                if instance is None:
+                    item_errors[self.bulk_lookup_field] = [NOT_FOUND_ERROR]
+            try:
+                data = serializer.run_validation(item)
+            except ValidationError as e:
+                item_errors.update(serializers.as_serializer_error(e))
+                data = None
+            if instance is not None and data is not None:
+                data.pop(self.bulk_lookup_field, None)
+            validated.append((instance, data))
+            errors.append(item_errors)
+        self.validate_bulk_unique(validated, errors)
+        return validated, errors
+
+    def validate_bulk_unique(self, validated, errors):
+        model = self.queryset.model
+        for name, message in self.unique_messages.items():
+            positions = {}
+            for index, (instance, data) in enumerate(validated):
+                if data is None or name not in data:
+                    continue
+                value = data[name]
+                if value in positions:
+                    errors[index].setdefault(name, []).append(DUPLICATE_ERROR)
+                positions.setdefault(value, []).append(index)
+            existing = dict(model._default_manager.filter(**{
+                f'{name}__in': list(positions)
+            }).values_list(name, 'pk'))
+            for value, pk in existing.items():
+                for index in positions[value]:
+                    instance = validated[index][0]
+                    if instance is None or instance.pk != pk:
+                        errors[index].setdefault(name, []).append(message)
+
+    def get_many_to_many(self, data):
+        model = self.queryset.model
+        return {
+            field.name: data.pop(field.name)
+            for field in model._meta.many_to_many
+            if field.name in data
+        }
+
+    def perform_bulk_create(self, validated):
+        model = self.queryset.model
+        objects = []
+        relations = []
+        for _, data in validated:
+            data = dict(data)
+            relations.append(self.get_many_to_many(data))
+            objects.append(model(**data))
+        features = connections[self.queryset.db].features
+        needs_ids = any(relations) or self.bulk_lookup_field in ('id', 'pk')
+        if features.can_return_ids_from_bulk_insert or not needs_ids:
+            bulk_create(model, objects, self.queryset.db)
+        else:
+            # Без RETURNING не узнать id созданных строк, а они нужны
+            # для связей many-to-many и ответа.
+            for obj in objects:
+                obj.save(force_insert=True)
+        self.write_many_to_many(objects, relations)
+        return objects
+
+    def perform_bulk_update(self, validated):
+        model = self.queryset.model
+        objects = []
+        relations = []
+        fields = set()
+        for instance, data in validated:
+            data = dict(data)
+            relations.append(self.get_many_to_many(data))
+            for name, value in data.items():
+                setattr(instance, name, value)
+                fields.add(name)
+            objects.append(instance)
+        if fields:
+            model._default_manager.bulk_update(
+                objects, fields, batch_size=BULK_BATCH_SIZE
+            )
+        self.write_many_to_many(objects, relations, replace=True)
+        return objects
+
+    def perform_bulk_saved(self, objects, created):
+        """
+        Вызывается в той же транзакции после записи. Массовая запись идёт
+        мимо сигналов моделей, поэтому зависящие от них данные обновляются
+        здесь.
+        """
+
+    def write_many_to_many(self, objects, relations, replace=False):
+        """Пишет промежуточные таблицы пачками, а не по строке на связь."""
+        model = self.queryset.model
+        for field in model._meta.many_to_many:
+            changed = [
+                (obj, related[field.name])
+                for obj, related in zip(objects, relations)
+                if field.name in related
+            ]
+            if not changed:
+                continue
+            through = field.remote_field.through
+            source = field.m2m_field_name()
+            target = field.m2m_reverse_field_name()
+            if replace:
+                through._default_manager.filter(**{
+                    f'{source}__in': [obj.pk for obj, _ in changed]
+                }).delete()
+            bulk_create(through, [
+                through(**{source: obj, target: related})
+                for obj, values in changed
+                for related in dict.fromkeys(values)
+            ], self.queryset.db)
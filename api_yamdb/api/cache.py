@@ -0,0 +1,149 @@
+import hashlib
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.http import urlencode
+from rest_framework.response import Response
+
+from .metrics import cache_lookup
+from .routers import pin_primary
+
+CACHE_TIMEOUT = getattr(settings, 'API_CACHE_TIMEOUT', 60)
+LOCK_TIMEOUT = getattr(settings, 'API_CACHE_LOCK_TIMEOUT', 5)
+LOCK_POLL_INTERVAL = 0.05
+PROCESS_LOCAL_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def is_shared_cache():
+    """
+    Виден ли кэш по умолчанию всем процессам: на нём держатся версии
+    ответов, счётчики ограничения частоты и привязка к основной базе.
+    """
+    return settings.CACHES['default']['BACKEND'] not in PROCESS_LOCAL_BACKENDS
+
+
+def version_key(resource):
+    return f'api:version:{resource}'
+
+
+def get_versions(resources):
+    """
+    Версия ресурса — случайный токен, а не счётчик: если ключ версии
+    вытеснят из кэша, новая версия не совпадёт ни с одной из старых.
+    """
+    keys = [version_key(resource) for resource in resources]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, uuid.uuid4().hex, None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_versions(*resources):
+    """Инвалидирует все закэшированные ответы ресурсов без перебора ключей."""
+    cache.set_many(
+        {version_key(resource): uuid.uuid4().hex for resource in resources},
+        None
+    )
+
+
+def response_key(resources, request):
+    """
+    Ключ включает схему и хост: ссылки `next` и `previous` в ответе
+    абсолютные, и ответ для одного Host нельзя отдавать другому.
+    """
+    query = urlencode(sorted(request.query_params.lists()), doseq=True)
+    url = f'{request.scheme}://{request.get_host()}{request.path}?{query}'
+    digest = hashlib.md5(url.encode()).hexdigest()
+    version = hashlib.md5(
+        ':'.join(map(str, get_versions(resources))).encode()
+    ).hexdigest()
+    return f'api:response:{version}:{digest}'
+
+
+def get_or_compute(key, compute, timeout=CACHE_TIMEOUT,
+                   lock_timeout=LOCK_TIMEOUT):
+    """
+    Возвращает значение из кэша, а при промахе вычисляет его в одном
+    месте: остальные запросы ждут готовое значение, а не идут в базу.
+    `compute` может вернуть `None`, тогда значение не кэшируется.
+    """
+    value = cache.get(key)
+    if value is not None:
+        cache_lookup('response', True)
+        return value
+    cache_lookup('response', False)
+    lock = f'{key}:lock'
+    if cache.add(lock, 1, lock_timeout):
+        try:
+            value = compute()
+            if value is not None:
+                cache.set(key, value, timeout)
+        finally:
+            cache.delete(lock)
+        return value
+    deadline = time.monotonic() + lock_timeout
+    while time.monotonic() < deadline:
+        time.sleep(LOCK_POLL_INTERVAL)
+        value = cache.get(key)
+        if value is not None:
+            return value
+        if lock not in cache:
+            # Значение не закэшировали, ждать больше нечего.
+            break
+    return compute()
+
+
+class CachedResponseMixin:
+    """
+    Кэширует ответы анонимным пользователям на чтение. Ключ включает версии
+    всех ресурсов из `cache_resources`, от которых зависит ответ.
+    """
+    cache_resources = ()
+
+    def get_cache_resources(self):
+        return self.cache_resources
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        resources = self.get_cache_resources()
+        if (request.user.is_authenticated or not resources
+                or not CACHE_TIMEOUT):
+            return handler(request, *args, **kwargs)
+        response = None
+
+        def compute():
+            nonlocal response
+            # Общий для всех ответ не собирается с отстающей реплики:
+            # иначе он мог бы попасть в кэш под уже новой версией.
+            with pin_primary():
+                response = handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return None
+            return response.data
+
+        data = get_or_compute(
+            response_key(resources, request), compute
+        )
+        if response is not None:
+            return response
+        return Response(data)
+
+
+class CachedListMixin(CachedResponseMixin):
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+
+class CachedRetrieveMixin(CachedResponseMixin):
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
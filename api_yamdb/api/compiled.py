@@ -0,0 +1,223 @@
+import json
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models.constants import LOOKUP_SEP
+from rest_framework import relations, serializers
+from rest_framework.response import Response
+
+from .timing import timed
+
+# Для этих to_representation результат совпадает со встроенным приведением,
+# а вызов функции на строке не нужен.
+FAST_CONVERTERS = {
+    serializers.IntegerField.to_representation: int,
+    serializers.CharField.to_representation: str,
+    serializers.FloatField.to_representation: float,
+}
+
+UNSUPPORTED_FIELDS = (
+    relations.RelatedField, relations.ManyRelatedField,
+    serializers.SerializerMethodField,
+)
+
+VALUE, NESTED, MANY = range(3)
+
+_compiled_serializers = {}
+
+
+def get_values(queryset, lookups):
+    """
+    Queryset строк `.values()`; связи грузятся через JOIN. Аннотации
+    остаются в строке: по ним может идти сортировка курсора.
+    """
+    return queryset.prefetch_related(None).values(
+        *lookups, *queryset.query.annotations, *queryset.query.extra
+    )
+
+
+def get_converter(field):
+    return FAST_CONVERTERS.get(
+        type(field).to_representation, field.to_representation
+    )
+
+
+def get_reverse_lookup(model_field):
+    """Имя, по которому связанная модель фильтруется по родителю."""
+    if model_field.auto_created:
+        return model_field.field.name
+    return model_field.related_query_name()
+
+
+class CompiledSerializer:
+    """
+    Сериализатор только для чтения, собранный из объявленных полей
+    обычного сериализатора: каждое поле превращается в ключ строки
+    `.values()` и функцию приведения. Вложенный сериализатор читается из
+    той же строки через JOIN, вложенный список — одним запросом на
+    страницу. Результат совпадает с `serializer.data`.
+    """
+
+    def __init__(self, serializer, prefix='', nested=False):
+        self.model = serializer.Meta.model
+        self.pk_lookup = prefix + self.model._meta.pk.name
+        self.lookups = [] if nested else [self.pk_lookup]
+        self.fields = []
+        for field in serializer._readable_fields:
+            if field.source == '*' or not field.source_attrs:
+                raise ImproperlyConfigured(
+                    f'Cannot compile {type(serializer).__name__}.'
+                    f'{field.field_name}: it reads the whole object.'
+                )
+            lookup = prefix + LOOKUP_SEP.join(field.source_attrs)
+            if isinstance(field, serializers.ListSerializer):
+                if nested:
+                    raise ImproperlyConfigured(
+                        f'Cannot compile {type(serializer).__name__}.'
+                        f'{field.field_name}: nested lists are supported '
+                        f'only at the top level.'
+                    )
+                self.add_many(field, lookup)
+            elif isinstance(field, serializers.BaseSerializer):
+                self.add_nested(field, lookup)
+            elif isinstance(field, relations.PrimaryKeyRelatedField):
+                self.add_value(field, lookup, field.pk_field and (
+                    field.pk_field.to_representation
+                ))
+            elif isinstance(field, relations.SlugRelatedField):
+                self.add_value(field, lookup + LOOKUP_SEP + (
+                    field.slug_field.replace('.', LOOKUP_SEP)
+                ))
+            elif not isinstance(field, UNSUPPORTED_FIELDS):
+                self.add_value(field, lookup, get_converter(field))
+            else:
+                raise ImproperlyConfigured(
+                    f'Cannot compile {type(serializer).__name__}.'
+                    f'{field.field_name}: unsupported field type.'
+                )
+
+    def add_value(self, field, lookup, converter=None):
+        self.lookups.append(lookup)
+        self.fields.append((field.field_name, VALUE, lookup, converter))
+
+    def add_nested(self, field, lookup):
+        # По ключу внешнего ключа видно, есть ли связанный объект вообще.
+        compiled = CompiledSerializer(
+            field, prefix=lookup + LOOKUP_SEP, nested=True
+        )
+        self.lookups.append(lookup)
+        self.lookups.extend(compiled.lookups)
+        self.fields.append((field.field_name, NESTED, lookup, compiled))
+
+    def add_many(self, field, lookup):
+        model_field = self.model._meta.get_field(field.source)
+        compiled = CompiledSerializer(field.child)
+        self.fields.append((field.field_name, MANY, lookup, (
+            model_field.related_model, get_reverse_lookup(model_field),
+            compiled,
+        )))
+
+    def values(self, queryset):
+        return get_values(queryset, self.lookups)
+
+    def represent(self, rows):
+        rows = list(rows)
+        related = {}
+        for name, kind, _, data in self.fields:
+            if kind == MANY:
+                related[name] = self.load_many(data, rows)
+        return [self.to_representation(row, related) for row in rows]
+
+    def load_many(self, data, rows):
+        model, reverse_lookup, compiled = data
+        pks = [row[self.pk_lookup] for row in rows]
+        groups = {pk: [] for pk in pks}
+        if not pks:
+            return groups
+        related_rows = model._default_manager.filter(**{
+            f'{reverse_lookup}__in': pks
+        }).values(reverse_lookup, *compiled.lookups)
+        for row in related_rows:
+            groups[row[reverse_lookup]].append(compiled.to_representation(row))
+        return groups
+
+    def to_representation(self, row, related=None):
+        ret = {}
+        for name, kind, lookup, data in self.fields:
+            if kind == MANY:
+                ret[name] = related[name][row[self.pk_lookup]]
+                continue
+            value = row[lookup]
+            if value is None:
+                ret[name] = None
+            elif kind == NESTED:
+                ret[name] = data.to_representation(row)
+            elif data is None:
+                ret[name] = value
+            else:
+                ret[name] = data(value)
+        return ret
+
+
+class CompiledTitleListing:
+    """
+    Строки `TitleListing` в формате `TitleGETSerializer`: категория и
+    жанры уже лежат в строке, поэтому страница читается одним запросом.
+    """
+    lookups = (
+        'title', 'name', 'year', 'rating', 'description', 'genres',
+        'category_id', 'category_name', 'category_slug',
+    )
+
+    def values(self, queryset):
+        return get_values(queryset, self.lookups)
+
+    def represent(self, rows):
+        return [self.to_representation(row) for row in rows]
+
+    def to_representation(self, row):
+        rating = row['rating']
+        return {
+            'id': row['title'],
+            'name': row['name'],
+            'year': row['year'],
+            'rating': None if rating is None else int(rating),
+            'description': row['description'],
+            'genre': json.loads(row['genres']),
+            'category': None if row['category_id'] is None else {
+                'name': row['category_name'],
+                'slug': row['category_slug'],
+            },
+        }
+
+
+def compile_serializer(serializer_class):
+    if serializer_class not in _compiled_serializers:
+        _compiled_serializers[serializer_class] = CompiledSerializer(
+            serializer_class()
+        )
+    return _compiled_serializers[serializer_class]
+
+
+class CompiledListMixin:
+    """
+    Список без экземпляров моделей и полей DRF: страница читается через
+    `.values()` и превращается в словари скомпилированным сериализатором
+    действия. Проверка и запись по-прежнему идут через обычные
+    сериализаторы.
+    """
+
+    def get_list_compiler(self):
+        return compile_serializer(self.get_serializer_class())
+
+    def list(self, request, *args, **kwargs):
+        compiled = self.get_list_compiler()
+        queryset = compiled.values(
+            self.filter_queryset(self.get_queryset())
+        )
+        page = self.paginate_queryset(queryset)
+        rows = queryset if page is None else page
+        with timed('serialize'):
+            data = compiled.represent(rows)
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
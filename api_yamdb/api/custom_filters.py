@@ -1,13 +1,37 @@
 from django_filters import rest_framework as filters
+from rest_framework.filters import SearchFilter
 
-from reviews.models import Title
+from reviews.models import GenreTitle, TitleListing
+from reviews.search import search_titles
 
 
 class CategoryFilter(filters.FilterSet):
-    genre = filters.CharFilter(field_name='genre__slug',)
-    category = filters.CharFilter(field_name='category__slug',)
-    name = filters.CharFilter(field_name='name', lookup_expr='contains')
+    """
+    Фильтры списка произведений по `TitleListing`: категория читается из
+    самой строки списка, жанр — по индексу связей без JOIN в выборке.
+    """
+    genre = filters.CharFilter(method='filter_genre')
+    category = filters.CharFilter(field_name='category_slug',)
+    name = filters.CharFilter(field_name='name', lookup_expr='icontains')
 
     class Meta:
-        model = Title
+        model = TitleListing
         fields = ('year',)
+
+    def filter_genre(self, queryset, name, value):
+        return queryset.filter(title__in=GenreTitle.objects.filter(
+            genre_id__slug=value
+        ).values('title_id'))
+
+
+class TitleSearchFilter(SearchFilter):
+    """
+    Полнотекстовый поиск по названию и описанию произведения через индекс;
+    результаты упорядочены по релевантности.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '')
+        if not query.strip():
+            return queryset
+        return search_titles(queryset, query).order_by('-search_rank', 'pk')
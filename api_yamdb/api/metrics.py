@@ -0,0 +1,127 @@
+"""
+Метрики Prometheus: запросы и задержки по маршрутам, SQL-запросы,
+попадания в кэши и процессы, обслуживающие запросы. Если задана
+переменная окружения `PROMETHEUS_MULTIPROC_DIR`, каждый процесс пишет
+значения в свои файлы в этом каталоге, а `/metrics` складывает их, так
+что любой воркер gunicorn отдаёт метрики всех воркеров.
+"""
+import os
+import time
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.utils.crypto import constant_time_compare
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge,
+    Histogram, generate_latest, multiprocess,
+)
+
+UNMATCHED_ROUTE = 'unmatched'
+METHODS = frozenset((
+    'GET', 'HEAD', 'OPTIONS', 'POST', 'PUT', 'PATCH', 'DELETE',
+))
+
+REQUESTS = Counter(
+    'yamdb_http_requests_total',
+    'HTTP requests by route, method and status.',
+    ('route', 'method', 'status'),
+)
+REQUEST_DURATION = Histogram(
+    'yamdb_http_request_duration_seconds',
+    'HTTP request latency by route.',
+    ('route', 'method'),
+)
+DB_QUERIES = Histogram(
+    'yamdb_db_queries_per_request',
+    'SQL queries made by one request.',
+    ('route',),
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 250, 1000),
+)
+DB_DURATION = Histogram(
+    'yamdb_db_duration_seconds',
+    'Time one request spent in SQL queries.',
+    ('route',),
+)
+CACHE_LOOKUPS = Counter(
+    'yamdb_cache_lookups_total',
+    'Cache lookups by cache and result.',
+    ('cache', 'result'),
+)
+# Датчики процессов в многопроцессном режиме не складываются, а
+# получают метку `pid`: так видно каждого воркера и нагрузку на него.
+WORKER_STARTED = Gauge(
+    'yamdb_worker_start_time_seconds',
+    'Time the process served its first request.',
+    multiprocess_mode='liveall',
+)
+WORKER_REQUESTS = Gauge(
+    'yamdb_worker_requests',
+    'Requests served by the process.',
+    multiprocess_mode='liveall',
+)
+
+_cache_results = {}
+
+
+def cache_lookup(cache, hit):
+    """Учитывает обращение к кэшу `cache`: попадание или промах."""
+    key = (cache, hit)
+    child = _cache_results.get(key)
+    if child is None:
+        child = _cache_results[key] = CACHE_LOOKUPS.labels(
+            cache, 'hit' if hit else 'miss'
+        )
+    child.inc()
+
+
+def get_route(request):
+    """Имя маршрута вместо пути: id в путях не плодят ряды метрик."""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return UNMATCHED_ROUTE
+    return match.view_name
+
+
+def get_method(request):
+    """Нестандартные методы сводятся в один ряд `other`."""
+    return request.method if request.method in METHODS else 'other'
+
+
+def mark_worker():
+    """
+    Отмечает процесс на первом запросе, а не при импорте: с `--preload`
+    модуль импортирует ещё мастер gunicorn.
+    """
+    WORKER_STARTED.set(time.time())
+
+
+def mark_process_dead(pid):
+    """Для хука `child_exit` gunicorn: убирает датчики вышедшего воркера."""
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        multiprocess.mark_process_dead(pid)
+
+
+def get_registry():
+    if 'PROMETHEUS_MULTIPROC_DIR' not in os.environ:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def metrics_view(request):
+    """
+    Метрики в текстовом формате Prometheus. Доступны, только если
+    включён `METRICS`; с `METRICS_TOKEN` нужен заголовок
+    `Authorization: Bearer <токен>`.
+    """
+    if not getattr(settings, 'METRICS', False):
+        raise Http404
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if token and not constant_time_compare(
+        request.META.get('HTTP_AUTHORIZATION', ''), f'Bearer {token}'
+    ):
+        return HttpResponse(status=401)
+    return HttpResponse(
+        generate_latest(get_registry()), content_type=CONTENT_TYPE_LATEST
+    )
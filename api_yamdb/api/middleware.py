@@ -0,0 +1,152 @@
+import hashlib
+import logging
+import os
+import time
+
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured, MiddlewareNotUsed
+from django.db import connections
+from rest_framework.permissions import SAFE_METHODS
+
+from .cache import is_shared_cache
+from .metrics import (
+    DB_DURATION, DB_QUERIES, REQUEST_DURATION, REQUESTS, WORKER_REQUESTS,
+    get_method, get_route, mark_worker,
+)
+from .routers import get_replicas, use_replicas
+from .timing import RequestTimings, collect
+
+slow_requests = logging.getLogger('api.slow_requests')
+
+STICKY_SECONDS = getattr(settings, 'REPLICA_STICKY_SECONDS', 5)
+ROUTED_PATHS = tuple(getattr(settings, 'REPLICA_ROUTED_PATHS', ('/api/',)))
+
+
+def sticky_key(request):
+    """
+    Ключ клиента для привязки к основной базе — хэш заголовка
+    Authorization. Анонимные запросы не привязываются.
+    """
+    authorization = request.META.get('HTTP_AUTHORIZATION')
+    if not authorization:
+        return None
+    digest = hashlib.sha1(authorization.encode()).hexdigest()
+    return f'api:sticky:{digest}'
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Безопасные запросы к путям из `REPLICA_ROUTED_PATHS` читают с реплик.
+    После небезопасного запроса клиент на `REPLICA_STICKY_SECONDS` секунд
+    привязывается к основной базе, чтобы видеть собственные изменения,
+    пока они не дошли до реплик. Метка хранится в кэше по умолчанию, и
+    следующий запрос клиента может попасть в любой процесс, поэтому с
+    репликами нужен общий для процессов кэш.
+    """
+
+    def __init__(self, get_response):
+        if get_replicas() and not is_shared_cache():
+            raise ImproperlyConfigured(
+                'DATABASE_REPLICAS requires a cache shared between '
+                'processes, set CACHE_BACKEND'
+            )
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not get_replicas():
+            return self.get_response(request)
+        safe = request.method in SAFE_METHODS
+        key = sticky_key(request)
+        enabled = (
+            safe and request.path.startswith(ROUTED_PATHS)
+            and not (key and cache.get(key))
+        )
+        try:
+            with use_replicas(enabled):
+                return self.get_response(request)
+        finally:
+            if not safe and key and STICKY_SECONDS:
+                cache.set(key, 1, STICKY_SECONDS)
+
+
+class MetricsMiddleware:
+    """
+    Считает метрики Prometheus (`api.metrics`) для каждого запроса:
+    число, статус и задержку по имени маршрута, число и время
+    SQL-запросов. Без `METRICS` middleware отключается при загрузке.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'METRICS', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.pid = None
+
+    def __call__(self, request):
+        if self.pid != os.getpid():
+            self.pid = os.getpid()
+            mark_worker()
+        timings = RequestTimings(top_statements=0)
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timings))
+            response = self.get_response(request)
+        duration = time.perf_counter() - started
+        route = get_route(request)
+        method = get_method(request)
+        REQUESTS.labels(route, method, response.status_code).inc()
+        REQUEST_DURATION.labels(route, method).observe(duration)
+        DB_QUERIES.labels(route).observe(timings.queries)
+        DB_DURATION.labels(route).observe(timings.durations['db'])
+        WORKER_REQUESTS.inc()
+        return response
+
+
+class ServerTimingMiddleware:
+    """
+    Замеряет число и время SQL-запросов, разбор тела, проверку,
+    сериализацию и рендеринг запроса. Персоналу замеры отдаются в
+    заголовке `Server-Timing`, а запросы дольше `SLOW_REQUEST_MS` пишутся
+    в журнал `api.slow_requests` с самыми долгими SQL. Без `SERVER_TIMING`
+    middleware отключается при загрузке и ничего не стоит.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'SERVER_TIMING', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.slow_ms = getattr(settings, 'SLOW_REQUEST_MS', 500)
+        self.top_statements = getattr(settings, 'SLOW_REQUEST_STATEMENTS', 5)
+
+    def __call__(self, request):
+        timings = RequestTimings(self.top_statements)
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            stack.enter_context(collect(timings))
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timings))
+            response = self.get_response(request)
+        total = time.perf_counter() - started
+        # DRF кладёт в запрос Django пользователя, найденного по токену.
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_staff:
+            response['Server-Timing'] = timings.header(total)
+        if total * 1000 >= self.slow_ms:
+            self.log_slow_request(request, response, timings, total)
+        return response
+
+    def log_slow_request(self, request, response, timings, total):
+        lines = [
+            f'{request.method} {request.get_full_path()} '
+            f'{response.status_code} {total * 1000:.0f}ms: '
+            f'{timings.header(total)}'
+        ]
+        lines += [
+            f'    {duration * 1000:.1f}ms {sql}'
+            for duration, sql in timings.slowest()
+        ]
+        slow_requests.warning('\n'.join(lines))
@@ -1,4 +1,5 @@
-from rest_framework import mixins, viewsets
+from django.shortcuts import get_object_or_404
+from rest_framework import mixins, relations, serializers, viewsets
 
 
 class BaseViewSet(
@@ -12,3 +13,95 @@ class BaseViewSet(
     actions.
     """
     pass
+
+
+_eager_loading_plans = {}
+
+
+def get_eager_loading_plan(serializer_class):
+    """
+    Возвращает пары `(select_related, prefetch_related)` для связей,
+    которые выводит сериализатор. Поля `PrimaryKeyRelatedField` читают
+    только `*_id` и запросов не порождают, поэтому в план не попадают.
+    """
+    if serializer_class in _eager_loading_plans:
+        return _eager_loading_plans[serializer_class]
+    model = serializer_class.Meta.model
+    select_related, prefetch_related = [], []
+    for field in serializer_class().fields.values():
+        if field.write_only or field.source == '*':
+            continue
+        if isinstance(field, relations.ManyRelatedField):
+            child = field.child_relation
+        else:
+            child = field
+        if isinstance(child, relations.PrimaryKeyRelatedField):
+            continue
+        if not isinstance(child, (relations.RelatedField,
+                                  serializers.BaseSerializer)):
+            continue
+        model_field = model._meta.get_field(field.source)
+        if model_field.many_to_many or model_field.one_to_many:
+            prefetch_related.append(field.source)
+        else:
+            select_related.append(field.source)
+    _eager_loading_plans[serializer_class] = (
+        tuple(select_related), tuple(prefetch_related)
+    )
+    return _eager_loading_plans[serializer_class]
+
+
+class EagerLoadingMixin:
+    """
+    Подгружает связанные объекты, которые выводит сериализатор текущего
+    действия, чтобы число запросов не зависело от размера страницы.
+    """
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        select_related, prefetch_related = get_eager_loading_plan(
+            self.get_serializer_class()
+        )
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetch_related:
+            return queryset.prefetch_related(*prefetch_related)
+        return queryset
+
+
+class NestedViewSetMixin:
+    """
+    Вложенный маршрут без лишних запросов за родителем. `parent_lookups` —
+    пары (аргумент URL, поле родителя): родитель со всей цепочкой URL
+    находится одним запросом, а объекты фильтруются по тем же значениям
+    через `parent_field`. Для списка существование родителя проверяется,
+    только если страница оказалась пустой.
+    """
+    parent_queryset = None
+    parent_field = None
+    parent_lookups = ()
+
+    def get_parent_filter(self):
+        return {
+            lookup: self.kwargs.get(kwarg)
+            for kwarg, lookup in self.parent_lookups
+        }
+
+    def get_parent(self):
+        if not hasattr(self, '_parent'):
+            self._parent = get_object_or_404(
+                self.parent_queryset.all(), **self.get_parent_filter()
+            )
+        return self._parent
+
+    def get_queryset(self):
+        return super().get_queryset().filter(**{
+            f'{self.parent_field}__{lookup}': value
+            for lookup, value in self.get_parent_filter().items()
+        })
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if not page:
+            self.get_parent()
+        return page
@@ -0,0 +1,182 @@
+import json
+
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Курсорная пагинация по ключу сортировки и `id`.
+    Страница выбирается условием `WHERE (key, id) > (...)` и не требует
+    ни OFFSET, ни COUNT(*), поэтому её цена не зависит от глубины.
+    """
+    cursor_query_param = 'cursor'
+    page_size = api_settings.PAGE_SIZE
+    invalid_cursor_message = 'Неверный курсор.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(queryset, view)
+        self.model = queryset.model
+        position, self.reverse = self.decode_cursor(request)
+        if queryset._fields:
+            # Строки .values(): ключи сортировки нужны в строке для курсора.
+            queryset = queryset.values(*queryset._fields, *(
+                name for name, _ in self.ordering
+                if name not in queryset._fields
+            ))
+
+        ordering = self.ordering
+        if self.reverse:
+            ordering = [(name, not desc) for name, desc in ordering]
+        queryset = queryset.order_by(*(
+            f'-{name}' if desc else name for name, desc in ordering
+        ))
+        if position is not None:
+            queryset = queryset.filter(self.after(ordering, position))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if self.reverse:
+            results.reverse()
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_ordering(self, queryset, view):
+        """
+        Сортировка берётся из `cursor_ordering` вьюсета или из queryset;
+        `id` добавляется последним ключом, чтобы курсор был однозначным.
+        """
+        fields = getattr(view, 'cursor_ordering', None) or (
+            queryset.query.order_by or queryset.model._meta.ordering
+        )
+        ordering = []
+        for field in fields:
+            name = field.lstrip('-')
+            if name == 'pk':
+                name = queryset.model._meta.pk.name
+            ordering.append((name, field.startswith('-')))
+        pk_name = queryset.model._meta.pk.name
+        if pk_name not in (name for name, desc in ordering):
+            ordering.append((pk_name, False))
+        return ordering
+
+    def after(self, ordering, position):
+        """Условие «строго после позиции» для составного ключа."""
+        condition = Q()
+        equal = {}
+        for (name, desc), value in zip(ordering, position):
+            lookup = f'{name}__lt' if desc else f'{name}__gt'
+            condition |= Q(**equal, **{lookup: value})
+            equal[name] = value
+        return condition
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            cursor = json.loads(urlsafe_b64decode(encoded.encode()))
+            position, reverse = cursor['p'], bool(cursor['r'])
+            if len(position) != len(self.ordering):
+                raise ValueError
+            position = [
+                self.parse_position(name, value)
+                for (name, _), value in zip(self.ordering, position)
+            ]
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def parse_position(self, name, value):
+        """
+        Значение ключа из курсора в типе поля: подделанный курсор не
+        должен доходить до `filter()` и ронять запрос.
+        """
+        if value is None or isinstance(value, (dict, list)):
+            raise ValueError
+        try:
+            field = self.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise ValueError
+            return value
+        value = field.to_python(value)
+        field.run_validators(value)
+        return value
+
+    def get_position(self, obj, name):
+        try:
+            field = self.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            # Аннотация, например `search_rank` при полнотекстовом поиске.
+            return obj[name] if isinstance(obj, dict) else getattr(obj, name)
+        if isinstance(obj, dict):
+            obj = self.model(**{field.attname: obj[name]})
+        return field.value_to_string(obj)
+
+    def encode_cursor(self, obj, reverse):
+        position = [self.get_position(obj, name) for name, _ in self.ordering]
+        encoded = urlsafe_b64encode(
+            json.dumps({'p': position, 'r': int(reverse)}).encode()
+        ).decode()
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, encoded
+        )
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return replace_query_param(
+                self.base_url, self.cursor_query_param, ''
+            )
+        return self.encode_cursor(self.page[0], reverse=True)
+
+
+class PageNumberOrKeysetPagination(PageNumberPagination):
+    """
+    Постраничная пагинация по умолчанию; при наличии параметра `cursor`
+    (в том числе пустого, для первой страницы) — курсорная.
+    """
+    keyset_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.keyset_class.cursor_query_param in request.query_params:
+            self.keyset = self.keyset_class()
+            self.display_page_controls = False
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
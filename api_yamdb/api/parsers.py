@@ -0,0 +1,43 @@
+import codecs
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.utils import json
+
+from .renderers import FastJSONRenderer, get_json_backend, orjson
+from .timing import timed
+
+
+class FastJSONParser(JSONParser):
+    """
+    JSONParser, который разбирает тело в UTF-8 через orjson. Другие
+    кодировки, а также тела, которые orjson отверг (например, с целыми
+    больше 64 бит), разбираются стандартным `json` с прежними ошибками.
+    """
+    renderer_class = FastJSONRenderer
+    backend = get_json_backend()
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        with timed('parse'):
+            return self.parse_json(stream, media_type, parser_context)
+
+    def parse_json(self, stream, media_type, parser_context):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if self.backend != 'orjson' or codecs.lookup(
+            encoding
+        ).name != 'utf-8':
+            return super().parse(stream, media_type, parser_context)
+        data = stream.read()
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+        try:
+            parse_constant = json.strict_constant if self.strict else None
+            return json.loads(
+                data.decode(encoding), parse_constant=parse_constant
+            )
+        except ValueError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
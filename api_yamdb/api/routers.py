@@ -0,0 +1,57 @@
+import random
+import threading
+
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+_state = threading.local()
+
+
+def get_replicas():
+    return getattr(settings, 'DATABASE_REPLICAS', ())
+
+
+@contextmanager
+def use_replicas(enabled=True):
+    """Внутри блока чтения текущего потока идут на реплики."""
+    previous = getattr(_state, 'replicas', False)
+    _state.replicas = enabled
+    try:
+        yield
+    finally:
+        _state.replicas = previous
+
+
+def pin_primary():
+    """Внутри блока все запросы текущего потока идут на основную базу."""
+    return use_replicas(False)
+
+
+class ReplicaRouter:
+    """
+    Отправляет чтения на случайную реплику из `DATABASE_REPLICAS`, только
+    когда это разрешено блоком `use_replicas` (его открывает
+    `api.middleware.ReplicaRoutingMiddleware` для безопасных запросов к API).
+    Записи, команды и всё остальное работают с основной базой.
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = get_replicas()
+        if replicas and getattr(_state, 'replicas', False):
+            return random.choice(replicas)
+        return None
+
+    def db_for_write(self, model, **hints):
+        # Объект, прочитанный с реплики, сохраняется в основную базу.
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db in get_replicas():
+            return DEFAULT_DB_ALIAS
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, *get_replicas()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
@@ -1,8 +1,11 @@
 from django.contrib.auth import get_user_model
 from django.shortcuts import get_object_or_404
+from django.utils.encoding import smart_str
 from rest_framework import serializers
 
-from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
+from reviews.models import (
+    Category, Comment, Genre, GenreTitle, Review, Title, TitleScores,
+)
 from .tokens import default_token_generator
 
 User = get_user_model()
@@ -53,6 +56,27 @@ class TokenSerializer(serializers.Serializer):
         return validated_data
 
 
+class PreloadedSlugRelatedField(serializers.SlugRelatedField):
+    """
+    SlugRelatedField, который берёт объекты из `context['preloaded']`,
+    если их туда заранее загрузили одним запросом на всю пачку.
+    """
+
+    def to_internal_value(self, data):
+        preloaded = self.context.get('preloaded', {}).get(
+            (self.queryset.model, self.slug_field)
+        )
+        if preloaded is None:
+            return super().to_internal_value(data)
+        try:
+            return preloaded[smart_str(data)]
+        except KeyError:
+            self.fail(
+                'does_not_exist', slug_name=self.slug_field,
+                value=smart_str(data)
+            )
+
+
 class CategorySerializer(serializers.ModelSerializer):
 
     class Meta:
@@ -78,7 +102,7 @@ class TitleGETSerializer(serializers.ModelSerializer):
 
     category = CategorySerializer(read_only=True, required=False)
     genre = GenreSerializer(many=True, read_only=True, required=False)
-    rating = serializers.IntegerField(required=False)
+    rating = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Title
@@ -86,18 +110,34 @@ class TitleGETSerializer(serializers.ModelSerializer):
                   'category')
 
 
+class TitleScoresSerializer(serializers.ModelSerializer):
+    count = serializers.IntegerField(read_only=True)
+    mean = serializers.FloatField(read_only=True)
+    median = serializers.FloatField(read_only=True)
+    histogram = serializers.SerializerMethodField()
+
+    class Meta:
+        model = TitleScores
+        fields = ('title', 'count', 'mean', 'median', 'histogram')
+
+    def get_histogram(self, obj):
+        return {
+            str(score): number for score, number in obj.histogram.items()
+        }
+
+
 class TitleSerializer(serializers.ModelSerializer):
 
-    category = serializers.SlugRelatedField(
+    category = PreloadedSlugRelatedField(
         slug_field='slug',
         queryset=Category.objects.all(),
     )
-    genre = serializers.SlugRelatedField(
+    genre = PreloadedSlugRelatedField(
         many=True,
         queryset=Genre.objects.all(),
         slug_field='slug',
     )
-    rating = serializers.IntegerField(required=False)
+    rating = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Title
@@ -155,19 +195,6 @@ class ReviewSerializer(serializers.ModelSerializer):
             )
         return value
 
-    def validate(self, data):
-        if (
-            Review.objects.filter(
-                author=self.context.get('request').user,
-                title_id=self.context.get('view').kwargs.get('title_id')
-            ).exists()
-            and self.context.get('request').method == 'POST'
-        ):
-            raise serializers.ValidationError(
-                'Можно оставить только один отзыв на проиведение.'
-            )
-        return data
-
 
 class CommentSerializer(serializers.ModelSerializer):
 
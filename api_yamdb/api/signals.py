@@ -0,0 +1,65 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from reviews.models import Category, Genre, GenreTitle, Review, Title
+from .authentication import user_cache
+from .cache import bump_versions
+
+User = get_user_model()
+
+
+def bump_on_commit(using, *resources):
+    """
+    Версии меняются после фиксации транзакции: иначе параллельный
+    запрос успеет закэшировать ещё не изменённые строки под новой версией.
+    """
+    transaction.on_commit(lambda: bump_versions(*resources), using=using)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def category_changed(sender, using, **kwargs):
+    bump_on_commit(using, 'categories')
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def genre_changed(sender, using, **kwargs):
+    bump_on_commit(using, 'genres')
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+@receiver(post_save, sender=GenreTitle)
+@receiver(post_delete, sender=GenreTitle)
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_changed(sender, using, **kwargs):
+    bump_on_commit(using, 'titles')
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def review_changed(sender, instance, using, **kwargs):
+    # Отзыв меняет и список отзывов произведения, и его рейтинг.
+    bump_on_commit(using, 'titles', f'reviews:{instance.title_id}')
+
+
+@receiver(post_save, sender=User)
+def user_changed(sender, instance, created, using, **kwargs):
+    # Роль и права читаются из кэша аутентификации, его сбрасываем всегда.
+    user_cache.invalidate(instance.pk)
+    # В отзывах выводится только username, остальные изменения не важны.
+    loaded_username = getattr(instance, '_loaded_username', None)
+    if created:
+        bump_on_commit(using, 'usernames')
+    elif loaded_username != instance.username:
+        bump_on_commit(using, 'users', 'usernames')
+    instance._loaded_username = instance.username
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, using, **kwargs):
+    user_cache.invalidate(instance.pk)
+    bump_on_commit(using, 'usernames')
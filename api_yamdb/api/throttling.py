@@ -0,0 +1,136 @@
+import hashlib
+import math
+import time
+
+from django.core.cache import cache
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+DURATIONS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """`'5/min'` -> (5, 60); `None` отключает ограничение."""
+    if rate is None:
+        return None, None
+    number, period = rate.split('/')
+    return int(number), DURATIONS[period[0]]
+
+
+def increment(key, timeout):
+    """
+    Атомарно увеличивает счётчик в кэше. Обычно это одно `incr`; новый
+    или истёкший ключ создаётся через `add`, а если его успел создать
+    параллельный запрос, `incr` повторяется.
+    """
+    try:
+        return cache.incr(key)
+    except ValueError:
+        if cache.add(key, 1, timeout):
+            return 1
+        return cache.incr(key)
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    """
+    Ограничение частоты по скользящему окну. В кэше Django хранятся два
+    счётчика: текущего окна и предыдущего, вклад которого убывает по мере
+    сдвига окна. Запрос стоит одного `incr` и одного `get`, а не списка
+    времён всех запросов, как у SimpleRateThrottle, и лимит не
+    превышается при параллельных запросах. Частота берётся из
+    `DEFAULT_THROTTLE_RATES` по `scope`. Отклонённые запросы тоже
+    считаются, поэтому клиент, не соблюдающий Retry-After, остаётся
+    заблокированным.
+    """
+    scope = None
+    timer = time.time
+
+    def __init__(self):
+        self.limit, self.window = parse_rate(
+            api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+        )
+        self.retry_after = None
+
+    def get_ident_key(self, request, view):
+        """Чьи запросы считаются вместе; `None` — запрос не ограничивается."""
+        raise NotImplementedError('.get_ident_key() must be overridden')
+
+    def get_cache_key(self, ident, index):
+        digest = hashlib.md5(str(ident).encode()).hexdigest()
+        return f'api:throttle:{self.scope}:{digest}:{index}'
+
+    def allow_request(self, request, view):
+        if self.limit is None:
+            return True
+        ident = self.get_ident_key(request, view)
+        if ident is None:
+            return True
+        index, elapsed = divmod(self.timer(), self.window)
+        index = int(index)
+        current = increment(
+            self.get_cache_key(ident, index), self.window * 2
+        )
+        previous = cache.get(self.get_cache_key(ident, index - 1), 0)
+        weight = 1 - elapsed / self.window
+        if previous * weight + current <= self.limit:
+            return True
+        self.retry_after = self.get_retry_after(previous, current, elapsed)
+        return False
+
+    def get_retry_after(self, previous, current, elapsed):
+        """
+        Через сколько секунд пройдёт следующий запрос: пока не кончится
+        текущее окно, вклад предыдущего убывает; потом убывает вклад
+        текущего.
+        """
+        free = self.limit - current - 1
+        if free >= 0 and previous:
+            seconds = self.window * (1 - free / previous) - elapsed
+        else:
+            seconds = self.window - elapsed + self.window * (
+                1 - (self.limit - 1) / current
+            )
+        return max(math.ceil(seconds), 1)
+
+    def wait(self):
+        return self.retry_after
+
+
+class IPThrottle(SlidingWindowThrottle):
+
+    def get_ident_key(self, request, view):
+        return self.get_ident(request)
+
+
+class UsernameThrottle(SlidingWindowThrottle):
+    """
+    Считает запросы по полю `username` тела, не обращаясь к базе: так
+    перебор кода для одного пользователя ограничен с любых адресов.
+    Значение приводится так же, как в `CharField` сериализаторов, иначе
+    `" bob"` получил бы свой счётчик для того же пользователя.
+    """
+
+    def get_ident_key(self, request, view):
+        data = request.data
+        username = data.get('username') if hasattr(data, 'get') else None
+        if isinstance(username, bool) or not isinstance(
+            username, (str, int, float)
+        ):
+            return None
+        return str(username).strip() or None
+
+
+class SignupIPThrottle(IPThrottle):
+    scope = 'signup_ip'
+
+
+class SignupUsernameThrottle(UsernameThrottle):
+    scope = 'signup_username'
+
+
+class TokenIPThrottle(IPThrottle):
+    scope = 'token_ip'
+
+
+class TokenUsernameThrottle(UsernameThrottle):
+    scope = 'token_username'
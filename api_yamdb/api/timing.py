@@ -0,0 +1,129 @@
+import heapq
+import threading
+import time
+
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+
+from rest_framework.fields import empty
+
+_state = threading.local()
+_untimed = nullcontext()
+
+
+class RequestTimings:
+    """
+    Время этапов одного запроса в секундах и SQL-запросы. Экземпляр
+    подключается к соединениям как `execute_wrapper` и хранит
+    `top_statements` самых долгих запросов.
+    """
+
+    def __init__(self, top_statements=5):
+        self.durations = defaultdict(float)
+        self.queries = 0
+        self.top_statements = top_statements
+        self.statements = []
+        self.active = set()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.queries += 1
+            self.durations['db'] += duration
+            item = (duration, self.queries, sql)
+            if len(self.statements) < self.top_statements:
+                heapq.heappush(self.statements, item)
+            elif self.top_statements:
+                heapq.heappushpop(self.statements, item)
+
+    @contextmanager
+    def measure(self, name):
+        """Вложенные замеры того же этапа не считаются дважды."""
+        if name in self.active:
+            yield
+            return
+        self.active.add(name)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.durations[name] += time.perf_counter() - started
+            self.active.discard(name)
+
+    def slowest(self):
+        """Самые долгие запросы: пары (секунды, SQL) по убыванию."""
+        return [
+            (duration, sql)
+            for duration, _, sql in sorted(self.statements, reverse=True)
+        ]
+
+    def header(self, total):
+        """Значение заголовка Server-Timing, длительности в миллисекундах."""
+        metrics = [
+            f'db;dur={self.durations["db"] * 1000:.1f};'
+            f'desc="{self.queries} queries"'
+        ]
+        metrics += [
+            f'{name};dur={duration * 1000:.1f}'
+            for name, duration in self.durations.items() if name != 'db'
+        ]
+        metrics.append(f'total;dur={total * 1000:.1f}')
+        return ', '.join(metrics)
+
+
+@contextmanager
+def collect(timings):
+    """Внутри блока `timed` текущего потока пишет в `timings`."""
+    previous = getattr(_state, 'timings', None)
+    _state.timings = timings
+    try:
+        yield timings
+    finally:
+        _state.timings = previous
+
+
+def timed(name):
+    """
+    Замер этапа `name` текущего запроса. Вне `collect` возвращает пустой
+    контекстный менеджер, поэтому выключенные замеры почти ничего не стоят.
+    """
+    timings = getattr(_state, 'timings', None)
+    if timings is None:
+        return _untimed
+    return timings.measure(name)
+
+
+def time_serializer(serializer):
+    """
+    Замеряет сериализацию и проверку данных сериализатора для
+    Server-Timing. Методы подменяются у экземпляра, а не в классе, поэтому
+    сами сериализаторы о замерах не знают; вне `collect` сериализатор
+    возвращается как есть.
+    """
+    timings = getattr(_state, 'timings', None)
+    if timings is None:
+        return serializer
+    to_representation = serializer.to_representation
+    run_validation = serializer.run_validation
+
+    def timed_to_representation(instance):
+        with timings.measure('serialize'):
+            return to_representation(instance)
+
+    def timed_run_validation(data=empty):
+        with timings.measure('validate'):
+            return run_validation(data)
+
+    serializer.to_representation = timed_to_representation
+    serializer.run_validation = timed_run_validation
+    return serializer
+
+
+class TimedSerializerViewMixin:
+    """Замеряет сериализаторы, созданные вьюсетом через `get_serializer`."""
+
+    def get_serializer(self, *args, **kwargs):
+        return time_serializer(super().get_serializer(*args, **kwargs))
@@ -0,0 +1,166 @@
+import heapq
+import re
+import time
+
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Case, FloatField, Value, When
+from rest_framework.filters import SearchFilter
+
+from .cache import get_versions
+
+SIMILARITY_THRESHOLD = getattr(settings, 'TRIGRAM_SIMILARITY_THRESHOLD', 0.3)
+# Без PostgreSQL в выдачу попадают только самые похожие строки: иначе
+# короткий запрос превращается в `IN` и `CASE` на всю таблицу.
+MAX_RESULTS = getattr(settings, 'TRIGRAM_MAX_RESULTS', 100)
+# Версия ресурса видна всем воркерам только в общем кэше; с кэшем в
+# памяти процесса индекс устаревает не дольше чем на столько секунд.
+INDEX_TIMEOUT = getattr(settings, 'TRIGRAM_INDEX_TIMEOUT', 60)
+
+
+def get_trigrams(text):
+    """Триграммы строки по правилам pg_trgm: слова с отступами `  w `."""
+    trigrams = set()
+    for word in re.findall(r'[^\W_]+', text.lower()):
+        padded = f'  {word} '
+        trigrams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return trigrams
+
+
+def by_similarity(item):
+    pk, score = item
+    return -score, pk
+
+
+def similarity(first, second):
+    if not first or not second:
+        return 0.0
+    return len(first & second) / len(first | second)
+
+
+class TrigramIndex:
+    """
+    Инвертированный индекс триграмм в памяти процесса: кандидаты берутся
+    из списков по триграммам запроса, а не перебором всех строк.
+    """
+
+    def __init__(self, entries):
+        self.texts = defaultdict(list)
+        self.trigrams = defaultdict(list)
+        self.postings = defaultdict(set)
+        for pk, *texts in entries:
+            for text in texts:
+                if not text:
+                    continue
+                trigrams = get_trigrams(text)
+                self.texts[pk].append(text.lower())
+                self.trigrams[pk].append(trigrams)
+                for trigram in trigrams:
+                    self.postings[trigram].add(pk)
+
+    def search(self, query, threshold=SIMILARITY_THRESHOLD, limit=None):
+        """
+        Возвращает пары `(pk, similarity)` по убыванию похожести, не
+        больше `limit`.
+        """
+        query_trigrams = get_trigrams(query)
+        needle = query.lower()
+        if len(needle) < 3:
+            candidates = self.texts.keys()
+        else:
+            candidates = set()
+            for trigram in query_trigrams:
+                candidates |= self.postings.get(trigram, set())
+        found = []
+        for pk in candidates:
+            score = max(
+                similarity(query_trigrams, trigrams)
+                for trigrams in self.trigrams[pk]
+            )
+            contains = any(needle in text for text in self.texts[pk])
+            if score >= threshold or contains:
+                found.append((pk, score))
+        if limit is None:
+            return sorted(found, key=by_similarity)
+        return heapq.nsmallest(limit, found, key=by_similarity)
+
+
+_indexes = {}
+
+
+def get_index(model, fields, resource, using):
+    """
+    Индекс модели перестраивается, когда сменилась версия ресурса, то
+    есть после сохранения или удаления объектов, и не реже чем раз в
+    INDEX_TIMEOUT секунд.
+    """
+    key = (model._meta.label, tuple(fields), using)
+    version = get_versions([resource])[0]
+    now = time.monotonic()
+    cached = _indexes.get(key)
+    if (cached is None or cached[0] != version
+            or now - cached[1] >= INDEX_TIMEOUT):
+        entries = model._default_manager.using(using).values_list(
+            'pk', *fields
+        )
+        cached = (version, now, TrigramIndex(entries.iterator()))
+        _indexes[key] = cached
+    return cached[2]
+
+
+def trigram_search(queryset, fields, query, resource):
+    """
+    Нечёткий поиск по полям `fields`: подстрока или похожесть триграмм не
+    ниже порога. На PostgreSQL запрос обслуживается GIN-индексами pg_trgm,
+    в остальных случаях — индексом в памяти процесса.
+    """
+    query = query.strip()
+    if not query:
+        return queryset
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql':
+        table = queryset.model._meta.db_table
+        columns = [
+            f'{table}.{queryset.model._meta.get_field(field).column}'
+            for field in fields
+        ]
+        pattern = '%{}%'.format(
+            query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        )
+        return queryset.extra(
+            select={'search_rank': 'GREATEST({})'.format(', '.join(
+                f'similarity({column}, %s)' for column in columns
+            ))},
+            select_params=[query] * len(columns),
+            where=[' OR '.join(
+                f'{column} %% %s OR {column} ILIKE %s' for column in columns
+            )],
+            params=[query, pattern] * len(columns),
+        )
+    found = get_index(
+        queryset.model, fields, resource, queryset.db
+    ).search(query, limit=MAX_RESULTS)
+    return queryset.filter(pk__in=[pk for pk, _ in found]).annotate(
+        search_rank=Case(
+            *(When(pk=pk, then=Value(score)) for pk, score in found),
+            default=Value(0.0),
+            output_field=FloatField(),
+        )
+    )
+
+
+class TrigramSearchFilter(SearchFilter):
+    """
+    Нечёткий поиск по `search_fields` вьюсета, устойчивый к опечаткам.
+    Индекс в памяти привязан к версии ресурса `trigram_resource`.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '')
+        if not query.strip():
+            return queryset
+        return trigram_search(
+            queryset, view.search_fields, query, view.trigram_resource
+        ).order_by('-search_rank', 'id')
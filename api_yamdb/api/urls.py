@@ -24,6 +24,7 @@ router.register(
 urlpatterns = [
     path('v1/auth/signup/', views.send_confirmation_code, name='signup'),
     path('v1/auth/token/', views.get_token, name='token'),
+    path('v1/auth/cache/', views.auth_cache_stats, name='auth_cache'),
     path('v1/', include(router.urls)),
 
 ]
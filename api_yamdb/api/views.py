@@ -1,52 +1,79 @@
-from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.core.mail import send_mail
-from django.db.models import Avg
+from django.db import IntegrityError, transaction
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, permissions, status, viewsets
-from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework import generics, permissions, status, viewsets
+from rest_framework.decorators import (
+    action, api_view, authentication_classes, permission_classes,
+    throttle_classes,
+)
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.viewsets import ModelViewSet
 from rest_framework_simplejwt.tokens import AccessToken
 
-from reviews.models import Category, Comment, Genre, Review, Title
-from .custom_filters import CategoryFilter
-from .mixins import BaseViewSet
+from reviews.listing import refresh_categories, refresh_genres, refresh_titles
+from reviews.models import (
+    Category, Comment, Genre, Review, Title, TitleListing, TitleScores,
+)
+from reviews.rating import create_scores
+from users.outbox import enqueue_email
+from .authentication import user_cache
+from .bulk import BulkMixin
+from .cache import CachedListMixin, CachedRetrieveMixin
+from .compiled import CompiledListMixin, CompiledTitleListing
+from .custom_filters import CategoryFilter, TitleSearchFilter
+from .mixins import BaseViewSet, EagerLoadingMixin, NestedViewSetMixin
+from .pagination import PageNumberOrKeysetPagination
 from .permissions import AuthorOrAdminOrModerator, IsAdminOrReadOnly
 from .serializers import (
     CategorySerializer, CommentSerializer, GenreSerializer, MyselfSerializer,
     ReviewSerializer, SignupUserSerializer, TitleGETSerializer,
-    TitleSerializer, TokenSerializer, UsersSerializer,
+    TitleScoresSerializer, TitleSerializer, TokenSerializer, UsersSerializer,
+)
+from .throttling import (
+    SignupIPThrottle, SignupUsernameThrottle, TokenIPThrottle,
+    TokenUsernameThrottle,
 )
+from .timing import TimedSerializerViewMixin, time_serializer
 from .tokens import default_token_generator
+from .trigram import TrigramSearchFilter
 
 User = get_user_model()
 
+DUPLICATE_REVIEW_ERROR = 'Можно оставить только один отзыв на проиведение.'
 
+
+# Без аутентификации и до любых запросов к базе работают только
+# ограничения частоты по адресу и имени пользователя.
 @api_view(['POST'])
+@authentication_classes(())
 @permission_classes((permissions.AllowAny,))
+@throttle_classes((SignupIPThrottle, SignupUsernameThrottle))
 def send_confirmation_code(request):
-    serializer = SignupUserSerializer(data=request.data)
+    serializer = time_serializer(SignupUserSerializer(data=request.data))
     serializer.is_valid(raise_exception=True)
-    serializer.save()
-    code = default_token_generator.make_token(serializer.instance)
-    send_mail(
-        subject='confirmation_code',
-        message=(
-            f'{serializer.instance.username} your '
-            f'confirmation_code: {code}'
-        ),
-        from_email=settings.ADMIN_EMAIL,
-        recipient_list=[serializer.instance.email]
-    )
+    with transaction.atomic():
+        serializer.save()
+        code = default_token_generator.make_token(serializer.instance)
+        enqueue_email(
+            subject='confirmation_code',
+            message=(
+                f'{serializer.instance.username} your '
+                f'confirmation_code: {code}'
+            ),
+            recipient=serializer.instance.email,
+        )
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 
 @api_view(['POST'])
+@authentication_classes(())
 @permission_classes((permissions.AllowAny,))
+@throttle_classes((TokenIPThrottle, TokenUsernameThrottle))
 def get_token(request):
-    serializer = TokenSerializer(data=request.data)
+    serializer = time_serializer(TokenSerializer(data=request.data))
     serializer.is_valid(raise_exception=True)
     data = serializer.save()
     user = get_object_or_404(User, username=data['username'])
@@ -56,47 +83,109 @@ def get_token(request):
     return Response({'token': token}, status=status.HTTP_200_OK)
 
 
-class CategoryViewSet(BaseViewSet):
+@api_view(['GET'])
+@permission_classes((permissions.IsAdminUser,))
+def auth_cache_stats(request):
+    """Счётчики кэша пользователей того процесса, что обработал запрос."""
+    return Response(user_cache.stats(), status=status.HTTP_200_OK)
+
+
+class CategoryViewSet(BulkMixin, CachedListMixin, TimedSerializerViewMixin,
+                      BaseViewSet):
     queryset = Category.objects.all().order_by('id')
+    cache_resources = ('categories',)
+    bulk_resource = 'categories'
+    bulk_lookup_field = 'slug'
     serializer_class = CategorySerializer
     permission_classes = (IsAdminOrReadOnly,)
-    filter_backends = (DjangoFilterBackend, filters.SearchFilter)
+    filter_backends = (DjangoFilterBackend, TrigramSearchFilter)
     filterset_fields = ('name', 'slug')
     search_fields = ('name', 'slug')
+    trigram_resource = 'categories'
     lookup_field = 'slug'
     lookup_value_regex = "[^/]+"
 
+    def perform_bulk_saved(self, objects, created):
+        if not created:
+            refresh_categories(obj.pk for obj in objects)
+
 
-class GenreViewSet(BaseViewSet):
+class GenreViewSet(BulkMixin, CachedListMixin, TimedSerializerViewMixin,
+                   BaseViewSet):
     queryset = Genre.objects.all().order_by('id')
+    cache_resources = ('genres',)
+    bulk_resource = 'genres'
+    bulk_lookup_field = 'slug'
     serializer_class = GenreSerializer
     permission_classes = (IsAdminOrReadOnly,)
-    filter_backends = (DjangoFilterBackend, filters.SearchFilter)
+    filter_backends = (DjangoFilterBackend, TrigramSearchFilter)
     filterset_fields = ('name', 'slug')
     search_fields = ('name', 'slug')
+    trigram_resource = 'genres'
     lookup_field = 'slug'
     lookup_value_regex = "[^/]+"
 
+    def perform_bulk_saved(self, objects, created):
+        if not created:
+            refresh_genres(obj.pk for obj in objects)
 
-class TitleViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.all().order_by('id').annotate(
-        rating=Avg('reviews__score')
-    )
+
+class TitleViewSet(BulkMixin, CachedListMixin, CachedRetrieveMixin,
+                   CompiledListMixin, EagerLoadingMixin,
+                   TimedSerializerViewMixin, viewsets.ModelViewSet):
+    queryset = Title.objects.all().order_by('id')
+    cache_resources = ('titles', 'categories', 'genres')
+    bulk_resource = 'titles'
     permission_classes = (IsAdminOrReadOnly,)
-    filter_backends = (DjangoFilterBackend, filters.SearchFilter)
+    pagination_class = PageNumberOrKeysetPagination
+    filter_backends = (DjangoFilterBackend, TitleSearchFilter)
     filterset_class = CategoryFilter
-    search_fields = ('name',)
+
+    def get_queryset(self):
+        if self.action == 'list':
+            # Список читается из TitleListing, где категория и жанры уже
+            # собраны в строку произведения.
+            return TitleListing.objects.order_by('title')
+        return super().get_queryset()
+
+    def filter_queryset(self, queryset):
+        if self.action != 'list':
+            return queryset
+        return super().filter_queryset(queryset)
+
+    def get_list_compiler(self):
+        return CompiledTitleListing()
 
     def get_serializer_class(self):
         if self.action in ('retrieve', 'list'):
             return TitleGETSerializer
+        if self.action == 'stats':
+            return TitleScoresSerializer
         return TitleSerializer
 
+    def perform_bulk_saved(self, objects, created):
+        if created:
+            create_scores(obj.pk for obj in objects)
+        refresh_titles(obj.pk for obj in objects)
+
+    @action(detail=True, methods=('get',))
+    def stats(self, request, pk=None):
+        """
+        Гистограмма оценок произведения с количеством, средним и медианой:
+        одна строка TitleScores по первичному ключу вместо GROUP BY по
+        отзывам.
+        """
+        scores = generics.get_object_or_404(TitleScores.objects.all(), pk=pk)
+        return Response(self.get_serializer(scores).data)
+
 
-class UsersViewSet(ModelViewSet):
+class UsersViewSet(TimedSerializerViewMixin, ModelViewSet):
     queryset = User.objects.all().order_by('id')
     permission_classes = (permissions.IsAdminUser,)
     serializer_class = UsersSerializer
+    filter_backends = (TrigramSearchFilter,)
+    search_fields = ('username',)
+    trigram_resource = 'usernames'
     lookup_field = 'username'
     lookup_url_kwargs = 'username'
     lookup_value_regex = r'[\w.@+-]+'
@@ -105,45 +194,64 @@ class UsersViewSet(ModelViewSet):
         detail=False,
         permission_classes=(permissions.IsAuthenticated,),
         methods=('get', 'patch',),
+        serializer_class=MyselfSerializer,
     )
     def me(self, request):
         user = request.user
         if request.method == 'GET':
-            serializer = MyselfSerializer(user)
+            serializer = self.get_serializer(user)
             return Response(serializer.data)
-        serializer = MyselfSerializer(user, data=request.data, partial=True)
+        serializer = self.get_serializer(
+            user, data=request.data, partial=True
+        )
         serializer.is_valid(raise_exception=True)
         serializer.save()
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(NestedViewSetMixin, CompiledListMixin,
+                     EagerLoadingMixin, TimedSerializerViewMixin,
+                     viewsets.ModelViewSet):
+    queryset = Comment.objects.order_by('id')
     serializer_class = CommentSerializer
     permission_classes = (
         AuthorOrAdminOrModerator,
     )
+    pagination_class = PageNumberOrKeysetPagination
+    parent_queryset = Review.objects.only('id', 'title_id')
+    parent_field = 'review_id'
+    parent_lookups = (('review_id', 'pk'), ('title_id', 'title'))
 
     def perform_create(self, serializer):
-        review_id = self.kwargs.get('review_id')
-        review = get_object_or_404(Review, id=review_id)
-        serializer.save(author=self.request.user, review_id=review)
-
-    def get_queryset(self):
-        review_id = self.kwargs.get('review_id')
-        get_object_or_404(Review, id=review_id)
-        return Comment.objects.filter(review_id=review_id).order_by('id')
+        serializer.save(author=self.request.user, review_id=self.get_parent())
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(NestedViewSetMixin, CachedListMixin, CachedRetrieveMixin,
+                    CompiledListMixin, EagerLoadingMixin,
+                    TimedSerializerViewMixin, viewsets.ModelViewSet):
+    queryset = Review.objects.order_by('id')
     serializer_class = ReviewSerializer
     permission_classes = (AuthorOrAdminOrModerator,)
+    pagination_class = PageNumberOrKeysetPagination
+    parent_queryset = Title.objects.only('id')
+    parent_field = 'title'
+    parent_lookups = (('title_id', 'pk'),)
 
-    def perform_create(self, serializer):
-        title_id = self.kwargs.get('title_id')
-        title = get_object_or_404(Title, id=title_id)
-        serializer.save(author=self.request.user, title=title)
+    def get_cache_resources(self):
+        return (f'reviews:{self.kwargs.get("title_id")}', 'users')
 
-    def get_queryset(self):
-        title_id = self.kwargs.get('title_id')
-        get_object_or_404(Title, id=title_id)
-        return Review.objects.filter(title=title_id).order_by('id')
+    def perform_create(self, serializer):
+        title = self.get_parent()
+        try:
+            serializer.save(author=self.request.user, title=title)
+        except IntegrityError:
+            # Дубликат ловит ограничение unique_review, а не запрос заранее;
+            # остальные нарушения ограничений, например произведение,
+            # удалённое параллельно, не выдаются за дубликат.
+            if not Review.objects.filter(
+                title=title, author=self.request.user
+            ).exists():
+                raise
+            raise ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [DUPLICATE_REVIEW_ERROR]
+            })
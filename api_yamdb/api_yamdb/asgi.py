@@ -1,7 +1,80 @@
+import asyncio
 import os
 
-from django.core.asgi import get_asgi_application
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+from django.conf import settings
+from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
 
-application = get_asgi_application()
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class LimitedWsgiToAsgiInstance(WsgiToAsgiInstance):
+    """Запускает WSGI-приложение в потоке, только получив слот семафора."""
+
+    def __init__(self, wsgi_application, semaphore):
+        super().__init__(wsgi_application)
+        self.semaphore = semaphore
+
+    async def run_wsgi_app(self, body):
+        async with self.semaphore:
+            await super().run_wsgi_app(body)
+
+
+class ReadWriteAsgiHandler(WsgiToAsgi):
+    """
+    ASGI-приложение поверх Django 2.2, где ещё нет асинхронных
+    представлений и ORM. Соединения и медленных клиентов держит цикл
+    событий, а запрос попадает в пул потоков, только когда тело уже
+    получено. Чтения и записи ограничены раздельно: долгие записи не
+    занимают потоки, нужные для списков и карточек.
+    """
+
+    def __init__(self, wsgi_application, read_threads, write_threads):
+        super().__init__(wsgi_application)
+        self.read_threads = read_threads
+        self.write_threads = write_threads
+        self.loop = None
+        self.semaphores = None
+
+    def bind(self, loop):
+        self.loop = loop
+        if 'ASGI_THREADS' not in os.environ:
+            loop.set_default_executor(ThreadPoolExecutor(
+                max_workers=self.read_threads + self.write_threads
+            ))
+        self.semaphores = {
+            True: asyncio.Semaphore(self.read_threads),
+            False: asyncio.Semaphore(self.write_threads),
+        }
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+            return
+        loop = asyncio.get_event_loop()
+        if loop is not self.loop:
+            self.bind(loop)
+        semaphore = self.semaphores[scope.get('method') in SAFE_METHODS]
+        await LimitedWsgiToAsgiInstance(
+            self.wsgi_application, semaphore
+        )(scope, receive, send)
+
+
+application = ReadWriteAsgiHandler(
+    get_wsgi_application(),
+    read_threads=settings.ASGI_READ_THREADS,
+    write_threads=settings.ASGI_WRITE_THREADS,
+)
@@ -24,6 +24,9 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'api.middleware.MetricsMiddleware',
+    'api.middleware.ServerTimingMiddleware',
+    'api.middleware.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -64,6 +67,35 @@ DATABASES = {
     }
 }
 
+# Реплика для чтения: задаётся DB_REPLICA_HOST и/или DB_REPLICA_NAME,
+# остальные параметры берутся из основной базы.
+DATABASE_REPLICAS = []
+if os.getenv('DB_REPLICA_HOST') or os.getenv('DB_REPLICA_NAME'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.getenv('DB_REPLICA_NAME', default=DATABASES['default']['NAME']),
+        'HOST': os.getenv('DB_REPLICA_HOST', default=DATABASES['default']['HOST']),
+        'PORT': os.getenv('DB_REPLICA_PORT', default=DATABASES['default']['PORT']),
+    }
+    DATABASE_REPLICAS.append('replica')
+
+DATABASE_ROUTERS = ['api.routers.ReplicaRouter']
+# После записи клиент столько секунд читает только с основной базы.
+REPLICA_STICKY_SECONDS = int(os.getenv('REPLICA_STICKY_SECONDS', default=5))
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', default='yamdb'),
+    }
+}
+
+API_CACHE_TIMEOUT = int(os.getenv('API_CACHE_TIMEOUT', default=60))
+API_CACHE_LOCK_TIMEOUT = 5
+
+ASGI_READ_THREADS = int(os.getenv('ASGI_READ_THREADS', default=32))
+ASGI_WRITE_THREADS = int(os.getenv('ASGI_WRITE_THREADS', default=8))
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -99,7 +131,7 @@ AUTH_USER_MODEL = 'users.User'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -108,8 +140,69 @@ REST_FRAMEWORK = {
         'rest_framework.pagination.PageNumberPagination'
     ),
     'PAGE_SIZE': 10,
+    'DEFAULT_RENDERER_CLASSES': (
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
+    # Перед приложением стоит nginx из infra: адрес клиента — последний
+    # в X-Forwarded-For, который дописывает он.
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', default=1)),
+    # Регистрация и получение токена: по адресу клиента и по username.
+    'DEFAULT_THROTTLE_RATES': {
+        'signup_ip': os.getenv('THROTTLE_SIGNUP_IP', default='20/min'),
+        'signup_username': os.getenv('THROTTLE_SIGNUP_USERNAME', default='3/min'),
+        'token_ip': os.getenv('THROTTLE_TOKEN_IP', default='30/min'),
+        'token_username': os.getenv('THROTTLE_TOKEN_USERNAME', default='5/min'),
+    },
 }
 
+# orjson, json или auto: orjson, если он установлен.
+API_JSON_BACKEND = os.getenv('API_JSON_BACKEND', default='auto')
+
+# Массовые запросы /bulk/ передают до API_BULK_MAX_ITEMS объектов за раз.
+DATA_UPLOAD_MAX_MEMORY_SIZE = 20 * 1024 * 1024
+API_BULK_MAX_ITEMS = 10000
+API_BULK_BATCH_SIZE = 1000
+
+# Замеры запросов: заголовок Server-Timing для персонала и журнал
+# запросов дольше SLOW_REQUEST_MS миллисекунд (в SLOW_REQUEST_LOG или stderr).
+SERVER_TIMING = os.getenv('SERVER_TIMING', default='').lower() in ('1', 'true', 'yes')
+SLOW_REQUEST_MS = int(os.getenv('SLOW_REQUEST_MS', default=500))
+SLOW_REQUEST_STATEMENTS = 5
+SLOW_REQUEST_LOG = os.getenv('SLOW_REQUEST_LOG', default='')
+
+# Метрики Prometheus на /metrics/. Для нескольких воркеров gunicorn
+# нужен общий каталог PROMETHEUS_MULTIPROC_DIR, см. api/metrics.py.
+METRICS = os.getenv('METRICS', default='').lower() in ('1', 'true', 'yes')
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', default='')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'slow_requests': {
+            'class': 'logging.FileHandler',
+            'filename': SLOW_REQUEST_LOG,
+        } if SLOW_REQUEST_LOG else {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'api.slow_requests': {
+            'handlers': ['slow_requests'],
+            'level': 'WARNING',
+        },
+    },
+}
+
+AUTH_USER_CACHE_SIZE = 10000
+AUTH_USER_CACHE_TTL = int(os.getenv('AUTH_USER_CACHE_TTL', default=30))
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
     'AUTH_HEADER_TYPES': ('Bearer',),
@@ -0,0 +1,109 @@
+"""
+Настройки gunicorn для контейнера: `gunicorn --config gunicorn.conf.py`.
+Профиль выбирается переменной GUNICORN_PROFILE:
+
+* `sync` — синхронные воркеры WSGI, по два на ядро и ещё один;
+* `gthread` — воркеры WSGI с пулом потоков (GUNICORN_THREADS, по
+  умолчанию 4), по одному на ядро и ещё один;
+* `asgi` — воркеры uvicorn с api_yamdb.asgi: соединения держит цикл
+  событий, запросы выполняются в пуле потоков ASGI_READ_THREADS и
+  ASGI_WRITE_THREADS.
+
+Приложение загружается в мастере до форка (`preload_app`), поэтому
+воркеры делят его память copy-on-write и перезапускаются быстро. Воркер
+перезапускается после GUNICORN_MAX_REQUESTS запросов со случайной
+добавкой до GUNICORN_MAX_REQUESTS_JITTER, чтобы воркеры не уходили на
+перезапуск одновременно. Любую настройку можно переопределить
+переменной окружения GUNICORN_<НАСТРОЙКА>.
+"""
+import glob
+import multiprocessing
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+WSGI_APP = 'api_yamdb.wsgi:application'
+ASGI_APP = 'api_yamdb.asgi:application'
+
+# Класс воркера, приложение и число воркеров на ядро и сверх них.
+PROFILES = {
+    'sync': ('sync', WSGI_APP, 2, 1),
+    'gthread': ('gthread', WSGI_APP, 1, 1),
+    'asgi': ('uvicorn.workers.UvicornWorker', ASGI_APP, 1, 1),
+}
+
+
+def get_env(name, default, cast=int):
+    value = os.environ.get(f'GUNICORN_{name}')
+    return default if value in (None, '') else cast(value)
+
+
+def get_cpu_count():
+    """Ядра, доступные процессу: в контейнере их может быть меньше."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return multiprocessing.cpu_count()
+
+
+profile = os.environ.get('GUNICORN_PROFILE', 'gthread')
+if profile not in PROFILES:
+    raise ImproperlyConfigured(f'Unknown GUNICORN_PROFILE: {profile}')
+worker_class, wsgi_app, per_cpu, extra = PROFILES[profile]
+worker_class = get_env('WORKER_CLASS', worker_class, str)
+
+bind = get_env('BIND', '0:8000', str)
+workers = get_env('WORKERS', per_cpu * get_cpu_count() + extra)
+threads = get_env('THREADS', 4 if profile == 'gthread' else 1)
+preload_app = get_env('PRELOAD', '1', str) not in ('0', 'false', 'no')
+
+max_requests = get_env('MAX_REQUESTS', 1000)
+max_requests_jitter = get_env('MAX_REQUESTS_JITTER', max_requests // 10)
+
+# Запрос дольше timeout секунд считается зависшим, а воркер — убитым;
+# graceful_timeout даётся на завершение запросов при перезапуске.
+timeout = get_env('TIMEOUT', 30)
+graceful_timeout = get_env('GRACEFUL_TIMEOUT', 30)
+# Должен быть больше keepalive_timeout в upstream nginx, чтобы nginx не
+# отправил запрос в соединение, которое воркер как раз закрывает.
+keepalive = get_env('KEEPALIVE', 5)
+
+# Воркеры отмечаются в файле раз в секунду: на tmpfs это не блокируется
+# на диске контейнера.
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+
+
+def on_starting(server):
+    """
+    Несколько воркеров должны делить кэш Django, а метрики прошлого
+    запуска из PROMETHEUS_MULTIPROC_DIR не нужны.
+    """
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+    from api.cache import is_shared_cache
+
+    if server.cfg.workers > 1 and not is_shared_cache():
+        raise ImproperlyConfigured(
+            'Several gunicorn workers need a shared cache: set '
+            'CACHE_BACKEND and CACHE_LOCATION or GUNICORN_WORKERS=1'
+        )
+    directory = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        for path in glob.glob(os.path.join(directory, '*.db')):
+            os.remove(path)
+
+
+def post_fork(server, worker):
+    # Соединения с базой, открытые мастером при загрузке приложения, не
+    # должны достаться нескольким воркерам сразу.
+    if server.cfg.preload_app:
+        from django.db import connections
+
+        connections.close_all()
+
+
+def child_exit(server, worker):
+    from api.metrics import mark_process_dead
+
+    mark_process_dead(worker.pid)
@@ -26,6 +26,7 @@ class TitleAdmin(admin.ModelAdmin):
         'year',
         'description',
         'category',
+        'rating',
     )
 
 
@@ -1,5 +1,21 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+def restore_search_triggers(using, **kwargs):
+    from django.db import connections
+
+    from .search import install_search
+
+    connection = connections[using]
+    if connection.vendor == 'sqlite':
+        install_search(connection)
 
 
 class ReviewsConfig(AppConfig):
     name = 'reviews'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+
+        post_migrate.connect(restore_search_triggers, sender=self)
@@ -0,0 +1,100 @@
+import json
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import OuterRef, Subquery
+
+from .models import GenreTitle, Title, TitleListing
+
+REFRESH_BATCH_SIZE = 500
+
+
+def dump_genres(genres):
+    return json.dumps(genres, ensure_ascii=False, separators=(',', ':'))
+
+
+def build_rows(title_ids, using):
+    """Строки списка для произведений; жанры — в порядке добавления."""
+    genres = {pk: [] for pk in title_ids}
+    links = GenreTitle.objects.using(using).filter(
+        title_id__in=title_ids
+    ).order_by('id').values_list(
+        'title_id', 'genre_id__name', 'genre_id__slug'
+    )
+    for title_id, name, slug in links:
+        genres[title_id].append({'name': name, 'slug': slug})
+    titles = Title.objects.using(using).filter(pk__in=title_ids).values_list(
+        'id', 'name', 'year', 'description', 'rating',
+        'category_id', 'category__name', 'category__slug',
+    )
+    return [
+        TitleListing(
+            title_id=pk, name=name, year=year, description=description,
+            rating=rating, category_id=category_id,
+            category_name=category_name, category_slug=category_slug,
+            genres=dump_genres(genres[pk]),
+        )
+        for (pk, name, year, description, rating,
+             category_id, category_name, category_slug) in titles
+    ]
+
+
+def refresh_titles(title_ids, using=DEFAULT_DB_ALIAS):
+    """
+    Пересобирает строки списка для произведений. Строки произведений
+    блокируются на время пересборки, поэтому параллельные изменения одного
+    произведения не перезапишут друг друга устаревшими данными.
+    """
+    title_ids = list(dict.fromkeys(title_ids))
+    manager = TitleListing.objects.db_manager(using)
+    for start in range(0, len(title_ids), REFRESH_BATCH_SIZE):
+        batch = title_ids[start:start + REFRESH_BATCH_SIZE]
+        with transaction.atomic(using=using):
+            list(Title.objects.using(using).select_for_update().filter(
+                pk__in=batch
+            ).values_list('pk', flat=True))
+            rows = build_rows(batch, using)
+            manager.filter(title__in=batch).delete()
+            manager.bulk_create(rows)
+    return len(title_ids)
+
+
+def refresh_categories(category_ids, using=DEFAULT_DB_ALIAS):
+    """
+    Обновляет произведения категорий, в том числе удалённых: после
+    удаления у них остаётся старая категория только в списке.
+    """
+    category_ids = list(category_ids)
+    title_ids = set(Title.objects.using(using).filter(
+        category_id__in=category_ids
+    ).values_list('pk', flat=True))
+    title_ids.update(TitleListing.objects.using(using).filter(
+        category_id__in=category_ids
+    ).values_list('title_id', flat=True))
+    return refresh_titles(title_ids, using)
+
+
+def refresh_genres(genre_ids, using=DEFAULT_DB_ALIAS):
+    return refresh_titles(GenreTitle.objects.using(using).filter(
+        genre_id__in=list(genre_ids)
+    ).values_list('title_id', flat=True), using)
+
+
+def sync_ratings(titles):
+    """Копирует рейтинг произведений в список одним UPDATE."""
+    TitleListing.objects.using(titles.db).filter(
+        title__in=titles.values('pk')
+    ).update(rating=Subquery(
+        Title.objects.using(titles.db).filter(
+            pk=OuterRef('title')
+        ).values('rating')[:1]
+    ))
+
+
+def rebuild_title_listing(using=DEFAULT_DB_ALIAS):
+    """Пересобирает весь список, например после загрузки через COPY."""
+    return refresh_titles(
+        Title.objects.using(using).order_by('pk').values_list(
+            'pk', flat=True
+        ),
+        using,
+    )
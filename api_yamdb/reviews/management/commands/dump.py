@@ -0,0 +1,139 @@
+import datetime
+import decimal
+import gzip
+import io
+import json
+import sys
+import time
+import uuid
+
+from contextlib import contextmanager
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+GZIP_LEVEL = 6
+
+# Порядок важен: модель идёт после тех, на которые ссылается.
+DUMP_MODELS = (
+    'users.User',
+    'reviews.Category',
+    'reviews.Genre',
+    'reviews.Title',
+    'reviews.GenreTitle',
+    'reviews.Review',
+    'reviews.Comment',
+)
+
+
+@contextmanager
+def open_stream(path, mode, compress=None):
+    """
+    Текстовый поток файла или stdin/stdout для `-`. Gzip включается
+    явно или по расширению `.gz`.
+    """
+    if compress is None:
+        compress = path.endswith('.gz')
+    if path != '-':
+        if compress:
+            stream = gzip.open(path, f'{mode}t', encoding='utf-8',
+                               compresslevel=GZIP_LEVEL)
+        else:
+            stream = open(path, mode, encoding='utf-8')
+        with stream:
+            yield stream
+        return
+    raw = sys.stdout.buffer if mode == 'w' else sys.stdin.buffer
+    if compress:
+        raw = gzip.GzipFile(fileobj=raw, mode=f'{mode}b',
+                            compresslevel=GZIP_LEVEL)
+    stream = io.TextIOWrapper(raw, encoding='utf-8')
+    try:
+        yield stream
+    finally:
+        # Сам stdout не закрываем, только дописываем буферы и хвост gzip.
+        stream.flush()
+        stream.detach()
+        if compress:
+            raw.close()
+
+
+def encode_value(value):
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (decimal.Decimal, uuid.UUID)):
+        return str(value)
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+def get_dump_fields(model):
+    return [field.attname for field in model._meta.concrete_fields]
+
+
+class Command(BaseCommand):
+    help = (
+        'Streams users, categories, genres, titles, genre links, reviews '
+        'and comments to an NDJSON file'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            help='output file, "-" for stdout; .gz files are compressed')
+        parser.add_argument(
+            '--gzip',
+            action='store_true',
+            default=None,
+            help='compress the output even without the .gz extension')
+        parser.add_argument(
+            '-b', '--chunk-size',
+            type=int,
+            default=2000,
+            help='number of rows fetched from the database at a time')
+        parser.add_argument(
+            '--database',
+            default=DEFAULT_DB_ALIAS,
+            help='database alias to dump from')
+
+    def handle(self, *args, **options):
+        using = options['database']
+        log = self.stderr if options['path'] == '-' else self.stdout
+        with open_stream(options['path'], 'w', options['gzip']) as stream:
+            with transaction.atomic(using=using):
+                if connections[using].vendor == 'postgresql':
+                    # Один снимок на весь дамп: ссылки между моделями
+                    # останутся согласованными при параллельной записи.
+                    with connections[using].cursor() as cursor:
+                        cursor.execute(
+                            'SET TRANSACTION ISOLATION LEVEL '
+                            'REPEATABLE READ READ ONLY'
+                        )
+                for label in DUMP_MODELS:
+                    model = apps.get_model(label)
+                    started = time.monotonic()
+                    dumped = self.dump_model(
+                        stream, model, using, options['chunk_size']
+                    )
+                    elapsed = max(time.monotonic() - started, 1e-6)
+                    log.write(
+                        f'{model.__name__}: {dumped} rows, '
+                        f'{dumped / elapsed:.0f} rows/s'
+                    )
+
+    def dump_model(self, stream, model, using, chunk_size):
+        fields = get_dump_fields(model)
+        encoder = json.JSONEncoder(
+            ensure_ascii=False, separators=(',', ':'), default=encode_value
+        )
+        stream.write(encoder.encode({
+            'model': model._meta.label_lower, 'fields': fields
+        }) + '\n')
+        rows = model._default_manager.using(using).order_by(
+            'pk'
+        ).values_list(*fields).iterator(chunk_size=chunk_size)
+        dumped = 0
+        for row in rows:
+            stream.write(encoder.encode(row) + '\n')
+            dumped += 1
+        return dumped
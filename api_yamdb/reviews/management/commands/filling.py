@@ -1,18 +1,23 @@
 import codecs
 import csv
+import io
 import os
+import time
+
+from contextlib import contextmanager
 
 from django.apps import apps
 from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
 from django.core.management.base import BaseCommand, CommandError
-from django.db.models import ForeignKey
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
 
+from reviews.listing import rebuild_title_listing
+from reviews.models import Category, Genre, GenreTitle, Review, Title
+from reviews.rating import rebuild_scores, recalculate_ratings
 
-def get_fk_model(model, fieldname):
-    field_object = model._meta.get_field(fieldname)
-    if isinstance(field_object, ForeignKey):
-        return field_object.related_model
-    return None
+LISTING_MODELS = {Category, Genre, GenreTitle, Title}
 
 
 def csv_parser(csv_filename):
@@ -24,52 +29,242 @@ def csv_parser(csv_filename):
     return
 
 
-def insert_data(model, file):
-    file_path = os.path.join(settings.STATICFILES_DIRS[0], 'data')
-    is_header = True
-    header = []
-    model_instanse = model()
-    for row in csv_parser(os.path.join(file_path, file)):
-        if is_header:
-            header += row
-            is_header = False
-            continue
+def get_data_dir():
+    dirs = getattr(settings, 'STATICFILES_DIRS', None)
+    if dirs:
+        return os.path.join(dirs[0], 'data')
+    return os.path.join(settings.BASE_DIR, 'static', 'data')
+
+
+def sort_by_dependencies(jobs):
+    """
+    Упорядочивает пары `(model, file)` так, чтобы модель загружалась после
+    моделей, на которые ссылаются её внешние ключи.
+    """
+    models = {model for model, _ in jobs}
+    ordered, loaded = [], set()
+    pending = list(jobs)
+    while pending:
+        for job in pending:
+            model = job[0]
+            depends_on = {
+                field.related_model for field in model._meta.concrete_fields
+                if field.is_relation and field.related_model is not model
+            } & models
+            if depends_on <= loaded:
+                break
+        else:
+            raise CommandError('Circular foreign keys between models')
+        pending.remove(job)
+        ordered.append(job)
+        loaded.add(model)
+    return ordered
+
+
+def copy_value(value):
+    """Значение в текстовом формате COPY."""
+    if value is None:
+        return '\\N'
+    return (
+        str(value).replace('\\', '\\\\').replace('\t', '\\t')
+        .replace('\n', '\\n').replace('\r', '\\r')
+    )
+
+
+@contextmanager
+def keep_loaded_dates(fields):
+    """
+    Отключает auto_now и auto_now_add у загружаемых полей, чтобы при
+    вставке пачкой не подставлялось текущее время вместо значений из файла.
+    """
+    dated = [
+        (field, field.auto_now, field.auto_now_add) for field in fields
+        if getattr(field, 'auto_now', False)
+        or getattr(field, 'auto_now_add', False)
+    ]
+    for field, _, _ in dated:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in dated:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class BulkLoader:
+    """Загружает csv-файл в модель пачками через bulk_create или COPY."""
+
+    def __init__(self, model, batch_size, using=DEFAULT_DB_ALIAS,
+                 use_copy=True, report=None):
+        self.model = model
+        self.batch_size = batch_size
+        self.using = using
+        self.connection = connections[using]
+        self.use_copy = use_copy and self.connection.vendor == 'postgresql'
+        self.report = report or (lambda loaded, elapsed: None)
+
+    def get_fields(self, header):
+        try:
+            return [self.model._meta.get_field(name) for name in header]
+        except FieldDoesNotExist as e:
+            raise CommandError(f'{self.model.__name__}: {e}')
+
+    def build(self, fields, row):
+        values = {}
+        for field, value in zip(fields, row):
+            if value == '' and field.null:
+                value = None
+            values[field.attname] = value
+        return self.model(**values)
+
+    def batches(self, path):
+        rows = csv_parser(path)
+        fields = self.get_fields(next(rows, []))
+        batch = []
+        for row in rows:
+            batch.append(self.build(fields, row))
+            if len(batch) >= self.batch_size:
+                yield fields, batch
+                batch = []
+        if batch:
+            yield fields, batch
 
-        for field, value in zip(header, row):
-            rel_model = get_fk_model(model_instanse, field)
-            if rel_model is not None:
-                model_instanse.__setattr__(field, rel_model(value))
-            else:
-                model_instanse.__setattr__(field, value)
-        model_instanse.save()
+    def insert(self, fields, batch):
+        self.model.objects.using(self.using).bulk_create(batch)
+
+    def copy(self, fields, batch):
+        pk = self.model._meta.pk
+        columns = [
+            field for field in self.model._meta.concrete_fields
+            if field is not pk or pk in fields
+        ]
+        buffer = io.StringIO()
+        for obj in batch:
+            buffer.write('\t'.join(
+                copy_value(field.get_db_prep_save(
+                    field.pre_save(obj, add=True), self.connection
+                ))
+                for field in columns
+            ))
+            buffer.write('\n')
+        buffer.seek(0)
+        quote = self.connection.ops.quote_name
+        with self.connection.cursor() as cursor:
+            cursor.copy_expert(
+                'COPY {} ({}) FROM STDIN'.format(
+                    quote(self.model._meta.db_table),
+                    ', '.join(quote(field.column) for field in columns),
+                ),
+                buffer,
+            )
+
+    def write(self, fields, batch):
+        write = self.copy if self.use_copy else self.insert
+        with transaction.atomic(using=self.using), keep_loaded_dates(fields):
+            write(fields, batch)
+
+    def load(self, path):
+        loaded = 0
+        started = time.monotonic()
+        for fields, batch in self.batches(path):
+            self.write(fields, batch)
+            loaded += len(batch)
+            self.report(loaded, time.monotonic() - started)
+        return loaded, time.monotonic() - started
+
+    def reset_sequences(self):
+        sql = self.connection.ops.sequence_reset_sql(no_style(), [self.model])
+        if sql:
+            with self.connection.cursor() as cursor:
+                for statement in sql:
+                    cursor.execute(statement)
 
 
 class Command(BaseCommand):
-    help = 'Fills the database with data from a .csv file'
+    help = 'Fills the database with data from .csv files'
 
     def add_arguments(self, parser):
         parser.add_argument(
             '-a', '--app',
-            required=True,
-            help='takes the lable of the app')
+            default='reviews',
+            help='takes the lable of the app for models without one')
         parser.add_argument(
             '-m', '--model',
+            action='append',
             required=True,
-            help='takes the name of the model class')
+            help='takes the name of the model class, may be repeated')
         parser.add_argument(
             '-f', '--file',
+            action='append',
             required=True,
-            help='accepts a filename with extension')
+            help='accepts a filename with extension, one per model')
+        parser.add_argument(
+            '-d', '--dir',
+            default=None,
+            help='directory with the files, static/data by default')
+        parser.add_argument(
+            '-b', '--batch-size',
+            type=int,
+            default=5000,
+            help='number of rows written per statement')
+        parser.add_argument(
+            '--no-copy',
+            action='store_true',
+            help='use bulk_create even on PostgreSQL')
+        parser.add_argument(
+            '--database',
+            default=DEFAULT_DB_ALIAS,
+            help='database alias to load into')
+
+    def get_jobs(self, options):
+        if len(options['model']) != len(options['file']):
+            raise CommandError('Pass exactly one --file for every --model')
+        data_dir = options['dir'] or get_data_dir()
+        jobs = []
+        for name, file in zip(options['model'], options['file']):
+            app_label, _, model_name = name.rpartition('.')
+            try:
+                model = apps.get_model(app_label or options['app'], model_name)
+            except LookupError as e:
+                raise CommandError(f'{e}')
+            jobs.append((model, os.path.join(data_dir, file)))
+        return sort_by_dependencies(jobs)
 
     def handle(self, *args, **options):
-        try:
-            model = apps.get_model(options['app'], options['model'])
-            insert_data(model, options['file'])
-        except Exception as e:
-            raise CommandError(f'{e}')
-
-        self.stdout.write(
-            self.style.SUCCESS(
-                f'Successfully {model.__name__} filled'
+        jobs = self.get_jobs(options)
+        for model, path in jobs:
+            def report(loaded, elapsed, model=model):
+                self.stdout.write(
+                    f'{model.__name__}: {loaded} rows, '
+                    f'{loaded / max(elapsed, 1e-6):.0f} rows/s'
+                )
+
+            loader = BulkLoader(
+                model,
+                batch_size=options['batch_size'],
+                using=options['database'],
+                use_copy=not options['no_copy'],
+                report=report,
+            )
+            try:
+                loaded, elapsed = loader.load(path)
+                loader.reset_sequences()
+            except CommandError:
+                raise
+            except Exception as e:
+                raise CommandError(f'{e}')
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f'Successfully {model.__name__} filled: {loaded} rows '
+                    f'in {elapsed:.1f}s'
+                )
             )
-        )
+        loaded = {model for model, _ in jobs}
+        # bulk_create и COPY не вызывают сигналы, поэтому рейтинг,
+        # гистограммы оценок и список произведений пересчитываем.
+        if Review in loaded:
+            recalculate_ratings(Title.objects.using(options['database']))
+        if loaded & {Title, Review}:
+            rebuild_scores(Title.objects.using(options['database']))
+        if loaded & LISTING_MODELS:
+            rebuild_title_listing(options['database'])
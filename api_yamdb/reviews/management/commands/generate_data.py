@@ -0,0 +1,178 @@
+import multiprocessing
+import time
+
+from contextlib import contextmanager
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from reviews import synthetic
+from reviews.listing import rebuild_title_listing
+from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
+from reviews.rating import rebuild_scores
+from .dump import DUMP_MODELS
+from .restore import NDJSONLoader
+
+
+@contextmanager
+def generator_map(workers, shared):
+    """
+    `map` для функций генерации: при `workers` больше 1 строки генерируют
+    процессы, а пишет их текущий (у SQLite один писатель). Порядок задач
+    сохраняется, поэтому результат не зависит от числа процессов.
+    """
+    if workers == 1:
+        synthetic.init_worker(shared)
+        yield map
+        return
+    # Дочерние процессы не должны унаследовать открытые соединения.
+    connections.close_all()
+    with multiprocessing.Pool(
+        workers, initializer=synthetic.init_worker, initargs=(shared,)
+    ) as pool:
+        yield pool.imap
+
+
+class Command(BaseCommand):
+    help = (
+        'Generates users, categories, genres, titles, genre links, reviews '
+        'and comments with skewed distributions into an empty database'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10000)
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument('--genres', type=int, default=30)
+        parser.add_argument('--titles', type=int, default=20000)
+        parser.add_argument('--reviews', type=int, default=200000)
+        parser.add_argument('--comments', type=int, default=400000)
+        parser.add_argument(
+            '--skew',
+            type=float,
+            default=1.0,
+            help='Zipf exponent of title, reviewer, category and genre '
+                 'popularity; 0 gives uniform data')
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='the same seed and sizes give the same data')
+        parser.add_argument(
+            '-w', '--workers',
+            type=int,
+            default=1,
+            help='number of processes generating rows')
+        parser.add_argument(
+            '-b', '--batch-size',
+            type=int,
+            default=5000,
+            help='number of rows written per statement')
+        parser.add_argument(
+            '--no-copy',
+            action='store_true',
+            help='use executemany even on PostgreSQL')
+        parser.add_argument(
+            '--database',
+            default=DEFAULT_DB_ALIAS,
+            help='database alias to generate into')
+
+    def check_options(self, options):
+        for name in ('users', 'categories', 'genres', 'titles', 'reviews',
+                     'comments'):
+            if options[name] < 0:
+                raise CommandError(f'--{name} must not be negative')
+        if options['workers'] < 1 or options['batch_size'] < 1:
+            raise CommandError('--workers and --batch-size must be positive')
+        if options['skew'] < 0:
+            raise CommandError('--skew must not be negative')
+        if options['reviews'] > options['titles'] * options['users']:
+            raise CommandError(
+                'Every user reviews a title at most once, so --reviews '
+                'cannot exceed --titles * --users'
+            )
+        if options['comments'] and not options['reviews']:
+            raise CommandError('--comments need --reviews')
+        using = options['database']
+        for label in DUMP_MODELS:
+            model = apps.get_model(label)
+            if model._default_manager.using(using).exists():
+                raise CommandError(
+                    f'{model.__name__} table is not empty, generate_data '
+                    f'expects a fresh database'
+                )
+
+    def handle(self, *args, **options):
+        self.check_options(options)
+        using = options['database']
+        self.batch_size = options['batch_size']
+        self.loaders = {}
+        self.written = {}
+        started = time.monotonic()
+        shared = synthetic.get_shared(
+            options['users'], options['categories'], options['genres'],
+            options['skew'], options['seed'],
+        )
+        for model in (
+            apps.get_model(settings.AUTH_USER_MODEL), Category, Genre,
+            Title, GenreTitle, Review, Comment,
+        ):
+            self.loaders[model] = NDJSONLoader(
+                model,
+                batch_size=self.batch_size,
+                using=using,
+                use_copy=not options['no_copy'],
+            )
+            self.written[model] = 0
+
+        self.write(Category, ('id', 'name', 'slug'), [
+            [i, f'Категория {i}', f'category-{i}']
+            for i in range(1, options['categories'] + 1)
+        ])
+        self.write(Genre, ('id', 'name', 'slug'), [
+            [i, f'Жанр {i}', f'genre-{i}']
+            for i in range(1, options['genres'] + 1)
+        ])
+        user_tasks = synthetic.get_user_tasks(
+            options['users'], options['seed']
+        )
+        title_tasks = synthetic.get_title_tasks(
+            options['titles'], options['reviews'], options['comments'],
+            options['users'], options['skew'], options['seed'],
+        )
+        user_model = apps.get_model(settings.AUTH_USER_MODEL)
+        with generator_map(options['workers'], shared) as imap:
+            for rows in imap(synthetic.generate_users, user_tasks):
+                self.write(user_model, synthetic.USER_FIELDS, rows)
+            for titles, links, reviews, comments in imap(
+                synthetic.generate_titles, title_tasks
+            ):
+                self.write(Title, synthetic.TITLE_FIELDS, titles)
+                self.write(
+                    GenreTitle, synthetic.GENRE_TITLE_FIELDS, links
+                )
+                self.write(Review, synthetic.REVIEW_FIELDS, reviews)
+                self.write(Comment, synthetic.COMMENT_FIELDS, comments)
+
+        for model, loader in self.loaders.items():
+            loader.reset_sequences()
+            self.stdout.write(f'{model.__name__}: {self.written[model]} rows')
+        # Рейтинг посчитан при генерации, а список произведений и
+        # гистограммы оценок собираются по записанным строкам.
+        rebuild_title_listing(using)
+        rebuild_scores(Title.objects.using(using))
+        elapsed = max(time.monotonic() - started, 1e-6)
+        total = sum(self.written.values())
+        self.stdout.write(self.style.SUCCESS(
+            f'Successfully generated {total} rows in {elapsed:.1f}s, '
+            f'{total / elapsed:.0f} rows/s'
+        ))
+
+    def write(self, model, names, rows):
+        loader = self.loaders[model]
+        fields = loader.get_fields(names)
+        for start in range(0, len(rows), self.batch_size):
+            batch = rows[start:start + self.batch_size]
+            loader.write(fields, batch)
+            self.written[model] += len(batch)
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from reviews.listing import rebuild_title_listing
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the denormalized title listing from titles'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database',
+            default=DEFAULT_DB_ALIAS,
+            help='database to rebuild the listing in')
+
+    def handle(self, *args, **options):
+        rebuilt = rebuild_title_listing(options['database'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Successfully {rebuilt} titles rebuilt')
+        )
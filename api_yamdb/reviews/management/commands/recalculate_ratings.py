@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from reviews.rating import rebuild_scores, recalculate_ratings
+
+
+class Command(BaseCommand):
+    help = ('Repairs stored title ratings that drifted from the reviews '
+            'and rebuilds score histograms')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '-b', '--batch-size',
+            type=int,
+            default=1000,
+            help='number of titles updated per statement')
+
+    def handle(self, *args, **options):
+        fixed = recalculate_ratings(batch_size=options['batch_size'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Successfully {fixed} title ratings fixed')
+        )
+        rebuilt = rebuild_scores(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Successfully {rebuilt} score histograms rebuilt'
+        ))
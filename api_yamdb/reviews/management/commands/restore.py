@@ -0,0 +1,199 @@
+import datetime
+import io
+import json
+import time
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from reviews.listing import rebuild_title_listing
+from reviews.models import Title
+from reviews.rating import rebuild_scores
+from .dump import DUMP_MODELS, open_stream
+from .filling import BulkLoader, copy_value
+
+# Значения этих полей из JSON уже годятся для базы как есть.
+PLAIN_FIELDS = {
+    'AutoField', 'BigAutoField', 'IntegerField', 'BigIntegerField',
+    'SmallIntegerField', 'PositiveIntegerField', 'PositiveSmallIntegerField',
+    'CharField', 'TextField', 'SlugField', 'EmailField', 'BooleanField',
+    'FloatField',
+}
+
+# dump пишет даты через isoformat(), их разбор из stdlib в разы быстрее
+# регулярных выражений Django; остальное разбирает to_python поля.
+ISO_PARSERS = {
+    'DateTimeField': datetime.datetime.fromisoformat,
+    'DateField': datetime.date.fromisoformat,
+    'TimeField': datetime.time.fromisoformat,
+}
+
+
+class NDJSONLoader(BulkLoader):
+    """
+    Загрузчик строк дампа без экземпляров моделей: строки вставляются
+    через executemany или COPY, а приводятся только поля, которым это
+    нужно (например, даты).
+    """
+
+    def get_preparer(self, field):
+        target = field.target_field if field.is_relation else field
+        internal_type = target.get_internal_type()
+        if internal_type in PLAIN_FIELDS:
+            return None
+        parse = ISO_PARSERS.get(internal_type, field.to_python)
+
+        def prepare(value):
+            try:
+                value = parse(value)
+            except ValueError:
+                value = field.to_python(value)
+            return field.get_db_prep_save(value, self.connection)
+        return prepare
+
+    def prepare(self, fields, rows):
+        preparers = [self.get_preparer(field) for field in fields]
+        if not any(preparers):
+            return rows
+        return [
+            [
+                value if prepare is None or value is None
+                else prepare(value)
+                for prepare, value in zip(preparers, row)
+            ]
+            for row in rows
+        ]
+
+    def get_columns(self, fields):
+        quote = self.connection.ops.quote_name
+        return quote(self.model._meta.db_table), ', '.join(
+            quote(field.column) for field in fields
+        )
+
+    def insert(self, fields, rows):
+        table, columns = self.get_columns(fields)
+        placeholders = ', '.join(['%s'] * len(fields))
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {table} ({columns}) VALUES ({placeholders})',
+                rows,
+            )
+
+    def copy(self, fields, rows):
+        buffer = io.StringIO()
+        for row in rows:
+            buffer.write('\t'.join(copy_value(value) for value in row))
+            buffer.write('\n')
+        buffer.seek(0)
+        table, columns = self.get_columns(fields)
+        with self.connection.cursor() as cursor:
+            cursor.copy_expert(
+                f'COPY {table} ({columns}) FROM STDIN', buffer
+            )
+
+
+def parse_line(number, line):
+    try:
+        record = json.loads(line)
+    except ValueError as e:
+        raise CommandError(f'Line {number}: {e}')
+    if not isinstance(record, dict):
+        return None, record
+    try:
+        return (apps.get_model(record['model']), record['fields']), None
+    except (KeyError, LookupError) as e:
+        raise CommandError(f'Line {number}: unknown model {e}')
+
+
+def read_sections(stream, batch_size):
+    """
+    Разбирает дамп на пачки `(model, fields, rows)`; в памяти держится
+    не больше одной пачки.
+    """
+    header = None
+    batch = []
+    for number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        new_header, row = parse_line(number, line)
+        if new_header is not None:
+            if batch:
+                yield (*header, batch)
+                batch = []
+            header = new_header
+            continue
+        if header is None:
+            raise CommandError(f'Line {number}: row before a model header')
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield (*header, batch)
+            batch = []
+    if batch:
+        yield (*header, batch)
+
+
+class Command(BaseCommand):
+    help = 'Restores an NDJSON dump made by the dump command'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            help='dump file, "-" for stdin; .gz files are decompressed')
+        parser.add_argument(
+            '--gzip',
+            action='store_true',
+            default=None,
+            help='decompress the input even without the .gz extension')
+        parser.add_argument(
+            '-b', '--batch-size',
+            type=int,
+            default=5000,
+            help='number of rows written per statement')
+        parser.add_argument(
+            '--no-copy',
+            action='store_true',
+            help='use bulk_create even on PostgreSQL')
+        parser.add_argument(
+            '--database',
+            default=DEFAULT_DB_ALIAS,
+            help='database alias to restore into')
+
+    def handle(self, *args, **options):
+        using = options['database']
+        for label in DUMP_MODELS:
+            model = apps.get_model(label)
+            if model._default_manager.using(using).exists():
+                raise CommandError(
+                    f'{model.__name__} table is not empty, restore '
+                    f'expects a fresh database'
+                )
+        loaders = {}
+        started = time.monotonic()
+        with open_stream(options['path'], 'r', options['gzip']) as stream:
+            sections = read_sections(stream, options['batch_size'])
+            for model, names, rows in sections:
+                if model not in loaders:
+                    loaders[model] = [NDJSONLoader(
+                        model,
+                        batch_size=options['batch_size'],
+                        using=using,
+                        use_copy=not options['no_copy'],
+                    ), 0]
+                loader = loaders[model][0]
+                fields = loader.get_fields(names)
+                loader.write(fields, loader.prepare(fields, rows))
+                loaders[model][1] += len(rows)
+        for loader, restored in loaders.values():
+            loader.reset_sequences()
+            self.stdout.write(f'{loader.model.__name__}: {restored} rows')
+        # Список произведений и гистограммы оценок в дамп не входят,
+        # они собираются заново.
+        rebuild_title_listing(using)
+        rebuild_scores(Title.objects.using(using))
+        elapsed = max(time.monotonic() - started, 1e-6)
+        total = sum(restored for _, restored in loaders.values())
+        self.stdout.write(self.style.SUCCESS(
+            f'Successfully restored {total} rows in {elapsed:.1f}s, '
+            f'{total / elapsed:.0f} rows/s'
+        ))
@@ -0,0 +1,22 @@
+from django.db import migrations
+
+from reviews.search import install_search, uninstall_search
+
+
+def install(apps, schema_editor):
+    install_search(schema_editor.connection)
+
+
+def uninstall(apps, schema_editor):
+    uninstall_search(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_title_rating'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
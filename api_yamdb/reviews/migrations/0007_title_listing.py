@@ -0,0 +1,63 @@
+# Generated by Django 2.2.16 on 2026-10-18 04:39
+
+import json
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_listing(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    GenreTitle = apps.get_model('reviews', 'GenreTitle')
+    TitleListing = apps.get_model('reviews', 'TitleListing')
+    genres = {}
+    links = GenreTitle.objects.order_by('id').values_list(
+        'title_id', 'genre_id__name', 'genre_id__slug'
+    )
+    for title_id, name, slug in links.iterator():
+        genres.setdefault(title_id, []).append({'name': name, 'slug': slug})
+    titles = Title.objects.values_list(
+        'id', 'name', 'year', 'description', 'rating',
+        'category_id', 'category__name', 'category__slug',
+    )
+    TitleListing.objects.bulk_create((
+        TitleListing(
+            title_id=pk, name=name, year=year, description=description,
+            rating=rating, category_id=category_id,
+            category_name=category_name, category_slug=category_slug,
+            genres=json.dumps(
+                genres.get(pk, []), ensure_ascii=False, separators=(',', ':')
+            ),
+        )
+        for (pk, name, year, description, rating,
+             category_id, category_name, category_slug) in titles.iterator()
+    ), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleListing',
+            fields=[
+                ('title', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='listing', serialize=False, to='reviews.Title', verbose_name='Произведение')),
+                ('name', models.CharField(max_length=256, verbose_name='Название произведения')),
+                ('year', models.PositiveSmallIntegerField(db_index=True, verbose_name='Год выпуска произведения')),
+                ('description', models.TextField(blank=True, null=True, verbose_name='Описание произведения')),
+                ('rating', models.FloatField(blank=True, null=True, verbose_name='Рейтинг произведения')),
+                ('category_id', models.IntegerField(blank=True, db_index=True, null=True, verbose_name='Id категории')),
+                ('category_name', models.CharField(blank=True, max_length=256, null=True, verbose_name='Имя категории')),
+                ('category_slug', models.SlugField(blank=True, null=True, verbose_name='Slug категории')),
+                ('genres', models.TextField(default='[]', verbose_name='Жанры в JSON')),
+            ],
+            options={
+                'verbose_name': 'Строка списка произведений',
+                'verbose_name_plural': 'Список произведений',
+            },
+        ),
+        migrations.RunPython(fill_listing, migrations.RunPython.noop),
+    ]
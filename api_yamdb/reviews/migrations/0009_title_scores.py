@@ -0,0 +1,52 @@
+# Generated by Django 2.2.16 on 2026-10-18 05:10
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+import django.db.models.deletion
+
+SCORES = range(1, 11)
+
+
+def fill_scores(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    TitleScores = apps.get_model('reviews', 'TitleScores')
+    fields = [f'score_{score}' for score in SCORES]
+    counts = Title.objects.order_by('pk').annotate(**{
+        f'score_{score}': Count('reviews', filter=Q(reviews__score=score))
+        for score in SCORES
+    }).values_list('pk', *fields)
+    TitleScores.objects.bulk_create((
+        TitleScores(title_id=pk, **dict(zip(fields, values)))
+        for pk, *values in counts.iterator()
+    ), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleScores',
+            fields=[
+                ('title', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='scores', serialize=False, to='reviews.Title', verbose_name='Произведение')),
+                ('score_1', models.PositiveIntegerField(default=0, verbose_name='Оценок «1»')),
+                ('score_2', models.PositiveIntegerField(default=0, verbose_name='Оценок «2»')),
+                ('score_3', models.PositiveIntegerField(default=0, verbose_name='Оценок «3»')),
+                ('score_4', models.PositiveIntegerField(default=0, verbose_name='Оценок «4»')),
+                ('score_5', models.PositiveIntegerField(default=0, verbose_name='Оценок «5»')),
+                ('score_6', models.PositiveIntegerField(default=0, verbose_name='Оценок «6»')),
+                ('score_7', models.PositiveIntegerField(default=0, verbose_name='Оценок «7»')),
+                ('score_8', models.PositiveIntegerField(default=0, verbose_name='Оценок «8»')),
+                ('score_9', models.PositiveIntegerField(default=0, verbose_name='Оценок «9»')),
+                ('score_10', models.PositiveIntegerField(default=0, verbose_name='Оценок «10»')),
+            ],
+            options={
+                'verbose_name': 'Оценки произведения',
+                'verbose_name_plural': 'Оценки произведений',
+            },
+        ),
+        migrations.RunPython(fill_scores, migrations.RunPython.noop),
+    ]
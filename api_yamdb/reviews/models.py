@@ -1,5 +1,5 @@
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
 
 from users.models import User
 from .validators import cur_year_validator
@@ -62,7 +62,9 @@ class Title(models.Model):
         Category, on_delete=models.SET_NULL,
         related_name="titles",
         verbose_name='Категория произведения',
-        null=True, blank=True
+        null=True, blank=True,
+        # Поиск по категории идёт по индексу title_category_year.
+        db_index=False
     )
     genre = models.ManyToManyField(
         Genre,
@@ -70,10 +72,31 @@ class Title(models.Model):
         verbose_name='Жанры произведения',
         blank=True
     )
+    rating_sum = models.PositiveIntegerField(
+        'Сумма оценок',
+        default=0,
+        editable=False
+    )
+    rating_count = models.PositiveIntegerField(
+        'Количество оценок',
+        default=0,
+        editable=False
+    )
+    rating = models.FloatField(
+        'Рейтинг произведения',
+        null=True,
+        blank=True,
+        editable=False
+    )
 
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
+        indexes = [
+            models.Index(
+                fields=['category', 'year'], name='title_category_year'
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -91,6 +114,7 @@ class GenreTitle(models.Model):
         on_delete=models.CASCADE,
         related_name="genre",
         verbose_name='Жанр',
+        db_index=False
     )
 
     class Meta:
@@ -102,17 +126,162 @@ class GenreTitle(models.Model):
                 name='unique_title_genre'
             )
         ]
+        # Фильтр по жанру читает id произведений прямо из индекса.
+        indexes = [
+            models.Index(
+                fields=['genre_id', 'title_id'], name='genretitle_genre_title'
+            ),
+        ]
 
     def __str__(self):
         return f'{self.title_id} {self.genre_id}'
 
 
+class TitleListing(models.Model):
+    """
+    Строка списка произведений: поля произведения вместе с категорией
+    и жанрами, уже собранными в одну строку. Поддерживается функциями
+    из `reviews.listing` при каждом изменении произведения, его жанров
+    и категории.
+    """
+    title = models.OneToOneField(
+        Title,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='listing',
+        verbose_name='Произведение'
+    )
+    name = models.CharField(
+        'Название произведения',
+        max_length=256
+    )
+    year = models.PositiveSmallIntegerField(
+        'Год выпуска произведения',
+        db_index=True
+    )
+    description = models.TextField(
+        'Описание произведения',
+        null=True,
+        blank=True
+    )
+    rating = models.FloatField(
+        'Рейтинг произведения',
+        null=True,
+        blank=True
+    )
+    category_id = models.IntegerField(
+        'Id категории',
+        null=True,
+        blank=True,
+        db_index=True
+    )
+    category_name = models.CharField(
+        'Имя категории',
+        max_length=256,
+        null=True,
+        blank=True
+    )
+    category_slug = models.SlugField(
+        'Slug категории',
+        null=True,
+        blank=True,
+        # Фильтр по категории идёт по индексу listing_category_year.
+        db_index=False
+    )
+    genres = models.TextField(
+        'Жанры в JSON',
+        default='[]'
+    )
+
+    class Meta:
+        verbose_name = 'Строка списка произведений'
+        verbose_name_plural = 'Список произведений'
+        indexes = [
+            models.Index(
+                fields=['category_slug', 'year'], name='listing_category_year'
+            ),
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+class TitleScores(models.Model):
+    """
+    Гистограмма оценок произведения: сколько отзывов поставили каждую
+    оценку. Счётчики сдвигаются функциями из `reviews.rating` в той же
+    транзакции, что сохраняет или удаляет отзыв, поэтому статистика
+    произведения читается одной строкой по первичному ключу.
+    """
+    SCORES = range(1, 11)
+
+    title = models.OneToOneField(
+        Title,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='scores',
+        verbose_name='Произведение'
+    )
+    score_1 = models.PositiveIntegerField('Оценок «1»', default=0)
+    score_2 = models.PositiveIntegerField('Оценок «2»', default=0)
+    score_3 = models.PositiveIntegerField('Оценок «3»', default=0)
+    score_4 = models.PositiveIntegerField('Оценок «4»', default=0)
+    score_5 = models.PositiveIntegerField('Оценок «5»', default=0)
+    score_6 = models.PositiveIntegerField('Оценок «6»', default=0)
+    score_7 = models.PositiveIntegerField('Оценок «7»', default=0)
+    score_8 = models.PositiveIntegerField('Оценок «8»', default=0)
+    score_9 = models.PositiveIntegerField('Оценок «9»', default=0)
+    score_10 = models.PositiveIntegerField('Оценок «10»', default=0)
+
+    class Meta:
+        verbose_name = 'Оценки произведения'
+        verbose_name_plural = 'Оценки произведений'
+
+    def __str__(self):
+        return f'{self.title_id}'
+
+    @property
+    def histogram(self):
+        return {
+            score: getattr(self, f'score_{score}') for score in self.SCORES
+        }
+
+    @property
+    def count(self):
+        return sum(self.histogram.values())
+
+    @property
+    def mean(self):
+        count = self.count
+        if not count:
+            return None
+        return sum(
+            score * number for score, number in self.histogram.items()
+        ) / count
+
+    @property
+    def median(self):
+        """Медиана по гистограмме; при чётном количестве — среднее двух."""
+        count = self.count
+        if not count:
+            return None
+        middle = ((count - 1) // 2, count // 2)
+        values = []
+        seen = 0
+        for score, number in self.histogram.items():
+            seen += number
+            while len(values) < 2 and middle[len(values)] < seen:
+                values.append(score)
+        return sum(values) / 2
+
+
 class Review(models.Model):
     title = models.ForeignKey(
         Title,
         on_delete=models.CASCADE,
         related_name='reviews',
-        verbose_name='Произведение'
+        verbose_name='Произведение',
+        db_index=False
     )
     text = models.TextField(
         'Текст отзыва',
@@ -123,7 +292,8 @@ class Review(models.Model):
         User,
         on_delete=models.CASCADE,
         related_name='reviews',
-        verbose_name='Автор отзыва'
+        verbose_name='Автор отзыва',
+        db_index=False
     )
     score = models.PositiveIntegerField(
         'Оценка произведения',
@@ -148,17 +318,39 @@ class Review(models.Model):
                 name='unique_review'
             )
         ]
+        # Отзывы произведения читаются по порядку id, отзывы автора —
+        # по дате.
+        indexes = [
+            models.Index(fields=['title', 'id'], name='review_title_id'),
+            models.Index(
+                fields=['author', 'pub_date'], name='review_author_date'
+            ),
+        ]
 
     def __str__(self):
         return self.text
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Запоминаем загруженные значения, чтобы при сохранении пересчитать
+        # рейтинг по разнице, а не агрегатом по всем отзывам.
+        instance._loaded_title_id = instance.__dict__.get('title_id')
+        instance._loaded_score = instance.__dict__.get('score')
+        return instance
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
 
 class Comment(models.Model):
     review_id = models.ForeignKey(
         Review,
         on_delete=models.CASCADE,
         related_name='comments',
-        verbose_name='Обзор'
+        verbose_name='Обзор',
+        db_index=False
     )
     text = models.TextField(
         'Текст комментария',
@@ -169,7 +361,8 @@ class Comment(models.Model):
         User,
         on_delete=models.CASCADE,
         related_name='comments',
-        verbose_name='Автор комментария'
+        verbose_name='Автор комментария',
+        db_index=False
     )
     pub_date = models.DateTimeField(
         'Дата добавления комментария',
@@ -181,6 +374,12 @@ class Comment(models.Model):
         ordering = ('-pub_date',)
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = [
+            models.Index(fields=['review_id', 'id'], name='comment_review_id'),
+            models.Index(
+                fields=['author', 'pub_date'], name='comment_author_date'
+            ),
+        ]
 
     def __str__(self):
         return self.text
@@ -0,0 +1,134 @@
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import (
+    Case, Count, F, FloatField, OuterRef, Q, Subquery, Sum, Value, When,
+)
+from django.db.models.functions import Cast, Coalesce
+
+from .listing import sync_ratings
+from .models import Review, Title, TitleScores
+
+SCORE_FIELDS = tuple(f'score_{score}' for score in TitleScores.SCORES)
+
+
+def change_rating(title_id, score_delta, count_delta,
+                  using=DEFAULT_DB_ALIAS):
+    """Сдвигает сумму и количество оценок произведения одним UPDATE."""
+    new_sum = F('rating_sum') + score_delta
+    new_count = F('rating_count') + count_delta
+    titles = Title.objects.using(using).filter(pk=title_id)
+    titles.update(
+        rating_sum=new_sum,
+        rating_count=new_count,
+        rating=Case(
+            When(rating_count=-count_delta, then=Value(None)),
+            default=Cast(new_sum, FloatField()) / new_count,
+            output_field=FloatField(),
+        ),
+    )
+    sync_ratings(titles)
+
+
+def recalculate_ratings(titles=None, batch_size=1000):
+    """
+    Сверяет сохранённый рейтинг с отзывами и исправляет расхождения.
+    Возвращает количество исправленных произведений.
+    """
+    if titles is None:
+        titles = Title.objects.all()
+    reviews = Review.objects.filter(
+        title=OuterRef('pk')
+    ).order_by().values('title')
+    drifted = titles.annotate(
+        actual_sum=Coalesce(
+            Subquery(reviews.annotate(total=Sum('score')).values('total')),
+            0
+        ),
+        actual_count=Coalesce(
+            Subquery(reviews.annotate(total=Count('id')).values('total')),
+            0
+        ),
+    ).exclude(
+        rating_sum=F('actual_sum'),
+        rating_count=F('actual_count'),
+    ).only('pk').order_by('pk')
+
+    manager = Title.objects.db_manager(titles.db)
+    fields = ('rating_sum', 'rating_count', 'rating')
+    fixed = 0
+    batch = []
+
+    def save(batch):
+        manager.bulk_update(batch, fields)
+        sync_ratings(manager.filter(pk__in=[title.pk for title in batch]))
+
+    for title in drifted.iterator(chunk_size=batch_size):
+        title.rating_sum = title.actual_sum
+        title.rating_count = title.actual_count
+        title.rating = (
+            title.actual_sum / title.actual_count
+            if title.actual_count else None
+        )
+        batch.append(title)
+        if len(batch) >= batch_size:
+            save(batch)
+            fixed += len(batch)
+            batch = []
+    if batch:
+        save(batch)
+        fixed += len(batch)
+    return fixed
+
+
+def create_scores(title_ids, using=DEFAULT_DB_ALIAS):
+    """Пустые гистограммы оценок для новых произведений."""
+    TitleScores.objects.using(using).bulk_create(
+        [TitleScores(title_id=pk) for pk in title_ids],
+        ignore_conflicts=True,
+    )
+
+
+def change_scores(title_id, removed=None, added=None,
+                  using=DEFAULT_DB_ALIAS):
+    """
+    Переносит оценку отзыва в гистограмме произведения одним UPDATE:
+    `removed` — прежняя оценка, `added` — новая.
+    """
+    if removed == added:
+        return
+    changes = {}
+    if removed is not None:
+        changes[f'score_{removed}'] = F(f'score_{removed}') - 1
+    if added is not None:
+        changes[f'score_{added}'] = F(f'score_{added}') + 1
+    TitleScores.objects.using(using).filter(pk=title_id).update(**changes)
+
+
+def rebuild_scores(titles=None, batch_size=1000):
+    """
+    Пересобирает гистограммы оценок по отзывам: после загрузки данных в
+    обход сигналов и для отзывов, прежняя оценка которых неизвестна.
+    Возвращает количество пересобранных произведений.
+    """
+    if titles is None:
+        titles = Title.objects.all()
+    manager = TitleScores.objects.db_manager(titles.db)
+    counts = titles.order_by('pk').annotate(**{
+        field: Count('reviews', filter=Q(reviews__score=score))
+        for field, score in zip(SCORE_FIELDS, TitleScores.SCORES)
+    }).values_list('pk', *SCORE_FIELDS)
+    rebuilt = 0
+    batch = []
+    with transaction.atomic(using=titles.db):
+        manager.filter(title__in=titles.values('pk')).delete()
+        for pk, *values in counts.iterator(chunk_size=batch_size):
+            batch.append(
+                TitleScores(title_id=pk, **dict(zip(SCORE_FIELDS, values)))
+            )
+            if len(batch) >= batch_size:
+                manager.bulk_create(batch)
+                rebuilt += len(batch)
+                batch = []
+        if batch:
+            manager.bulk_create(batch)
+            rebuilt += len(batch)
+    return rebuilt
@@ -0,0 +1,189 @@
+import re
+
+from django.db import OperationalError, connections
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+from .models import Title
+
+SEARCH_CONFIG = 'russian'
+TITLE_TABLE = Title._meta.db_table
+FTS_TABLE = f'{TITLE_TABLE}_fts'
+
+POSTGRESQL_INSTALL = (
+    f"""
+    ALTER TABLE {TITLE_TABLE} ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(name, '')), 'A')
+        || setweight(
+            to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'B'
+        )
+    ) STORED
+    """,
+    f"""
+    CREATE INDEX IF NOT EXISTS {TITLE_TABLE}_search_vector_gin
+    ON {TITLE_TABLE} USING gin (search_vector)
+    """,
+)
+POSTGRESQL_UNINSTALL = (
+    f'DROP INDEX IF EXISTS {TITLE_TABLE}_search_vector_gin',
+    f'ALTER TABLE {TITLE_TABLE} DROP COLUMN IF EXISTS search_vector',
+)
+
+SQLITE_TABLE = (
+    f"""
+    CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        name, description,
+        content='{TITLE_TABLE}', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+)
+SQLITE_TRIGGERS = (
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert
+    AFTER INSERT ON {TITLE_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete
+    AFTER DELETE ON {TITLE_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update
+    AFTER UPDATE OF name, description ON {TITLE_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+)
+SQLITE_UNINSTALL = (
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_insert',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_delete',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_update',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+)
+
+
+_search_index = {}
+
+
+def execute(connection, statements):
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def install_search(connection):
+    """
+    Создаёт индекс полнотекстового поиска: вычисляемую колонку tsvector
+    с GIN-индексом на PostgreSQL или теневую таблицу FTS5 на SQLite.
+    Повторный вызов безопасен.
+    """
+    _search_index.pop(connection.alias, None)
+    if connection.vendor == 'postgresql':
+        execute(connection, POSTGRESQL_INSTALL)
+    elif connection.vendor == 'sqlite':
+        if FTS_TABLE not in connection.introspection.table_names():
+            try:
+                execute(connection, SQLITE_TABLE)
+            except OperationalError:
+                # SQLite собран без FTS5: поиск работает через LIKE.
+                return
+        # При пересоздании таблицы в миграциях SQLite теряет триггеры,
+        # поэтому они восстанавливаются после каждого migrate.
+        execute(connection, SQLITE_TRIGGERS)
+
+
+def uninstall_search(connection):
+    _search_index.pop(connection.alias, None)
+    if connection.vendor == 'postgresql':
+        execute(connection, POSTGRESQL_UNINSTALL)
+    elif connection.vendor == 'sqlite':
+        execute(connection, SQLITE_UNINSTALL)
+
+
+def has_search_index(connection):
+    if connection.alias not in _search_index:
+        _search_index[connection.alias] = (
+            connection.vendor == 'postgresql'
+            or connection.vendor == 'sqlite'
+            and FTS_TABLE in connection.introspection.table_names()
+        )
+    return _search_index[connection.alias]
+
+
+def search_titles(queryset, query, rank=True):
+    """
+    Фильтрует произведения по словам запроса (каждое слово — префикс)
+    через полнотекстовый индекс. С `rank=True` добавляет аннотацию
+    `search_rank`: чем она больше, тем точнее совпадение. Кроме `Title`
+    подходит queryset модели, первичный ключ которой — id произведения,
+    например `TitleListing`.
+    """
+    words = re.findall(r'\w+', query)
+    connection = connections[queryset.db]
+    if not words or not has_search_index(connection):
+        condition = Q()
+        for word in words:
+            condition &= Q(name__icontains=word)
+        queryset = queryset.filter(condition)
+        if rank:
+            return queryset.annotate(
+                search_rank=Value(0.0, output_field=FloatField())
+            )
+        return queryset
+
+    opts = queryset.model._meta
+    title_id = f'{opts.db_table}.{opts.pk.column}'
+    if connection.vendor == 'postgresql':
+        tsquery = ' & '.join(f'{word}:*' for word in words)
+        match_sql = (
+            f'{TITLE_TABLE}.search_vector '
+            f'@@ to_tsquery(%s::regconfig, %s)'
+        )
+        rank_sql = (
+            f'ts_rank({TITLE_TABLE}.search_vector, '
+            f'to_tsquery(%s::regconfig, %s))'
+        )
+        if queryset.model is not Title:
+            # Колонка search_vector есть только у таблицы произведений.
+            match_sql = (
+                f'{title_id} IN (SELECT id FROM {TITLE_TABLE} '
+                f'WHERE {match_sql})'
+            )
+            rank_sql = (
+                f'SELECT {rank_sql} FROM {TITLE_TABLE} '
+                f'WHERE {TITLE_TABLE}.id = {title_id}'
+            )
+        queryset = queryset.extra(
+            where=[match_sql], params=[SEARCH_CONFIG, tsquery],
+        )
+        rank_params = [SEARCH_CONFIG, tsquery]
+    else:
+        match = ' '.join(f'"{word}"*' for word in words)
+        queryset = queryset.extra(
+            where=[
+                f'{title_id} IN (SELECT rowid FROM {FTS_TABLE} '
+                f'WHERE {FTS_TABLE} MATCH %s)'
+            ],
+            params=[match],
+        )
+        rank_sql = (
+            f'SELECT -rank FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH %s AND rowid = {title_id}'
+        )
+        rank_params = [match]
+    if rank:
+        return queryset.annotate(search_rank=RawSQL(
+            rank_sql, rank_params, output_field=FloatField()
+        ))
+    return queryset
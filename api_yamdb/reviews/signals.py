@@ -0,0 +1,124 @@
+import threading
+
+from django.db.models.signals import (
+    m2m_changed, post_delete, post_save, pre_delete,
+)
+from django.dispatch import receiver
+
+from .listing import refresh_categories, refresh_genres, refresh_titles
+from .models import Category, Genre, GenreTitle, Review, Title
+from .rating import (
+    change_rating, change_scores, create_scores, rebuild_scores,
+    recalculate_ratings,
+)
+
+_state = threading.local()
+
+
+def get_deleted_titles():
+    """Пары (база, pk) произведений, которые удаляются прямо сейчас."""
+    if not hasattr(_state, 'deleted_titles'):
+        _state.deleted_titles = set()
+    return _state.deleted_titles
+
+
+def remember_loaded_values(review):
+    review._loaded_title_id = review.title_id
+    review._loaded_score = review.score
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, created, raw, using, **kwargs):
+    old_title_id = getattr(instance, '_loaded_title_id', None)
+    old_score = getattr(instance, '_loaded_score', None)
+    if raw or (not created and old_title_id is None):
+        # loaddata и сохранение объекта, собранного не из базы: прежняя
+        # оценка неизвестна, поэтому пересчитываем произведение целиком.
+        titles = Title.objects.using(using).filter(pk=instance.title_id)
+        recalculate_ratings(titles)
+        rebuild_scores(titles)
+    elif created:
+        change_rating(instance.title_id, instance.score, 1, using)
+        change_scores(instance.title_id, added=instance.score, using=using)
+    elif old_title_id != instance.title_id:
+        change_rating(old_title_id, -old_score, -1, using)
+        change_rating(instance.title_id, instance.score, 1, using)
+        change_scores(old_title_id, removed=old_score, using=using)
+        change_scores(instance.title_id, added=instance.score, using=using)
+    elif old_score != instance.score:
+        change_rating(instance.title_id, instance.score - old_score, 0, using)
+        change_scores(instance.title_id, old_score, instance.score, using)
+    remember_loaded_values(instance)
+
+
+@receiver(pre_delete, sender=Title)
+def remember_deleted_title(sender, instance, using, **kwargs):
+    get_deleted_titles().add((using, instance.pk))
+
+
+@receiver(post_delete, sender=Title)
+def forget_deleted_title(sender, instance, using, **kwargs):
+    get_deleted_titles().discard((using, instance.pk))
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, using, **kwargs):
+    title_id = getattr(instance, '_loaded_title_id', None) or instance.title_id
+    score = getattr(instance, '_loaded_score', instance.score)
+    # Отзывы удаляются каскадом вместе с произведением: его рейтинг и
+    # гистограмму оценок пересчитывать незачем.
+    if (using, title_id) in get_deleted_titles():
+        return
+    change_rating(title_id, -score, -1, using)
+    change_scores(title_id, removed=score, using=using)
+
+
+@receiver(post_save, sender=Title)
+def refresh_listing_on_title_save(sender, instance, using, **kwargs):
+    refresh_titles([instance.pk], using)
+
+
+@receiver(post_save, sender=Title)
+def create_scores_on_title_save(sender, instance, created, using, **kwargs):
+    if created:
+        create_scores([instance.pk], using)
+
+
+@receiver(post_save, sender=GenreTitle)
+@receiver(post_delete, sender=GenreTitle)
+def refresh_listing_on_link_change(sender, instance, using, **kwargs):
+    # Связи удаляются каскадом вместе с произведением: его строку списка
+    # нельзя собирать заново.
+    if (using, instance.title_id_id) not in get_deleted_titles():
+        refresh_titles([instance.title_id_id], using)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def refresh_listing_on_genres_change(sender, instance, action, reverse,
+                                     pk_set, using, **kwargs):
+    if not reverse:
+        if action.startswith('post_'):
+            refresh_titles([instance.pk], using)
+    elif action == 'pre_clear':
+        # После очистки уже не узнать, у каких произведений был жанр.
+        instance._cleared_title_ids = list(GenreTitle.objects.using(
+            using
+        ).filter(genre_id=instance).values_list('title_id', flat=True))
+    elif action == 'post_clear':
+        refresh_titles(instance.__dict__.pop('_cleared_title_ids', []), using)
+    elif action in ('post_add', 'post_remove'):
+        refresh_titles(pk_set, using)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def refresh_listing_on_category_change(sender, instance, using, **kwargs):
+    if not kwargs.get('created'):
+        refresh_categories([instance.pk], using)
+
+
+@receiver(post_save, sender=Genre)
+def refresh_listing_on_genre_save(sender, instance, created, using,
+                                  **kwargs):
+    if not created:
+        refresh_genres([instance.pk], using)
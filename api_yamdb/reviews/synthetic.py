@@ -0,0 +1,266 @@
+"""
+Генерация синтетических данных для команды `generate_data`. Модуль не
+обращается к Django, поэтому его функции выполняются и в процессах-
+воркерах. Строки возвращаются списками значений в порядке `*_FIELDS`,
+готовыми для записи в базу.
+"""
+import itertools
+import random
+
+from datetime import datetime, timedelta
+
+USER_FIELDS = (
+    'id', 'username', 'email', 'password', 'first_name', 'last_name', 'bio',
+    'role', 'is_superuser', 'is_staff', 'is_active', 'date_joined',
+)
+TITLE_FIELDS = (
+    'id', 'name', 'year', 'description', 'category', 'rating_sum',
+    'rating_count', 'rating',
+)
+GENRE_TITLE_FIELDS = ('title_id', 'genre_id')
+REVIEW_FIELDS = ('id', 'title', 'author', 'text', 'score', 'pub_date')
+COMMENT_FIELDS = ('id', 'review_id', 'author', 'text', 'pub_date')
+
+# Даты и годы не зависят от дня запуска, иначе зерно не воспроизводило
+# бы данные. Даты пишутся строками в UTC без смещения: так их хранит
+# Django на SQLite, а соединение PostgreSQL при USE_TZ работает в UTC.
+START = datetime(2015, 1, 1)
+PERIOD = int((datetime(2025, 1, 1) - START).total_seconds())
+CORPUS_SIZE = 100000
+YEARS = (1920, 2024)
+MODERATOR_SHARE = 0.01
+MAX_GENRES = 3
+# Размер задачи не зависит от числа воркеров, поэтому и данные от него
+# не зависят. Задача с произведениями кончается на TITLE_CHUNK
+# произведениях или CHUNK_ROWS отзывах и комментариях.
+USER_CHUNK = 10000
+TITLE_CHUNK = 1000
+CHUNK_ROWS = 20000
+
+WORDS = (
+    'время', 'жизнь', 'день', 'рука', 'работа', 'слово', 'место', 'лицо',
+    'друг', 'глаз', 'вопрос', 'дом', 'сторона', 'страна', 'мир', 'случай',
+    'голова', 'ребёнок', 'сила', 'конец', 'вид', 'система', 'часть', 'город',
+    'отношение', 'женщина', 'деньги', 'земля', 'машина', 'вода', 'отец',
+    'проблема', 'час', 'право', 'нога', 'решение', 'дверь', 'образ',
+    'история', 'власть', 'закон', 'война', 'бог', 'голос', 'тысяча', 'книга',
+    'возможность', 'результат', 'ночь', 'стол', 'имя', 'область', 'статья',
+    'число', 'компания', 'народ', 'жена', 'группа', 'развитие', 'процесс',
+    'суд', 'условие', 'средство', 'начало', 'свет', 'пора', 'путь', 'душа',
+    'уровень', 'форма', 'связь', 'минута', 'улица', 'вечер', 'качество',
+    'мысль', 'дорога', 'мать', 'действие', 'месяц', 'государство', 'язык',
+    'любовь', 'взгляд', 'мама', 'играть', 'смотреть', 'новый', 'старый',
+    'большой', 'хороший', 'главный', 'последний', 'русский', 'великий',
+    'молодой', 'тёмный', 'светлый', 'странный', 'тихий', 'громкий',
+)
+
+_shared = {}
+
+
+def zipf_weights(count, exponent, rng):
+    """
+    Накопленные веса закона Ципфа для `count` элементов в случайном
+    порядке: популярные элементы разбросаны по всему диапазону id.
+    При `exponent` 0 распределение равномерное.
+    """
+    weights = [1 / rank ** exponent for rank in range(1, count + 1)]
+    rng.shuffle(weights)
+    return list(itertools.accumulate(weights))
+
+
+def spread(total, cum_weights, rng, limit=None, step=1 << 20):
+    """
+    Раскладывает `total` событий по элементам пропорционально весам, не
+    больше `limit` на элемент: излишек отдаётся следующим элементам.
+    """
+    counts = [0] * len(cum_weights)
+    population = range(len(cum_weights))
+    for start in range(0, total, step):
+        for index in rng.choices(
+            population, cum_weights=cum_weights, k=min(step, total - start)
+        ):
+            counts[index] += 1
+    if limit is None:
+        return counts
+    excess = 0
+    for index, count in enumerate(counts):
+        if count > limit:
+            excess += count - limit
+            counts[index] = limit
+    for index, count in enumerate(counts):
+        if not excess:
+            break
+        extra = min(limit - count, excess)
+        counts[index] += extra
+        excess -= extra
+    return counts
+
+
+def pick(rng, cum_weights):
+    return rng.choices(range(len(cum_weights)), cum_weights=cum_weights)[0]
+
+
+def sample_distinct(rng, cum_weights, k):
+    """`k` разных индексов с вероятностью по весам."""
+    population = range(len(cum_weights))
+    if k * 2 > len(cum_weights):
+        return sorted(rng.sample(population, k))
+    chosen = set()
+    while len(chosen) < k:
+        chosen.update(rng.choices(
+            population, cum_weights=cum_weights, k=k - len(chosen)
+        ))
+    return sorted(chosen)
+
+
+def uniform(rng, low, high):
+    """Целое от `low` до `high` включительно, быстрее `randint`."""
+    return low + int(rng.random() * (high - low + 1))
+
+
+def text(rng, low, high):
+    """
+    Текст из случайного отрезка общего корпуса: два вызова генератора
+    вместо одного на слово.
+    """
+    corpus = _shared['corpus']
+    size = uniform(rng, low, high)
+    start = uniform(rng, 0, len(corpus) - size)
+    return ' '.join(corpus[start:start + size]).capitalize() + '.'
+
+
+def moment(rng, after=0):
+    seconds = uniform(rng, after, PERIOD)
+    return str(START + timedelta(seconds=seconds)), seconds
+
+
+def get_shared(users, categories, genres, skew, seed):
+    rng = random.Random(f'{seed}:weights')
+    return {
+        'authors': zipf_weights(users, skew, rng),
+        'categories': zipf_weights(categories, skew, rng),
+        'genres': zipf_weights(genres, skew, rng),
+        'corpus': rng.choices(WORDS, k=CORPUS_SIZE),
+    }
+
+
+def get_user_tasks(users, seed):
+    return [
+        (f'{seed}:users:{start}', start + 1, min(USER_CHUNK, users - start))
+        for start in range(0, users, USER_CHUNK)
+    ]
+
+
+def get_title_tasks(titles, reviews, comments, users, skew, seed):
+    """
+    Заранее раскладывает отзывы по произведениям (популярные получают
+    больше, но не больше одного отзыва от пользователя) и комментарии
+    пропорционально отзывам; id отзывов и комментариев задач идут
+    подряд.
+    """
+    rng = random.Random(f'{seed}:counts')
+    review_counts = spread(
+        reviews, zipf_weights(titles, skew, rng), rng, limit=users
+    )
+    comment_counts = spread(
+        comments, list(itertools.accumulate(review_counts)), rng
+    ) if comments else [0] * titles
+    tasks = []
+    review_id = comment_id = 1
+    start = 0
+    while start < titles:
+        end = start
+        rows = 0
+        while end < titles and end - start < TITLE_CHUNK and (
+            rows < CHUNK_ROWS or end == start
+        ):
+            rows += review_counts[end] + comment_counts[end]
+            end += 1
+        tasks.append((
+            f'{seed}:titles:{start}', start + 1, review_counts[start:end],
+            comment_counts[start:end], review_id, comment_id,
+        ))
+        review_id += sum(review_counts[start:end])
+        comment_id += sum(comment_counts[start:end])
+        start = end
+    return tasks
+
+
+def init_worker(shared):
+    """
+    Данные, общие для всех задач (`get_shared`): накопленные веса
+    авторов, категорий и жанров и корпус слов. Передаются воркеру один
+    раз.
+    """
+    _shared.clear()
+    _shared.update(shared)
+
+
+def generate_users(task):
+    seed, first_id, count = task
+    rng = random.Random(seed)
+    rows = []
+    for user_id in range(first_id, first_id + count):
+        joined, _ = moment(rng)
+        role = 'moderator' if rng.random() < MODERATOR_SHARE else 'user'
+        bio = text(rng, 5, 20) if rng.random() < 0.3 else ''
+        rows.append([
+            user_id, f'user{user_id}', f'user{user_id}@yamdb.fake', None,
+            '', '', bio, role, False, False, True, joined,
+        ])
+    return rows
+
+
+def generate_titles(task):
+    """
+    Произведения с жанрами, отзывами и комментариями. У каждого отзыва
+    свой автор (ограничение `unique_review`), рейтинг считается сразу.
+    """
+    seed, first_id, review_counts, comment_counts, review_id, comment_id = (
+        task
+    )
+    rng = random.Random(seed)
+    authors = _shared['authors']
+    titles, links, reviews, comments = [], [], [], []
+    for offset, (review_count, comment_count) in enumerate(
+        zip(review_counts, comment_counts)
+    ):
+        title_id = first_id + offset
+        category = (
+            pick(rng, _shared['categories']) + 1
+            if _shared['categories'] else None
+        )
+        for genre in sample_distinct(
+            rng, _shared['genres'],
+            min(uniform(rng, 1, MAX_GENRES), len(_shared['genres'])),
+        ):
+            links.append([title_id, genre + 1])
+        quality = rng.gauss(6.5, 1.5)
+        scores = []
+        dates = []
+        first_review = review_id
+        for author in sample_distinct(rng, authors, review_count):
+            score = min(max(round(rng.gauss(quality, 2)), 1), 10)
+            pub_date, seconds = moment(rng)
+            reviews.append([
+                review_id, title_id, author + 1, text(rng, 10, 60), score,
+                pub_date,
+            ])
+            scores.append(score)
+            dates.append(seconds)
+            review_id += 1
+        for _ in range(comment_count):
+            index = uniform(rng, 0, review_count - 1)
+            pub_date, _ = moment(rng, dates[index])
+            comments.append([
+                comment_id, first_review + index, pick(rng, authors) + 1,
+                text(rng, 3, 30), pub_date,
+            ])
+            comment_id += 1
+        total = sum(scores)
+        titles.append([
+            title_id, text(rng, 1, 4)[:-1], uniform(rng, *YEARS),
+            text(rng, 10, 40), category, total, len(scores),
+            total / len(scores) if scores else None,
+        ])
+    return titles, links, reviews, comments
@@ -1,5 +1,5 @@
+from django.core.exceptions import ValidationError
 from django.utils import timezone
-from rest_framework.serializers import ValidationError
 
 
 def cur_year_validator(value):
@@ -1,5 +1,12 @@
 from django.contrib import admin
 
-from .models import User
+from .models import OutboxEmail, User
 
 admin.site.register(User)
+
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ('recipient', 'subject', 'created', 'attempts', 'sent')
+    list_filter = ('sent',)
+    search_fields = ('recipient',)
@@ -0,0 +1,79 @@
+import time
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from users.outbox import MAX_ATTEMPTS, MAX_BACKOFF, send_batch
+
+
+class Command(BaseCommand):
+    help = 'Sends queued emails from the outbox in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '-b', '--batch-size',
+            type=int,
+            default=100,
+            help='number of emails sent over one connection')
+        parser.add_argument(
+            '--max-attempts',
+            type=int,
+            default=MAX_ATTEMPTS,
+            help='give up on an email after this many failures')
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='keep polling the outbox instead of exiting when empty')
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=1.0,
+            help='seconds to wait when the outbox is empty')
+        parser.add_argument(
+            '--database',
+            default=DEFAULT_DB_ALIAS,
+            help='database alias with the outbox')
+
+    def drain(self, options):
+        sent = failed = 0
+        try:
+            while True:
+                batch_sent, batch_failed = send_batch(
+                    batch_size=options['batch_size'],
+                    max_attempts=options['max_attempts'],
+                    connection=self.connection,
+                    using=options['database'],
+                )
+                sent += batch_sent
+                failed += batch_failed
+                if batch_sent + batch_failed < options['batch_size']:
+                    return sent, failed
+        finally:
+            self.connection.close()
+
+    def handle(self, *args, **options):
+        self.connection = get_connection()
+        delay = options['interval']
+        while True:
+            started = time.monotonic()
+            try:
+                sent, failed = self.drain(options)
+            except Exception as e:
+                # Почтовый сервер недоступен: ждём дольше с каждой ошибкой.
+                if not options['loop']:
+                    raise
+                self.stderr.write(f'Sending failed: {e!r}, retry in {delay}s')
+                time.sleep(delay)
+                delay = min(delay * 2, MAX_BACKOFF)
+                continue
+            delay = options['interval']
+            elapsed = time.monotonic() - started
+            if sent or failed or not options['loop']:
+                self.stdout.write(self.style.SUCCESS(
+                    f'Successfully {sent} emails sent, {failed} failed, '
+                    f'{sent / max(elapsed, 1e-6):.0f} emails/s'
+                ))
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 
 
 class User(AbstractUser):
@@ -38,7 +39,44 @@ class User(AbstractUser):
     def is_moderator(self):
         return self.role == self.MODERATOR
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_username = instance.__dict__.get('username')
+        return instance
+
     def save(self, *args, **kwargs):
         if self.role == self.ADMIN:
             self.is_staff = True
         super().save(*args, **kwargs)
+
+
+class OutboxEmail(models.Model):
+    """Письмо, ожидающее отправки воркером `send_emails`."""
+    subject = models.CharField('Тема', max_length=255)
+    body = models.TextField('Текст')
+    from_email = models.CharField('Отправитель', max_length=254)
+    recipient = models.EmailField('Получатель')
+    created = models.DateTimeField('Создано', auto_now_add=True)
+    next_attempt = models.DateTimeField(
+        'Следующая попытка',
+        default=timezone.now,
+    )
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    sent = models.DateTimeField('Отправлено', null=True, blank=True)
+
+    class Meta:
+        ordering = ('id',)
+        verbose_name = 'Письмо в очереди'
+        verbose_name_plural = 'Очередь писем'
+        indexes = (
+            models.Index(
+                fields=('next_attempt',),
+                name='users_outbox_pending_idx',
+                condition=models.Q(sent__isnull=True),
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.recipient}: {self.subject}'
@@ -0,0 +1,93 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connections, transaction
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+RETRY_BACKOFF = getattr(settings, 'OUTBOX_RETRY_BACKOFF', 30)
+MAX_BACKOFF = getattr(settings, 'OUTBOX_MAX_BACKOFF', 3600)
+MAX_ATTEMPTS = getattr(settings, 'OUTBOX_MAX_ATTEMPTS', 5)
+
+
+def enqueue_email(subject, message, recipient, from_email=None):
+    """Кладёт письмо в очередь; отправит его команда `send_emails`."""
+    return OutboxEmail.objects.create(
+        subject=subject,
+        body=message,
+        from_email=from_email or settings.ADMIN_EMAIL,
+        recipient=recipient,
+    )
+
+
+def get_backoff(attempts):
+    """Пауза перед следующей попыткой растёт вдвое с каждой неудачей."""
+    return timedelta(
+        seconds=min(RETRY_BACKOFF * 2 ** (attempts - 1), MAX_BACKOFF)
+    )
+
+
+def deliver(emails, connection, now):
+    """Отправляет письма по одному соединению, не прерываясь на ошибках."""
+    sent = []
+    failed = []
+    for email in emails:
+        message = EmailMessage(
+            subject=email.subject,
+            body=email.body,
+            from_email=email.from_email,
+            to=[email.recipient],
+            connection=connection,
+        )
+        try:
+            message.send()
+        except Exception as error:
+            email.attempts += 1
+            email.last_error = repr(error)
+            email.next_attempt = now + get_backoff(email.attempts)
+            failed.append(email)
+        else:
+            sent.append(email.pk)
+    return sent, failed
+
+
+def send_batch(batch_size=100, max_attempts=MAX_ATTEMPTS, connection=None,
+               using='default'):
+    """
+    Отправляет пачку писем, срок которых подошёл, через одно соединение
+    с почтовым сервером: переданное `connection` остаётся открытым для
+    следующих пачек. Неудачные письма откладываются с растущей паузой,
+    после `max_attempts` попыток они остаются в очереди неотправленными.
+    Возвращает пару `(отправлено, ошибок)`.
+    """
+    now = timezone.now()
+    with transaction.atomic(using=using):
+        pending = OutboxEmail.objects.using(using).filter(
+            sent__isnull=True,
+            next_attempt__lte=now,
+            attempts__lt=max_attempts,
+        ).order_by('next_attempt', 'id')
+        if connections[using].features.has_select_for_update_skip_locked:
+            # Несколько воркеров разбирают очередь, не мешая друг другу.
+            pending = pending.select_for_update(skip_locked=True)
+        emails = list(pending[:batch_size])
+        if not emails:
+            return 0, 0
+
+        if connection is None:
+            with get_connection() as connection:
+                sent, failed = deliver(emails, connection, now)
+        else:
+            # Уже открытое соединение повторно не открывается.
+            connection.open()
+            sent, failed = deliver(emails, connection, now)
+
+        OutboxEmail.objects.using(using).filter(pk__in=sent).update(
+            sent=timezone.now(), last_error=''
+        )
+        OutboxEmail.objects.using(using).bulk_update(
+            failed, ('attempts', 'last_error', 'next_attempt')
+        )
+    return len(sent), len(failed)
@@ -0,0 +1,216 @@
+"""
+Сравнение режимов запуска API: синхронный воркер gunicorn (WSGI) против
+воркера uvicorn (ASGI, api_yamdb.asgi). В каждом режиме поднимается один
+воркер на временной базе SQLite, после чего измеряются:
+
+* сколько открытых «медленных» соединений воркер держит, продолжая
+  отвечать на обычные запросы;
+* пропускная способность и задержки при параллельных GET-запросах.
+
+Запуск из корня репозитория:
+
+    python benchmarks/asgi_concurrency.py --connections 200 --concurrency 50
+"""
+import argparse
+import http.client
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECT = os.path.join(ROOT, 'api_yamdb')
+
+MODES = {
+    'wsgi': 'api_yamdb.wsgi:application',
+    'asgi': 'api_yamdb.asgi:application',
+}
+
+SEED = """
+from reviews.listing import rebuild_title_listing
+from reviews.models import Category, Title
+category = Category.objects.create(name='Фильм', slug='film')
+titles = []
+for i in range({count}):
+    titles.append(
+        Title(name=f'Произведение {i}', year=2000, category=category)
+    )
+Title.objects.bulk_create(titles)
+rebuild_title_listing()
+"""
+
+
+def prepare_database(env, titles):
+    manage = [sys.executable, 'manage.py']
+    subprocess.run(
+        manage + ['migrate', '-v', '0'], cwd=PROJECT, env=env, check=True
+    )
+    subprocess.run(
+        manage + ['shell', '-c', SEED.replace('{count}', str(titles))],
+        cwd=PROJECT, env=env, check=True,
+    )
+
+
+def start_server(mode, port, env, asgi_worker):
+    command = [
+        sys.executable, '-m', 'gunicorn.app.wsgiapp', MODES[mode],
+        '--bind', f'127.0.0.1:{port}', '--workers', '1',
+        '--timeout', '120', '--log-level', 'warning',
+    ]
+    if mode == 'asgi':
+        command += ['--worker-class', asgi_worker]
+    server = subprocess.Popen(command, cwd=PROJECT, env=env)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError(f'Сервер {mode} не запустился')
+
+
+def get(port, path, timeout):
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=timeout)
+    try:
+        started = time.monotonic()
+        connection.request('GET', path)
+        response = connection.getresponse()
+        response.read()
+        return response.status, time.monotonic() - started
+    finally:
+        connection.close()
+
+
+def open_slow_connection(port):
+    """Клиент, который начал запрос, но не дослал заголовки."""
+    sock = socket.create_connection(('127.0.0.1', port), timeout=5)
+    sock.sendall(b'GET /api/v1/titles/ HTTP/1.1\r\nHost: localhost\r\n')
+    return sock
+
+
+def held_connections(port, path, limit, step, probe_timeout):
+    """
+    Наращивает число медленных соединений, пока воркер отвечает на пробный
+    запрос за `probe_timeout` секунд. Возвращает последнее удачное число.
+    """
+    sockets = []
+    held = 0
+    try:
+        while len(sockets) < limit:
+            for _ in range(step):
+                sockets.append(open_slow_connection(port))
+            try:
+                status, _ = get(port, path, probe_timeout)
+            except (OSError, http.client.HTTPException):
+                break
+            if status != 200:
+                break
+            held = len(sockets)
+    finally:
+        for sock in sockets:
+            sock.close()
+    return held
+
+
+def load(port, path, requests, concurrency):
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    remaining = iter(range(requests))
+
+    def worker():
+        while True:
+            with lock:
+                if next(remaining, None) is None:
+                    return
+            try:
+                status, elapsed = get(port, path, 60)
+            except (OSError, http.client.HTTPException) as error:
+                errors.append(error)
+                continue
+            if status != 200:
+                errors.append(status)
+                continue
+            latencies.append(elapsed)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+    latencies.sort()
+    return {
+        'rps': len(latencies) / elapsed,
+        'p50': statistics.median(latencies) * 1000 if latencies else 0,
+        'p95': (
+            latencies[int(len(latencies) * 0.95) - 1] * 1000
+            if latencies else 0
+        ),
+        'errors': len(errors),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--path', default='/api/v1/titles/')
+    parser.add_argument('--connections', type=int, default=200)
+    parser.add_argument('--step', type=int, default=10)
+    parser.add_argument('--probe-timeout', type=float, default=2.0)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--titles', type=int, default=100)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument(
+        '--asgi-worker', default='uvicorn.workers.UvicornWorker',
+        help='gunicorn worker class used for the asgi mode',
+    )
+    parser.add_argument(
+        '--modes', nargs='+', choices=MODES, default=list(MODES)
+    )
+    options = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        env = dict(
+            os.environ,
+            DB_ENGINE='django.db.backends.sqlite3',
+            DB_NAME=os.path.join(directory, 'benchmark.sqlite3'),
+            API_CACHE_TIMEOUT='0',
+        )
+        prepare_database(env, options.titles)
+        print(
+            f'{"режим":<6}{"соединений":>12}{"rps":>10}'
+            f'{"p50, мс":>10}{"p95, мс":>10}{"ошибок":>8}', flush=True,
+        )
+        for mode in options.modes:
+            server = start_server(
+                mode, options.port, env, options.asgi_worker
+            )
+            try:
+                held = held_connections(
+                    options.port, options.path, options.connections,
+                    options.step, options.probe_timeout,
+                )
+                result = load(
+                    options.port, options.path,
+                    options.requests, options.concurrency,
+                )
+            finally:
+                server.terminate()
+                server.wait()
+            print(
+                f'{mode:<6}{held:>12}{result["rps"]:>10.1f}'
+                f'{result["p50"]:>10.1f}{result["p95"]:>10.1f}'
+                f'{result["errors"]:>8}', flush=True,
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,515 @@
+"""
+Прогон всех маршрутов из api/urls.py через тестовый клиент DRF на базе
+SQLite в памяти с данными заданного размера. Для каждой точки считаются
+задержки p50/p95/p99, число SQL-запросов и размер ответа. Результаты
+сохраняются в JSON, а с `--compare` сравниваются с прошлым прогоном: рост
+p95 больше чем в `--threshold` раз или рост числа запросов считается
+регрессией, и скрипт завершается с кодом 1.
+
+Запуск из корня репозитория:
+
+    python benchmarks/endpoints.py --titles 1000 --iterations 100
+    python benchmarks/endpoints.py --compare benchmarks/results/base.json
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+
+from collections import namedtuple
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECT = os.path.join(ROOT, 'api_yamdb')
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+BULK_ITEMS = 50
+CLIENTS = ('anon', 'user', 'admin')
+
+# prepare(i) вызывается вне замера и возвращает kwargs маршрута, тело
+# (`data`) и параметры строки запроса (`query`) для i-го повтора.
+Endpoint = namedtuple('Endpoint', 'name route method client prepare')
+
+
+def setup_django():
+    sys.path.insert(0, PROJECT)
+    os.environ['DJANGO_SETTINGS_MODULE'] = 'api_yamdb.settings'
+    os.environ['DB_ENGINE'] = 'django.db.backends.sqlite3'
+    os.environ['DB_NAME'] = ':memory:'
+    import django
+
+    from django.core.management import call_command
+
+    django.setup()
+    call_command('migrate', verbosity=0)
+    # Регистрация и токен повторяются сотни раз с одного адреса: лимиты
+    # поднимаются, но сами ограничения остаются в замере.
+    from django.conf import settings
+    from django.test.utils import override_settings
+
+    override_settings(REST_FRAMEWORK={
+        **settings.REST_FRAMEWORK,
+        'DEFAULT_THROTTLE_RATES': {
+            scope: '1000000/min'
+            for scope in settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']
+        },
+    }).enable()
+
+
+def seed(titles, reviews, comments, users):
+    """
+    Заполняет базу: у каждого произведения два жанра и `reviews` отзывов
+    разных авторов, у каждого отзыва `comments` комментариев. Первый
+    пользователь — автор первого отзыва и комментария везде.
+    """
+    from django.contrib.auth import get_user_model
+
+    from reviews.listing import rebuild_title_listing
+    from reviews.models import (
+        Category, Comment, Genre, GenreTitle, Review, Title,
+    )
+    from reviews.rating import rebuild_scores, recalculate_ratings
+
+    user_model = get_user_model()
+    user_model.objects.bulk_create([
+        user_model(username=f'user{i}', email=f'user{i}@yamdb.fake')
+        for i in range(max(users, reviews, comments, 1))
+    ])
+    authors = list(user_model.objects.order_by('id'))
+    Category.objects.bulk_create([
+        Category(name=f'Категория {i}', slug=f'category-{i}')
+        for i in range(10)
+    ])
+    categories = list(Category.objects.order_by('id'))
+    Genre.objects.bulk_create([
+        Genre(name=f'Жанр {i}', slug=f'genre-{i}') for i in range(20)
+    ])
+    genres = list(Genre.objects.order_by('id'))
+    Title.objects.bulk_create([
+        Title(
+            name=f'Произведение {i}', year=1950 + i % 70,
+            description=f'Описание произведения {i}. ' * 5,
+            category=categories[i % len(categories)],
+        )
+        for i in range(titles)
+    ])
+    title_list = list(Title.objects.order_by('id'))
+    GenreTitle.objects.bulk_create([
+        GenreTitle(title_id=title, genre_id=genres[(i + step) % len(genres)])
+        for i, title in enumerate(title_list) for step in (0, 7)
+    ])
+    Review.objects.bulk_create([
+        Review(
+            title=title, author=authors[j], score=(i + j) % 10 + 1,
+            text=f'Отзыв {j} на произведение {i}. ' * 5,
+        )
+        for i, title in enumerate(title_list) for j in range(reviews)
+    ])
+    Comment.objects.bulk_create([
+        Comment(
+            review_id=review, author=authors[k],
+            text=f'Комментарий {k} к отзыву {review.pk}.',
+        )
+        for review in Review.objects.order_by('id').iterator()
+        for k in range(comments)
+    ])
+    recalculate_ratings()
+    rebuild_scores()
+    rebuild_title_listing()
+
+    admin = user_model.objects.create(
+        username='bench-admin', email='bench-admin@yamdb.fake', role='admin'
+    )
+    title = title_list[0]
+    review = Review.objects.filter(title=title, author=authors[0]).first()
+    return {
+        'user': authors[0],
+        'admin': admin,
+        'title': title,
+        'titles': [obj.pk for obj in title_list[:BULK_ITEMS]],
+        'review': review,
+        'comment': Comment.objects.filter(
+            review_id=review, author=authors[0]
+        ).first(),
+    }
+
+
+def get_clients(dataset):
+    from rest_framework.test import APIClient
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    clients = {}
+    for name in CLIENTS:
+        client = APIClient()
+        if name in dataset:
+            client.credentials(HTTP_AUTHORIZATION=(
+                f'Bearer {AccessToken.for_user(dataset[name])}'
+            ))
+        clients[name] = client
+    return clients
+
+
+def get_endpoints(dataset):
+    """Сценарии для каждого маршрута api/urls.py."""
+    from django.contrib.auth import get_user_model
+
+    from api.tokens import default_token_generator
+    from reviews.models import Category, Comment, Genre, Review, Title
+
+    user_model = get_user_model()
+    user = dataset['user']
+    title = dataset['title']
+    review = dataset['review']
+    comment = dataset['comment']
+    title_kwargs = {'title_id': title.pk}
+    review_kwargs = {'title_id': title.pk, 'review_id': review.pk}
+
+    def fixed(**request):
+        return lambda i: request
+
+    def new_title(i):
+        return Title.objects.create(
+            name=f'Новое произведение {i}', year=2000,
+            category=title.category,
+        )
+
+    def new_user(i):
+        return user_model.objects.create(
+            username=f'new{i}', email=f'new{i}@yamdb.fake'
+        )
+
+    def get_review_kwargs(new):
+        return {'title_id': new.title_id, 'pk': new.pk}
+
+    def get_token_data(i):
+        new = new_user(i)
+        code = default_token_generator.make_token(new)
+        return {'data': {'username': new.username, 'confirmation_code': code}}
+
+    endpoints = [Endpoint('api-root', 'api-root', 'get', 'user', fixed())]
+    for name, model in (('category', Category), ('genre', Genre)):
+        endpoints += [
+            Endpoint(f'{name}-list', f'{name}-list', 'get', 'user',
+                     fixed()),
+            Endpoint(f'{name}-list:anon', f'{name}-list', 'get', 'anon',
+                     fixed()),
+            Endpoint(f'{name}-list:search', f'{name}-list', 'get', 'user',
+                     fixed(query={'search': '7'})),
+            Endpoint(f'{name}-create', f'{name}-list', 'post', 'admin',
+                     lambda i: {'data': {
+                         'name': f'Новый {i}', 'slug': f'new-{i}'
+                     }}),
+            Endpoint(f'{name}-destroy', f'{name}-detail', 'delete', 'admin',
+                     lambda i, model=model: {'kwargs': {
+                         'slug': model.objects.create(
+                             name=f'Удаляемый {i}', slug=f'delete-{i}'
+                         ).slug
+                     }}),
+            Endpoint(f'{name}-bulk', f'{name}-bulk', 'post', 'admin',
+                     lambda i: {'data': [
+                         {'name': f'Пачка {i}', 'slug': f'bulk-{i}-{j}'}
+                         for j in range(BULK_ITEMS)
+                     ]}),
+        ]
+    endpoints += [
+        Endpoint('titles-list', 'titles-list', 'get', 'user', fixed()),
+        Endpoint('titles-list:anon', 'titles-list', 'get', 'anon', fixed()),
+        Endpoint('titles-list:filter', 'titles-list', 'get', 'user',
+                 fixed(query={'genre': 'genre-7', 'year': 1957})),
+        Endpoint('titles-list:search', 'titles-list', 'get', 'user',
+                 fixed(query={'search': 'произведение 12'})),
+        Endpoint('titles-list:cursor', 'titles-list', 'get', 'user',
+                 fixed(query={'cursor': ''})),
+        Endpoint('titles-retrieve', 'titles-detail', 'get', 'user',
+                 fixed(kwargs={'pk': title.pk})),
+        Endpoint('titles-retrieve:anon', 'titles-detail', 'get', 'anon',
+                 fixed(kwargs={'pk': title.pk})),
+        Endpoint('titles-stats', 'titles-stats', 'get', 'user',
+                 fixed(kwargs={'pk': title.pk})),
+        Endpoint('titles-create', 'titles-list', 'post', 'admin',
+                 lambda i: {'data': {
+                     'name': f'Новое {i}', 'year': 2000,
+                     'category': title.category.slug,
+                     'genre': ['genre-1', 'genre-2'],
+                 }}),
+        Endpoint('titles-update', 'titles-detail', 'patch', 'admin',
+                 lambda i: {'kwargs': {'pk': title.pk},
+                            'data': {'name': f'Произведение {i}'}}),
+        Endpoint('titles-destroy', 'titles-detail', 'delete', 'admin',
+                 lambda i: {'kwargs': {'pk': new_title(i).pk}}),
+        Endpoint('titles-bulk', 'titles-bulk', 'post', 'admin',
+                 lambda i: {'data': [
+                     {'name': f'Пачка {i}-{j}', 'year': 2000,
+                      'category': title.category.slug, 'genre': ['genre-1']}
+                     for j in range(BULK_ITEMS)
+                 ]}),
+        Endpoint('titles-bulk:update', 'titles-bulk', 'patch', 'admin',
+                 lambda i: {'data': [
+                     {'id': pk, 'description': f'Версия {i}'}
+                     for pk in dataset['titles']
+                 ]}),
+        Endpoint('reviews-list', 'reviews-list', 'get', 'user',
+                 fixed(kwargs=title_kwargs)),
+        Endpoint('reviews-list:anon', 'reviews-list', 'get', 'anon',
+                 fixed(kwargs=title_kwargs)),
+        Endpoint('reviews-retrieve', 'reviews-detail', 'get', 'user',
+                 fixed(kwargs={**title_kwargs, 'pk': review.pk})),
+        Endpoint('reviews-create', 'reviews-list', 'post', 'user',
+                 lambda i: {'kwargs': {'title_id': new_title(i).pk},
+                            'data': {'text': f'Отзыв {i}', 'score': 7}}),
+        Endpoint('reviews-update', 'reviews-detail', 'patch', 'user',
+                 lambda i: {'kwargs': {**title_kwargs, 'pk': review.pk},
+                            'data': {'score': i % 10 + 1}}),
+        Endpoint('reviews-destroy', 'reviews-detail', 'delete', 'user',
+                 lambda i: {'kwargs': get_review_kwargs(Review.objects.create(
+                     title=new_title(i), author=user, score=5,
+                     text=f'Удаляемый отзыв {i}',
+                 ))}),
+        Endpoint('comments-list', 'comments-list', 'get', 'user',
+                 fixed(kwargs=review_kwargs)),
+        Endpoint('comments-retrieve', 'comments-detail', 'get', 'user',
+                 fixed(kwargs={**review_kwargs, 'pk': comment.pk})),
+        Endpoint('comments-create', 'comments-list', 'post', 'user',
+                 lambda i: {'kwargs': review_kwargs,
+                            'data': {'text': f'Комментарий {i}'}}),
+        Endpoint('comments-update', 'comments-detail', 'patch', 'user',
+                 lambda i: {'kwargs': {**review_kwargs, 'pk': comment.pk},
+                            'data': {'text': f'Комментарий {i}'}}),
+        Endpoint('comments-destroy', 'comments-detail', 'delete', 'user',
+                 lambda i: {'kwargs': {
+                     **review_kwargs, 'pk': Comment.objects.create(
+                         review_id=review, author=user,
+                         text=f'Удаляемый комментарий {i}',
+                     ).pk,
+                 }}),
+        Endpoint('user-list', 'user-list', 'get', 'admin', fixed()),
+        Endpoint('user-list:search', 'user-list', 'get', 'admin',
+                 fixed(query={'search': 'user1'})),
+        Endpoint('user-retrieve', 'user-detail', 'get', 'admin',
+                 fixed(kwargs={'username': user.username})),
+        Endpoint('user-create', 'user-list', 'post', 'admin',
+                 lambda i: {'data': {
+                     'username': f'created{i}',
+                     'email': f'created{i}@yamdb.fake',
+                 }}),
+        Endpoint('user-update', 'user-detail', 'patch', 'admin',
+                 lambda i: {'kwargs': {'username': user.username},
+                            'data': {'bio': f'Биография {i}'}}),
+        Endpoint('user-destroy', 'user-detail', 'delete', 'admin',
+                 lambda i: {'kwargs': {'username': new_user(i).username}}),
+        Endpoint('user-me', 'user-me', 'get', 'user', fixed()),
+        Endpoint('user-me:update', 'user-me', 'patch', 'user',
+                 lambda i: {'data': {'first_name': f'Имя {i}'}}),
+        Endpoint('signup', 'signup', 'post', 'anon',
+                 lambda i: {'data': {
+                     'username': f'signup{i}',
+                     'email': f'signup{i}@yamdb.fake',
+                 }}),
+        Endpoint('token', 'token', 'post', 'anon', get_token_data),
+        Endpoint('auth_cache', 'auth_cache', 'get', 'admin', fixed()),
+    ]
+    return endpoints
+
+
+def get_route_names(patterns):
+    names = set()
+    for pattern in patterns:
+        if hasattr(pattern, 'url_patterns'):
+            names |= get_route_names(pattern.url_patterns)
+        elif pattern.name:
+            names.add(pattern.name)
+    return names
+
+
+def percentile(values, percent):
+    """Перцентиль методом ближайшего ранга."""
+    ordered = sorted(values)
+    return ordered[max(math.ceil(percent / 100 * len(ordered)) - 1, 0)]
+
+
+class QueryCounter:
+    """Считает запросы без отладочного курсора и журнала запросов."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def run_endpoint(endpoint, client, warmup, iterations):
+    from django.core.cache import cache
+    from django.db import connection
+    from django.urls import reverse
+
+    cache.clear()
+    timings = []
+    queries = []
+    size = 0
+    for i in range(warmup + iterations):
+        request = endpoint.prepare(i)
+        path = reverse(f'api:{endpoint.route}', kwargs=request.get('kwargs'))
+        if endpoint.method == 'get':
+            args = (path, request.get('query'))
+        else:
+            args = (path, request.get('data'))
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            start = time.perf_counter()
+            response = getattr(client, endpoint.method)(*args, format='json')
+            elapsed = time.perf_counter() - start
+        if response.status_code >= 400:
+            raise SystemExit(
+                f'{endpoint.name}: {endpoint.method.upper()} {path} вернул '
+                f'{response.status_code}: {response.content[:500]!r}'
+            )
+        if i >= warmup:
+            timings.append(elapsed * 1000)
+            queries.append(counter.count)
+            size = len(response.content)
+    return {
+        'route': endpoint.route,
+        'method': endpoint.method.upper(),
+        'client': endpoint.client,
+        'path': path,
+        'status': response.status_code,
+        'p50_ms': round(percentile(timings, 50), 3),
+        'p95_ms': round(percentile(timings, 95), 3),
+        'p99_ms': round(percentile(timings, 99), 3),
+        'mean_ms': round(sum(timings) / len(timings), 3),
+        'queries': max(queries),
+        'bytes': size,
+    }
+
+
+def get_meta(args, uncovered):
+    import django
+
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'dataset': {
+            'titles': args.titles, 'reviews': args.reviews,
+            'comments': args.comments, 'users': args.users,
+        },
+        'warmup': args.warmup,
+        'iterations': args.iterations,
+        'uncovered_routes': sorted(uncovered),
+    }
+
+
+def compare(results, baseline, threshold):
+    """
+    Отношение p95 к прошлому прогону и изменение числа запросов по каждой
+    точке, которая есть в обоих прогонах, и список регрессий.
+    """
+    changes = {}
+    regressions = []
+    for name, result in results.items():
+        old = baseline['endpoints'].get(name)
+        if old is None:
+            continue
+        ratio = result['p95_ms'] / old['p95_ms'] if old['p95_ms'] else 1.0
+        delta = result['queries'] - old['queries']
+        changes[name] = (ratio, delta)
+        if ratio > threshold or delta > 0:
+            regressions.append(name)
+    return changes, regressions
+
+
+def report(results, changes):
+    header = (f'{"точка":<26}{"метод":<8}{"p50, мс":>10}{"p95, мс":>10}'
+              f'{"p99, мс":>10}{"запросов":>10}{"байт":>10}')
+    if changes:
+        header += f'{"p95/база":>10}{"Δ запр.":>9}'
+    print(header)
+    for name, result in results.items():
+        line = (f'{name:<26}{result["method"]:<8}{result["p50_ms"]:>10.2f}'
+                f'{result["p95_ms"]:>10.2f}{result["p99_ms"]:>10.2f}'
+                f'{result["queries"]:>10}{result["bytes"]:>10}')
+        if name in changes:
+            ratio, delta = changes[name]
+            line += f'{ratio:>9.2f}x{delta:>+9}'
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--titles', type=int, default=1000)
+    parser.add_argument('--reviews', type=int, default=5,
+                        help='Reviews per title.')
+    parser.add_argument('--comments', type=int, default=2,
+                        help='Comments per review.')
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--iterations', type=int, default=100)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--only', action='append', default=[],
+                        help='Run endpoints whose name contains the value.')
+    parser.add_argument('--output', help=(
+        'Results file, by default benchmarks/results/endpoints-<time>.json.'
+    ))
+    parser.add_argument('--compare', help='Results file of a previous run.')
+    parser.add_argument('--threshold', type=float, default=1.25, help=(
+        'Allowed p95 growth ratio against the --compare run.'
+    ))
+    args = parser.parse_args()
+    if args.iterations < 1:
+        parser.error('--iterations must be positive')
+
+    setup_django()
+    from api import urls
+
+    dataset = seed(args.titles, args.reviews, args.comments, args.users)
+    clients = get_clients(dataset)
+    endpoints = get_endpoints(dataset)
+    uncovered = get_route_names(urls.urlpatterns) - {
+        endpoint.route for endpoint in endpoints
+    }
+    if uncovered:
+        print(f'Маршруты без сценария: {", ".join(sorted(uncovered))}',
+              file=sys.stderr)
+
+    results = {}
+    for endpoint in endpoints:
+        if args.only and not any(part in endpoint.name for part in args.only):
+            continue
+        results[endpoint.name] = run_endpoint(
+            endpoint, clients[endpoint.client], args.warmup, args.iterations
+        )
+
+    changes, regressions = {}, []
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as file:
+            baseline = json.load(file)
+        changes, regressions = compare(results, baseline, args.threshold)
+    report(results, changes)
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f'endpoints-{datetime.now():%Y%m%d-%H%M%S}.json'
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as file:
+        json.dump(
+            {'meta': get_meta(args, uncovered), 'endpoints': results},
+            file, ensure_ascii=False, indent=2,
+        )
+    print(f'Результаты сохранены в {output}')
+    if regressions:
+        raise SystemExit(f'Регрессии: {", ".join(regressions)}')
+
+
+if __name__ == '__main__':
+    main()
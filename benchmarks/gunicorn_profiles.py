@@ -0,0 +1,181 @@
+"""
+Нагрузочный тест профилей gunicorn из api_yamdb/gunicorn.conf.py. Каждый
+профиль (`sync`, `gthread`, `asgi`) запускается с настройками по
+умолчанию для числа ядер машины на временной базе SQLite, после чего
+измеряются:
+
+* пропускная способность и задержки при параллельных GET-запросах к
+  списку, карточке и отзывам произведения;
+* память мастера и воркеров (PSS: общие после форка страницы делятся
+  между процессами);
+* время запуска до первого ответа.
+
+Запуск из корня репозитория:
+
+    python benchmarks/gunicorn_profiles.py --requests 2000 --concurrency 32
+"""
+import argparse
+import http.client
+import itertools
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from asgi_concurrency import PROJECT, get, prepare_database
+
+PROFILES = ('sync', 'gthread', 'asgi')
+PATHS = (
+    '/api/v1/titles/',
+    '/api/v1/titles/1/',
+    '/api/v1/titles/1/reviews/',
+)
+
+
+def start_server(profile, port, env):
+    env = dict(
+        env, GUNICORN_PROFILE=profile, GUNICORN_BIND=f'127.0.0.1:{port}',
+    )
+    started = time.monotonic()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn.app.wsgiapp',
+         '--config', 'gunicorn.conf.py', '--log-level', 'warning'],
+        cwd=PROJECT, env=env,
+    )
+    deadline = started + 60
+    while time.monotonic() < deadline:
+        try:
+            if get(port, PATHS[0], 5)[0] == 200:
+                return server, time.monotonic() - started
+        except OSError:
+            pass
+        time.sleep(0.1)
+    server.kill()
+    raise RuntimeError(f'Профиль {profile} не запустился')
+
+
+def get_children(pid):
+    try:
+        with open(f'/proc/{pid}/task/{pid}/children') as children:
+            return [int(child) for child in children.read().split()]
+    except OSError:
+        return []
+
+
+def get_pss(pid):
+    """PSS процесса в мегабайтах; 0, если /proc его не отдаёт."""
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as smaps:
+            for line in smaps:
+                if line.startswith('Pss:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0
+
+
+def mixed_load(port, requests, concurrency):
+    """Как `load`, но запросы идут по кругу по путям PATHS."""
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    paths = itertools.islice(itertools.cycle(PATHS), requests)
+
+    def worker():
+        while True:
+            with lock:
+                path = next(paths, None)
+            if path is None:
+                return
+            try:
+                status, elapsed = get(port, path, 60)
+            except (OSError, http.client.HTTPException) as error:
+                errors.append(error)
+                continue
+            if status != 200:
+                errors.append(status)
+                continue
+            latencies.append(elapsed)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+    latencies.sort()
+    return {
+        'rps': len(latencies) / elapsed,
+        'p50': statistics.median(latencies) * 1000 if latencies else 0,
+        'p95': (
+            latencies[int(len(latencies) * 0.95) - 1] * 1000
+            if latencies else 0
+        ),
+        'errors': len(errors),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--requests', type=int, default=1500)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--titles', type=int, default=100)
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument(
+        '--profiles', nargs='+', choices=PROFILES, default=list(PROFILES)
+    )
+    parser.add_argument(
+        '--workers', type=int,
+        help='GUNICORN_WORKERS for every profile instead of the CPU default',
+    )
+    options = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        env = dict(
+            os.environ,
+            DB_ENGINE='django.db.backends.sqlite3',
+            DB_NAME=os.path.join(directory, 'benchmark.sqlite3'),
+            API_CACHE_TIMEOUT='0',
+        )
+        # Воркерам нужен общий кэш; memcached из docker-compose здесь
+        # может быть не запущен, а замеры от кэша почти не зависят.
+        env.setdefault(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.filebased.FileBasedCache',
+        )
+        env.setdefault('CACHE_LOCATION', os.path.join(directory, 'cache'))
+        if options.workers:
+            env['GUNICORN_WORKERS'] = str(options.workers)
+        prepare_database(env, options.titles)
+        print(
+            f'{"профиль":<9}{"воркеров":>9}{"запуск, с":>11}{"rps":>9}'
+            f'{"p50, мс":>10}{"p95, мс":>10}{"ошибок":>8}{"PSS, МБ":>9}',
+            flush=True,
+        )
+        ports = itertools.count(options.port)
+        for profile in options.profiles:
+            port = next(ports)
+            server, startup = start_server(profile, port, env)
+            try:
+                result = mixed_load(
+                    port, options.requests, options.concurrency
+                )
+                workers = get_children(server.pid)
+                memory = sum(map(get_pss, [server.pid] + workers))
+            finally:
+                server.terminate()
+                server.wait()
+            print(
+                f'{profile:<9}{len(workers):>9}{startup:>11.1f}'
+                f'{result["rps"]:>9.1f}{result["p50"]:>10.1f}'
+                f'{result["p95"]:>10.1f}{result["errors"]:>8}'
+                f'{memory:>9.1f}', flush=True,
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+"""
+Сравнение рендереров JSON на страницах произведений и отзывов:
+стандартный JSONRenderer из DRF против api.renderers.FastJSONRenderer
+с бэкендами orjson и json. Данные сериализуются один раз на базе SQLite
+в памяти, после чего замеряется только рендеринг (и разбор тех же байт
+парсерами). Перед замером проверяется, что вывод совпадает байт в байт.
+
+Запуск из корня репозитория:
+
+    python benchmarks/json_renderers.py --page-size 100 --number 200
+"""
+import argparse
+import os
+import sys
+import timeit
+
+from io import BytesIO
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECT = os.path.join(ROOT, 'api_yamdb')
+
+
+def setup_django():
+    sys.path.insert(0, PROJECT)
+    os.environ['DJANGO_SETTINGS_MODULE'] = 'api_yamdb.settings'
+    os.environ['DB_ENGINE'] = 'django.db.backends.sqlite3'
+    os.environ['DB_NAME'] = ':memory:'
+    import django
+
+    from django.core.management import call_command
+
+    django.setup()
+    call_command('migrate', verbosity=0)
+
+
+def seed(page_size):
+    from django.contrib.auth import get_user_model
+    from django.utils import timezone
+
+    from reviews.models import Category, Genre, GenreTitle, Review, Title
+
+    category = Category.objects.create(name='Фильм', slug='film')
+    genres = [
+        Genre.objects.create(name=f'Жанр «{i}»', slug=f'genre-{i}')
+        for i in range(3)
+    ]
+    Title.objects.bulk_create([
+        Title(
+            name=f'Произведение {i}', year=2000 + i % 20,
+            description='Описание — с кириллицей и "кавычками".' * 3,
+            category=category, rating=i % 10 + 0.5,
+        )
+        for i in range(page_size)
+    ])
+    titles = list(Title.objects.order_by('id'))
+    GenreTitle.objects.bulk_create([
+        GenreTitle(title_id=title, genre_id=genre)
+        for title in titles for genre in genres
+    ])
+    get_user_model().objects.bulk_create([
+        get_user_model()(username=f'user{i}', email=f'user{i}@yamdb.fake')
+        for i in range(page_size)
+    ])
+    users = list(get_user_model().objects.order_by('id'))
+    Review.objects.bulk_create([
+        Review(
+            title=titles[0], author=user, score=i % 10 + 1,
+            text=f'Отзыв {i}: ' + 'хорошее произведение. ' * 10,
+            pub_date=timezone.now(),
+        )
+        for i, user in enumerate(users)
+    ])
+
+
+def get_pages(page_size):
+    from api.serializers import ReviewSerializer, TitleGETSerializer
+    from reviews.models import Review, Title
+
+    def page(results):
+        return {
+            'count': len(results), 'next': None, 'previous': None,
+            'results': results,
+        }
+
+    titles = Title.objects.select_related('category').prefetch_related(
+        'genre'
+    ).order_by('id')[:page_size]
+    reviews = Review.objects.select_related('author').order_by(
+        'id'
+    )[:page_size]
+    return {
+        'titles': page(TitleGETSerializer(titles, many=True).data),
+        'reviews': page(ReviewSerializer(reviews, many=True).data),
+    }
+
+
+def get_renderers():
+    from rest_framework.renderers import JSONRenderer
+
+    from api.renderers import FastJSONRenderer, orjson
+
+    renderers = {'drf': JSONRenderer()}
+    backends = ['json'] if orjson is None else ['json', 'orjson']
+    for backend in backends:
+        renderer_class = type(
+            f'FastJSONRenderer_{backend}', (FastJSONRenderer,),
+            {'backend': backend},
+        )
+        renderers[f'fast-{backend}'] = renderer_class()
+    return renderers
+
+
+def get_parsers():
+    from rest_framework.parsers import JSONParser
+
+    from api.parsers import FastJSONParser
+    from api.renderers import orjson
+
+    parsers = {'drf': JSONParser()}
+    backends = ['json'] if orjson is None else ['json', 'orjson']
+    for backend in backends:
+        parser_class = type(
+            f'FastJSONParser_{backend}', (FastJSONParser,),
+            {'backend': backend},
+        )
+        parsers[f'fast-{backend}'] = parser_class()
+    return parsers
+
+
+def measure(function, number, repeat):
+    return min(timeit.repeat(function, number=number, repeat=repeat)) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--number', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    seed(args.page_size)
+    pages = get_pages(args.page_size)
+    renderers = get_renderers()
+    parsers = get_parsers()
+
+    print(f'{"страница":<10}{"рендерер":<14}{"размер":>10}'
+          f'{"рендер, мкс":>14}{"разбор, мкс":>14}{"ускорение":>12}')
+    for name, data in pages.items():
+        expected = renderers['drf'].render(data)
+        baseline = None
+        for key, renderer in renderers.items():
+            rendered = renderer.render(data)
+            if rendered != expected:
+                raise SystemExit(f'{key}: вывод отличается от JSONRenderer')
+            parsed = parsers[key].parse(BytesIO(rendered))
+            if parsed != parsers['drf'].parse(BytesIO(rendered)):
+                raise SystemExit(f'{key}: разбор отличается от JSONParser')
+            render_time = measure(
+                lambda: renderer.render(data), args.number, args.repeat
+            )
+            parse_time = measure(
+                lambda: parsers[key].parse(BytesIO(rendered)),
+                args.number, args.repeat,
+            )
+            baseline = baseline or render_time
+            print(f'{name:<10}{key:<14}{len(rendered):>10}'
+                  f'{render_time * 1e6:>14.1f}{parse_time * 1e6:>14.1f}'
+                  f'{baseline / render_time:>11.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,41 @@
 import sys
 from os.path import abspath, dirname, join
 
+import pytest
+
 root_dir = dirname(dirname(abspath(__file__)))
 sys.path.append(root_dir)
 infra_dir_path = join(root_dir, 'infra')
 
 pytest_plugins = [
+    'tests.fixtures.fixture_data',
 ]
+
+
+@pytest.fixture(scope='session')
+def django_db_modify_db_settings():
+    """
+    Тесты с базой данных запускаются на SQLite в памяти, чтобы не требовать
+    поднятого postgres. Сами настройки проекта при этом не меняются.
+    Вторая база `replica` изображает реплику для чтения.
+    """
+    from django.conf import settings
+    from django.db import connections
+
+    databases = dict(connections.databases)
+    databases.setdefault('replica', databases['default'])
+    connections.__dict__['databases'] = {
+        alias: {
+            **config,
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': ':memory:',
+            'TEST': {},
+        }
+        for alias, config in databases.items()
+    }
+    settings.DATABASES.setdefault(
+        'replica', connections.databases['replica']
+    )
+    for alias in connections.databases:
+        if hasattr(connections._connections, alias):
+            delattr(connections._connections, alias)
@@ -0,0 +1,63 @@
+import pytest
+from rest_framework.test import APIClient
+
+from reviews.models import Category, Genre, Title
+
+
+@pytest.fixture
+def user(django_user_model):
+    return django_user_model.objects.create(
+        username='TestUser', email='testuser@yamdb.fake'
+    )
+
+
+@pytest.fixture
+def another_user(django_user_model):
+    return django_user_model.objects.create(
+        username='TestUserAnother', email='testuseranother@yamdb.fake'
+    )
+
+
+@pytest.fixture
+def admin(django_user_model):
+    return django_user_model.objects.create(
+        username='TestAdmin', email='testadmin@yamdb.fake', role='admin'
+    )
+
+
+@pytest.fixture
+def user_client(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+@pytest.fixture
+def another_user_client(another_user):
+    client = APIClient()
+    client.force_authenticate(user=another_user)
+    return client
+
+
+@pytest.fixture
+def admin_client(admin):
+    client = APIClient()
+    client.force_authenticate(user=admin)
+    return client
+
+
+@pytest.fixture
+def category():
+    return Category.objects.create(name='Фильм', slug='film')
+
+
+@pytest.fixture
+def genre():
+    return Genre.objects.create(name='Драма', slug='drama')
+
+
+@pytest.fixture
+def title(category, genre):
+    title = Title.objects.create(name='Титаник', year=1997, category=category)
+    title.genre.add(genre)
+    return title
@@ -0,0 +1,90 @@
+import asyncio
+import threading
+
+from api_yamdb.asgi import ReadWriteAsgiHandler
+
+
+def http_scope(method, path='/api/v1/titles/'):
+    return {
+        'type': 'http', 'http_version': '1.1', 'method': method,
+        'path': path, 'query_string': b'', 'headers': [],
+        'server': ('testserver', 80),
+    }
+
+
+async def call(application, scope):
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b''}
+
+    async def send(message):
+        messages.append(message)
+
+    await application(scope, receive, send)
+    return messages[0]['status'], b''.join(
+        message.get('body', b'') for message in messages[1:]
+    )
+
+
+class TestReadWriteAsgiHandler:
+
+    def test_reads_do_not_block_writes(self):
+        release = threading.Event()
+        lock = threading.Lock()
+        running = {'reads': 0, 'max_reads': 0}
+
+        def wsgi_application(environ, start_response):
+            if environ['REQUEST_METHOD'] == 'GET':
+                with lock:
+                    running['reads'] += 1
+                    running['max_reads'] = max(
+                        running['max_reads'], running['reads']
+                    )
+                release.wait(5)
+                with lock:
+                    running['reads'] -= 1
+            start_response('200 OK', [('Content-Type', 'text/plain')])
+            return [environ['REQUEST_METHOD'].encode()]
+
+        application = ReadWriteAsgiHandler(
+            wsgi_application, read_threads=2, write_threads=1
+        )
+
+        async def scenario():
+            reads = [
+                asyncio.ensure_future(call(application, http_scope('GET')))
+                for _ in range(4)
+            ]
+            write = await asyncio.wait_for(
+                call(application, http_scope('POST')), timeout=5
+            )
+            release.set()
+            return write, await asyncio.gather(*reads)
+
+        write, reads = asyncio.run(scenario())
+        assert write == (200, b'POST'), (
+            'Проверьте, что запись выполняется, пока чтения заняли свои потоки'
+        )
+        assert running['max_reads'] == 2, (
+            'Проверьте, что одновременных чтений не больше ASGI_READ_THREADS'
+        )
+        assert reads == [(200, b'GET')] * 4
+
+    def test_lifespan(self):
+        application = ReadWriteAsgiHandler(None, 1, 1)
+        events = iter([
+            {'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}
+        ])
+        sent = []
+
+        async def receive():
+            return next(events)
+
+        async def send(message):
+            sent.append(message['type'])
+
+        asyncio.run(application({'type': 'lifespan'}, receive, send))
+        assert sent == [
+            'lifespan.startup.complete', 'lifespan.shutdown.complete'
+        ]
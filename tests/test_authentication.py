@@ -0,0 +1,84 @@
+import pytest
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.authentication import UserCache, user_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_user_cache():
+    user_cache.clear()
+    yield
+    user_cache.clear()
+
+
+def token_client(user):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}'
+    )
+    return client
+
+
+class TestUserCache:
+
+    def test_lru_and_ttl(self, django_user_model):
+        cache = UserCache(maxsize=2, ttl=60)
+        users = [
+            django_user_model(id=i, username=f'u{i}') for i in range(3)
+        ]
+        for user in users:
+            cache.set((user.id, 'jti'), user)
+        assert cache.get((0, 'jti'), django_user_model) is None, (
+            'Проверьте, что кэш вытесняет давно не использованные записи'
+        )
+        assert cache.get((2, 'jti'), django_user_model).username == 'u2'
+        assert cache.stats()['hits'] == 1
+        assert cache.stats()['misses'] == 1
+
+        cache = UserCache(maxsize=2, ttl=-1)
+        cache.set((0, 'jti'), users[0])
+        assert cache.get((0, 'jti'), django_user_model) is None, (
+            'Проверьте, что записи устаревают по TTL'
+        )
+
+
+@pytest.mark.django_db
+class TestCachedJWTAuthentication:
+
+    def test_repeated_requests_skip_user_query(
+        self, user, django_assert_num_queries
+    ):
+        client = token_client(user)
+        assert client.get('/api/v1/users/me/').status_code == 200
+        with django_assert_num_queries(0):
+            response = client.get('/api/v1/users/me/')
+        assert response.data['username'] == user.username, (
+            'Проверьте, что пользователь берётся из кэша без запроса к базе'
+        )
+        assert user_cache.stats()['hits'] == 1
+        assert user_cache.stats()['misses'] == 1
+
+    def test_role_change_invalidates_cache(self, user):
+        client = token_client(user)
+        data = {'name': 'Книга', 'slug': 'book'}
+        assert client.post('/api/v1/categories/', data).status_code == 403
+        user.role = user.ADMIN
+        user.save()
+        assert client.post('/api/v1/categories/', data).status_code == 201, (
+            'Проверьте, что смена роли сбрасывает кэш пользователя'
+        )
+
+    def test_deleted_user_is_rejected(self, user):
+        client = token_client(user)
+        client.get('/api/v1/users/me/')
+        user.delete()
+        assert client.get('/api/v1/users/me/').status_code == 401
+
+    def test_stats_endpoint(self, user, admin):
+        assert token_client(user).get(
+            '/api/v1/auth/cache/'
+        ).status_code == 403
+        response = token_client(admin).get('/api/v1/auth/cache/')
+        assert response.status_code == 200
+        assert {'hits', 'misses', 'size'} <= set(response.data)
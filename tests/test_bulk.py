@@ -0,0 +1,130 @@
+import pytest
+from django.core.cache import cache
+
+from reviews.models import Category, Genre, GenreTitle, Title
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.mark.django_db
+class TestBulkEndpoints:
+
+    def test_bulk_create_titles(self, admin_client, category, genre):
+        comedy = Genre.objects.create(name='Комедия', slug='comedy')
+        data = [
+            {
+                'name': f'Фильм {i}', 'year': 2000 + i,
+                'category': 'film', 'genre': ['drama', 'comedy', 'drama'],
+            }
+            for i in range(20)
+        ]
+        response = admin_client.post(
+            '/api/v1/titles/bulk/', data, format='json'
+        )
+        assert response.status_code == 201, response.data
+        ids = [item['id'] for item in response.data]
+        assert list(Title.objects.values_list('id', flat=True)) == ids, (
+            'Проверьте, что ответ содержит id в порядке массива'
+        )
+        assert list(
+            Title.objects.get(id=ids[0]).genre.values_list('slug', flat=True)
+        ) == ['drama', 'comedy']
+        assert GenreTitle.objects.filter(genre_id=comedy).count() == 20
+
+        response = admin_client.get('/api/v1/titles/', {'search': 'фильм'})
+        assert response.data['count'] == 20, (
+            'Проверьте, что массовое создание учитывается поиском'
+        )
+
+    def test_validation_is_one_pass(
+        self, admin_client, category, genre, django_assert_num_queries
+    ):
+        data = [
+            {'name': f'Фильм {i}', 'year': 3000, 'category': 'film',
+             'genre': ['drama']}
+            for i in range(20)
+        ]
+        data[5] = {'name': 'Без жанра', 'year': 2000, 'genre': ['unknown']}
+        with django_assert_num_queries(2):
+            response = admin_client.post(
+                '/api/v1/titles/bulk/', data, format='json'
+            )
+        assert response.status_code == 400
+        assert len(response.data) == 20, (
+            'Проверьте, что ошибки возвращаются по позициям массива'
+        )
+        assert set(response.data[5]) == {'genre', 'category'}
+        assert set(response.data[0]) == {'year'}
+        assert not Title.objects.exists(), (
+            'Проверьте, что при ошибках ничего не записывается'
+        )
+
+    def test_bulk_update_titles(self, admin_client, title, category, genre):
+        comedy = Genre.objects.create(name='Комедия', slug='comedy')
+        book = Category.objects.create(name='Книга', slug='book')
+        response = admin_client.patch('/api/v1/titles/bulk/', [
+            {'id': title.id, 'name': 'Титаник 2', 'category': 'book',
+             'genre': ['comedy']},
+            {'id': title.id + 100, 'name': 'Нет такого'},
+        ], format='json')
+        assert response.status_code == 400
+        assert response.data[1] == {'id': ['Объект не найден.']}
+
+        response = admin_client.patch('/api/v1/titles/bulk/', [
+            {'id': title.id, 'name': 'Титаник 2', 'category': 'book',
+             'genre': ['comedy']},
+        ], format='json')
+        assert response.status_code == 200, response.data
+        title.refresh_from_db()
+        assert title.name == 'Титаник 2'
+        assert title.category == book
+        assert list(title.genre.all()) == [comedy]
+        assert title.year == 1997
+
+    def test_bulk_categories_and_genres(
+        self, admin_client, user_client, category, django_assert_num_queries
+    ):
+        data = [
+            {'name': f'Категория {i}', 'slug': f'c{i}'} for i in range(30)
+        ]
+        with django_assert_num_queries(4):
+            response = admin_client.post(
+                '/api/v1/categories/bulk/', data, format='json'
+            )
+        assert response.status_code == 201, response.data
+        assert Category.objects.count() == 31
+
+        response = admin_client.post('/api/v1/genres/bulk/', [
+            {'name': 'Драма', 'slug': 'drama'},
+            {'name': 'Драма', 'slug': 'drama'},
+        ], format='json')
+        assert response.status_code == 400
+        assert response.data[1] == {
+            'slug': ['Значение повторяется в запросе.']
+        }
+        response = admin_client.post(
+            '/api/v1/categories/bulk/', [{'name': 'Кино', 'slug': 'film'}],
+            format='json',
+        )
+        assert response.status_code == 400
+        assert 'slug' in response.data[0], (
+            'Проверьте, что проверяется уникальность slug в базе'
+        )
+
+        response = admin_client.patch(
+            '/api/v1/categories/bulk/', [{'name': 'Кино', 'slug': 'film'}],
+            format='json',
+        )
+        assert response.status_code == 200
+        category.refresh_from_db()
+        assert category.name == 'Кино'
+
+        assert user_client.post(
+            '/api/v1/genres/bulk/', [{'name': 'a', 'slug': 'a'}],
+            format='json',
+        ).status_code == 403
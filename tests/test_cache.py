@@ -0,0 +1,147 @@
+import threading
+import time
+
+import pytest
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.test import APIClient
+
+from api.cache import get_or_compute, get_versions
+from reviews.models import Category, Review
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.mark.django_db
+class TestResponseCache:
+
+    def test_anonymous_list_is_served_from_cache(
+        self, title, django_assert_num_queries
+    ):
+        client = APIClient()
+        first = client.get('/api/v1/titles/')
+        with django_assert_num_queries(0):
+            second = client.get('/api/v1/titles/')
+        assert first.data == second.data, (
+            'Проверьте, что повторный анонимный запрос отдаётся из кэша'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_save_bumps_version(self, admin_client, title):
+        client = APIClient()
+        client.get('/api/v1/categories/')
+        Category.objects.create(name='Книга', slug='book')
+        response = client.get('/api/v1/categories/')
+        assert response.data['count'] == 2, (
+            'Проверьте, что сохранение модели инвалидирует кэш ресурса'
+        )
+
+        client.get(f'/api/v1/titles/{title.id}/')
+        category = title.category
+        category.name = 'Кино'
+        category.save()
+        response = client.get(f'/api/v1/titles/{title.id}/')
+        assert response.data['category']['name'] == 'Кино', (
+            'Проверьте, что произведения зависят от версии категорий'
+        )
+
+    def test_links_follow_host(self):
+        Category.objects.bulk_create([
+            Category(name=f'Категория {number}', slug=f'category-{number}')
+            for number in range(15)
+        ])
+        client = APIClient()
+        url = '/api/v1/categories/'
+        client.get(url, HTTP_HOST='evil.example')
+        response = client.get(url, HTTP_HOST='yamdb.example')
+        assert response.data['next'].startswith('http://yamdb.example/'), (
+            'Проверьте, что ответы с абсолютными ссылками кэшируются '
+            'отдельно для каждого хоста'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_version_bumped_after_commit(self):
+        versions = get_versions(['categories'])
+        with transaction.atomic():
+            Category.objects.create(name='Книга', slug='book')
+            assert get_versions(['categories']) == versions, (
+                'Проверьте, что версия меняется только после фиксации '
+                'транзакции'
+            )
+        assert get_versions(['categories']) != versions, (
+            'Проверьте, что после фиксации транзакции версия меняется'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_review_and_username_changes(self, user, title):
+        client = APIClient()
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        client.get(url)
+        Review.objects.create(title=title, author=user, text='a', score=5)
+        response = client.get(url)
+        assert response.data['count'] == 1
+
+        user.username = 'Renamed'
+        user.save()
+        response = client.get(url)
+        assert response.data['results'][0]['author'] == 'Renamed'
+
+    def test_authenticated_requests_bypass_cache(
+        self, user_client, title, django_assert_num_queries
+    ):
+        user_client.get('/api/v1/titles/')
+        with django_assert_num_queries(2):
+            user_client.get('/api/v1/titles/')
+
+
+class TestSingleFlight:
+
+    def test_concurrent_misses_compute_once(self):
+        calls = []
+        started = threading.Event()
+
+        def compute():
+            calls.append(1)
+            started.set()
+            threading.Event().wait(0.2)
+            return 'value'
+
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(get_or_compute('key', compute))
+            )
+            for _ in range(5)
+        ]
+        threads[0].start()
+        started.wait()
+        for thread in threads[1:]:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(calls) == 1, (
+            'Проверьте, что при промахе значение вычисляется один раз'
+        )
+        assert results == ['value'] * 5
+
+    def test_waiters_stop_when_value_is_not_cached(self):
+        started = threading.Event()
+
+        def compute():
+            started.set()
+            threading.Event().wait(0.2)
+
+        thread = threading.Thread(target=get_or_compute, args=('key', compute))
+        thread.start()
+        started.wait()
+        begin = time.monotonic()
+        get_or_compute('key', lambda: 'value', lock_timeout=5)
+        thread.join()
+        assert time.monotonic() - begin < 1, (
+            'Проверьте, что ожидание прекращается вместе с блокировкой'
+        )
@@ -0,0 +1,75 @@
+import pytest
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import serializers
+
+from api.compiled import CompiledSerializer
+from api.serializers import (
+    CommentSerializer, ReviewSerializer, TitleGETSerializer,
+)
+from reviews.models import Comment, Genre, Review, Title
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.mark.django_db
+class TestCompiledSerializer:
+
+    @pytest.fixture
+    def data(self, title, user, another_user):
+        comedy = Genre.objects.create(name='Комедия', slug='comedy')
+        title.genre.add(comedy)
+        Title.objects.create(name='Без категории', year=2000, rating=7.6)
+        review = Review.objects.create(
+            title=title, author=user, text='Отзыв', score=8
+        )
+        Review.objects.create(
+            title=title, author=another_user, text='Ещё', score=3
+        )
+        Comment.objects.create(review_id=review, author=user, text='a')
+        Comment.objects.create(review_id=review, author=another_user,
+                               text='b')
+        return title, review
+
+    @pytest.mark.parametrize('serializer_class', [
+        TitleGETSerializer, ReviewSerializer, CommentSerializer,
+    ])
+    def test_matches_serializer(self, data, serializer_class):
+        queryset = serializer_class.Meta.model.objects.order_by('id')
+        compiled = CompiledSerializer(serializer_class())
+        assert compiled.represent(compiled.values(queryset)) == (
+            serializer_class(queryset, many=True).data
+        ), 'Проверьте, что вывод совпадает с обычным сериализатором'
+
+    def test_list_endpoints(self, client, data):
+        title, review = data
+        for url, serializer_class, queryset in (
+            ('/api/v1/titles/', TitleGETSerializer,
+             Title.objects.order_by('id')),
+            (f'/api/v1/titles/{title.id}/reviews/', ReviewSerializer,
+             title.reviews.order_by('id')),
+            (f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/',
+             CommentSerializer, review.comments.order_by('id')),
+        ):
+            expected = serializer_class(queryset, many=True).data
+            assert client.get(url).json()['results'] == expected
+            response = client.get(url, {'cursor': ''})
+            assert response.json()['results'] == expected, (
+                'Проверьте курсорную пагинацию по строкам .values()'
+            )
+
+    def test_unsupported_fields(self):
+        class MethodSerializer(serializers.ModelSerializer):
+            upper = serializers.SerializerMethodField()
+
+            class Meta:
+                model = Genre
+                fields = ('upper',)
+
+        with pytest.raises(ImproperlyConfigured):
+            CompiledSerializer(MethodSerializer())
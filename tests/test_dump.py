@@ -0,0 +1,68 @@
+import gzip
+import json
+
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+
+from reviews.models import (
+    Category, Comment, Genre, GenreTitle, Review, Title, TitleListing,
+)
+
+MODELS = (Comment, Review, GenreTitle, Title, Genre, Category)
+
+
+def snapshot():
+    return {
+        model.__name__: list(model.objects.order_by('pk').values())
+        for model in (get_user_model(),) + MODELS
+    }
+
+
+def clear():
+    for model in MODELS + (get_user_model(),):
+        model.objects.all().delete()
+
+
+@pytest.mark.django_db
+class TestDumpRestore:
+
+    @pytest.fixture
+    def dataset(self, title, user, another_user):
+        Title.objects.create(name='Без категории', year=2000,
+                             description='')
+        review = Review.objects.create(
+            title=title, author=user, text='Строка\nс "кавычками"', score=8
+        )
+        Review.objects.filter(pk=review.pk).update(
+            pub_date='2020-01-02T03:04:05.123456Z'
+        )
+        Comment.objects.create(review_id=review, author=another_user,
+                               text='\t')
+
+    @pytest.mark.parametrize('name', ['dump.ndjson', 'dump.ndjson.gz'])
+    def test_round_trip(self, tmp_path, dataset, name):
+        path = str(tmp_path / name)
+        expected = snapshot()
+        call_command('dump', path, stdout=StringIO())
+        opener = gzip.open if name.endswith('.gz') else open
+        with opener(path, 'rt', encoding='utf-8') as stream:
+            header = json.loads(stream.readline())
+        assert header['model'] == 'users.user'
+
+        clear()
+        call_command('restore', path, batch_size=1, stdout=StringIO())
+        assert snapshot() == expected, (
+            'Проверьте, что restore восстанавливает данные из dump как есть'
+        )
+        assert TitleListing.objects.count() == 2, (
+            'Проверьте, что после восстановления пересобирается список'
+        )
+
+    def test_restore_requires_empty_database(self, tmp_path, dataset):
+        path = str(tmp_path / 'dump.ndjson')
+        call_command('dump', path, stdout=StringIO())
+        with pytest.raises(CommandError):
+            call_command('restore', path, stdout=StringIO())
@@ -0,0 +1,72 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Category, GenreTitle, Review, Title
+
+
+FILES = {
+    'users.csv': (
+        'id,username,email,role\n'
+        '100,reader,reader@yamdb.fake,user\n'
+        '101,critic,critic@yamdb.fake,moderator\n'
+    ),
+    'category.csv': 'id,name,slug\n1,Фильм,movie\n2,Книга,book\n',
+    'genre.csv': 'id,name,slug\n1,Драма,drama\n',
+    'titles.csv': (
+        'id,name,year,category\n'
+        '1,Титаник,1997,1\n2,Война и мир,1869,2\n3,Без категории,2000,\n'
+    ),
+    'genre_title.csv': 'id,title_id,genre_id\n1,1,1\n2,2,1\n',
+    'review.csv': (
+        'id,title,text,author,score\n'
+        '1,1,Хорошо,100,8\n2,1,Плохо,101,3\n3,2,"Длинно, но ""сильно""",100,9\n'
+    ),
+}
+
+
+@pytest.mark.django_db
+class TestFilling:
+
+    @pytest.fixture
+    def data_dir(self, tmp_path):
+        for name, content in FILES.items():
+            (tmp_path / name).write_text(content, encoding='utf-8')
+        return tmp_path
+
+    def test_loads_files_in_dependency_order(self, data_dir):
+        out = StringIO()
+        call_command(
+            'filling',
+            '-m', 'Review', '-f', 'review.csv',
+            '-m', 'GenreTitle', '-f', 'genre_title.csv',
+            '-m', 'Title', '-f', 'titles.csv',
+            '-m', 'Genre', '-f', 'genre.csv',
+            '-m', 'Category', '-f', 'category.csv',
+            '-m', 'users.User', '-f', 'users.csv',
+            '-d', str(data_dir), '-b', '2',
+            stdout=out,
+        )
+        assert Category.objects.count() == 2
+        assert GenreTitle.objects.count() == 2
+        assert Title.objects.get(pk=3).category is None, (
+            'Проверьте, что пустое значение загружается как `NULL`'
+        )
+        assert Review.objects.get(pk=3).text == 'Длинно, но "сильно"'
+        title = Title.objects.get(pk=1)
+        assert (title.rating_sum, title.rating_count) == (11, 2), (
+            'Проверьте, что после загрузки отзывов пересчитывается рейтинг'
+        )
+        output = out.getvalue()
+        assert output.index('Successfully User') < output.index(
+            'Successfully Review'
+        ), 'Проверьте, что модели загружаются в порядке зависимостей'
+        assert 'rows/s' in output, 'Проверьте отчёт о скорости загрузки'
+
+    def test_new_rows_after_load_get_fresh_ids(self, data_dir):
+        call_command(
+            'filling', '-m', 'Category', '-f', 'category.csv',
+            '-d', str(data_dir), stdout=StringIO(),
+        )
+        assert Category.objects.create(name='Музыка', slug='music').pk == 3
@@ -0,0 +1,112 @@
+import random
+
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db.models import Count
+
+from reviews import synthetic
+from reviews.models import (
+    Category, Comment, Genre, GenreTitle, Review, Title, TitleListing,
+)
+from reviews.rating import recalculate_ratings
+
+MODELS = (Comment, Review, GenreTitle, Title, Genre, Category)
+SIZES = {
+    'users': 100, 'categories': 3, 'genres': 5, 'titles': 40,
+    'reviews': 400, 'comments': 600,
+}
+
+
+def generate(**options):
+    call_command('generate_data', stdout=StringIO(), **{**SIZES, **options})
+
+
+def snapshot():
+    """Данные всех моделей; id связей с жанрами берутся из последовательности."""
+    data = {
+        model.__name__: list(model.objects.order_by('pk').values_list())
+        for model in MODELS + (get_user_model(),)
+    }
+    data['GenreTitle'] = [row[1:] for row in data['GenreTitle']]
+    return data
+
+
+def clear():
+    for model in MODELS + (get_user_model(),):
+        model.objects.all().delete()
+
+
+class TestSynthetic:
+
+    def test_spread_respects_limit(self):
+        rng = random.Random(0)
+        weights = synthetic.zipf_weights(50, 1.5, rng)
+        counts = synthetic.spread(400, weights, rng, limit=20)
+        assert sum(counts) == 400
+        assert max(counts) == 20, (
+            'Проверьте, что излишек сверх лимита раздаётся другим элементам'
+        )
+
+    def test_title_tasks(self):
+        tasks = synthetic.get_title_tasks(3000, 50000, 80000, 100, 1.0, 0)
+        assert sum(len(task[2]) for task in tasks) == 3000
+        assert tasks[1][4] == 1 + sum(tasks[0][2]), (
+            'Проверьте, что id отзывов задач идут подряд'
+        )
+        assert tasks == synthetic.get_title_tasks(
+            3000, 50000, 80000, 100, 1.0, 0
+        )
+
+
+@pytest.mark.django_db
+class TestGenerateData:
+
+    def test_generates_consistent_data(self):
+        generate(seed=1)
+        assert get_user_model().objects.count() == 100
+        assert Title.objects.count() == 40
+        assert Review.objects.count() == 400
+        assert Comment.objects.count() == 600
+        assert GenreTitle.objects.exists()
+        assert TitleListing.objects.count() == 40, (
+            'Проверьте, что список произведений собран после генерации'
+        )
+        assert recalculate_ratings() == 0, (
+            'Проверьте, что рейтинг произведений совпадает с отзывами'
+        )
+        counts = sorted(
+            Review.objects.order_by().values('title').annotate(
+                total=Count('id')
+            ).values_list('total', flat=True),
+            reverse=True,
+        )
+        assert counts[0] > 3 * 400 / 40, (
+            'Проверьте, что у популярных произведений больше отзывов'
+        )
+        assert counts[0] <= 100
+        title = Title.objects.create(name='Новое', year=2000)
+        assert title.pk == 41, (
+            'Проверьте, что последовательности id сброшены'
+        )
+
+    def test_seed_is_deterministic(self):
+        generate(seed=7)
+        expected = snapshot()
+        clear()
+        generate(seed=7, workers=2, batch_size=50)
+        assert snapshot() == expected, (
+            'Проверьте, что данные зависят только от зерна и размеров'
+        )
+        clear()
+        generate(seed=8)
+        assert snapshot() != expected
+
+    def test_validation(self, category):
+        with pytest.raises(CommandError, match='not empty'):
+            generate()
+        category.delete()
+        with pytest.raises(CommandError, match='--reviews'):
+            generate(reviews=100 * 40 + 1)
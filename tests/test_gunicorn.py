@@ -0,0 +1,98 @@
+import os
+import runpy
+
+from types import SimpleNamespace
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+
+from .conftest import root_dir
+
+CONFIG = os.path.join(root_dir, 'api_yamdb', 'gunicorn.conf.py')
+
+
+@pytest.fixture
+def load_config(monkeypatch):
+    for name in list(os.environ):
+        if name.startswith('GUNICORN_'):
+            monkeypatch.delenv(name)
+    monkeypatch.setattr(os, 'sched_getaffinity', lambda pid: {0, 1, 2, 3})
+
+    def load(**env):
+        for name, value in env.items():
+            monkeypatch.setenv(f'GUNICORN_{name}', value)
+        return runpy.run_path(CONFIG)
+
+    return load
+
+
+class TestGunicornConfig:
+
+    def test_default_profile(self, load_config):
+        config = load_config()
+        assert config['worker_class'] == 'gthread', (
+            'По умолчанию должен использоваться профиль `gthread`'
+        )
+        assert config['wsgi_app'] == 'api_yamdb.wsgi:application'
+        assert config['workers'] == 5, (
+            'Профиль `gthread` должен запускать по воркеру на ядро и ещё один'
+        )
+        assert config['threads'] == 4
+        assert config['preload_app'] is True, (
+            'Приложение должно загружаться до форка воркеров'
+        )
+        assert config['max_requests'] == 1000
+        assert config['max_requests_jitter'] == 100, (
+            'Добавка к max_requests должна разносить перезапуски воркеров'
+        )
+
+    def test_sync_profile(self, load_config):
+        config = load_config(PROFILE='sync')
+        assert config['worker_class'] == 'sync'
+        assert config['workers'] == 9, (
+            'Профиль `sync` должен запускать по два воркера на ядро и ещё один'
+        )
+        assert config['threads'] == 1
+
+    def test_asgi_profile(self, load_config):
+        config = load_config(PROFILE='asgi')
+        assert config['worker_class'] == 'uvicorn.workers.UvicornWorker'
+        assert config['wsgi_app'] == 'api_yamdb.asgi:application', (
+            'Профиль `asgi` должен запускать приложение ASGI'
+        )
+        assert config['workers'] == 5
+
+    def test_env_overrides(self, load_config):
+        config = load_config(
+            WORKERS='2', THREADS='8', PRELOAD='0', MAX_REQUESTS='500',
+            BIND='127.0.0.1:9000', WORKER_CLASS='gevent',
+        )
+        assert config['workers'] == 2
+        assert config['threads'] == 8
+        assert config['preload_app'] is False
+        assert config['max_requests_jitter'] == 50, (
+            'Добавка по умолчанию должна считаться от GUNICORN_MAX_REQUESTS'
+        )
+        assert config['bind'] == '127.0.0.1:9000'
+        assert config['worker_class'] == 'gevent'
+
+    def test_unknown_profile(self, load_config):
+        with pytest.raises(ImproperlyConfigured):
+            load_config(PROFILE='eventlet')
+
+    def test_workers_need_shared_cache(self, load_config, settings,
+                                       monkeypatch):
+        monkeypatch.delenv('PROMETHEUS_MULTIPROC_DIR', raising=False)
+        on_starting = load_config()['on_starting']
+        settings.CACHES = {'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }}
+        on_starting(SimpleNamespace(cfg=SimpleNamespace(workers=1)))
+        with pytest.raises(ImproperlyConfigured):
+            on_starting(SimpleNamespace(cfg=SimpleNamespace(workers=5)))
+        settings.CACHES = {'default': {
+            'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+            'LOCATION': 'cache:11211',
+        }}
+        # С общим кэшем несколько воркеров разрешены.
+        on_starting(SimpleNamespace(cfg=SimpleNamespace(workers=5)))
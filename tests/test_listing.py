@@ -0,0 +1,111 @@
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+
+from api.serializers import TitleGETSerializer
+from reviews.models import Category, Genre, Review, Title, TitleListing
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def listed(client, **params):
+    response = client.get('/api/v1/titles/', params)
+    assert response.status_code == 200
+    return response.json()['results']
+
+
+def expected(titles):
+    return TitleGETSerializer(
+        Title.objects.filter(pk__in=[title.pk for title in titles])
+        .order_by('id'), many=True
+    ).data
+
+
+@pytest.mark.django_db
+class TestTitleListing:
+
+    def test_list_matches_serializer(self, client, title, user):
+        comedy = Genre.objects.create(name='Комедия', slug='comedy')
+        title.genre.add(comedy)
+        other = Title.objects.create(name='Без категории', year=2000)
+        Review.objects.create(title=title, author=user, text='t', score=8)
+        assert listed(client) == expected([title, other]), (
+            'Проверьте, что список из TitleListing совпадает с '
+            'TitleGETSerializer'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_listing_follows_changes(self, client, title, category, genre):
+        category.name = 'Кино'
+        category.save()
+        genre.name = 'Трагедия'
+        genre.save()
+        assert listed(client) == expected([title])
+
+        title.genre.remove(genre)
+        assert listed(client)[0]['genre'] == []
+        genre.title_set.add(title)
+        assert listed(client)[0]['genre'] == [
+            {'name': 'Трагедия', 'slug': 'drama'}
+        ]
+        genre.delete()
+        category.delete()
+        assert listed(client) == expected([title]), (
+            'Проверьте, что удаление жанра и категории обновляет список'
+        )
+        title.delete()
+        assert not TitleListing.objects.exists()
+
+    def test_title_with_genres_and_reviews_deleted(self, title, user):
+        Review.objects.create(title=title, author=user, text='a', score=5)
+        title.delete()
+        assert not TitleListing.objects.exists(), (
+            'Проверьте, что удаление связей с жанрами вместе с произведением '
+            'не создаёт строку списка заново'
+        )
+
+    def test_filters_read_listing(self, client, title, category, genre):
+        book = Category.objects.create(name='Книга', slug='book')
+        other = Title.objects.create(name='Война и мир', year=1869,
+                                     category=book)
+        assert [item['id'] for item in listed(client, category='book')] == [
+            other.id
+        ]
+        assert [item['id'] for item in listed(client, genre='drama')] == [
+            title.id
+        ]
+        assert [item['id'] for item in listed(client, year=1869)] == [
+            other.id
+        ]
+        assert [item['id'] for item in listed(client, name='ойн')] == [
+            other.id
+        ]
+        assert [item['id'] for item in listed(client, search='титан')] == [
+            title.id
+        ]
+
+    def test_bulk_writes_refresh_listing(self, admin_client, client, title):
+        response = admin_client.post('/api/v1/titles/bulk/', [
+            {'name': 'Аватар', 'year': 2009, 'category': 'film',
+             'genre': ['drama']},
+        ], format='json')
+        assert response.status_code == 201
+        admin_client.patch('/api/v1/categories/bulk/', [
+            {'slug': 'film', 'name': 'Кино'},
+        ], format='json')
+        admin_client.patch('/api/v1/genres/bulk/', [
+            {'slug': 'drama', 'name': 'Трагедия'},
+        ], format='json')
+        titles = Title.objects.all()
+        assert listed(client) == expected(titles)
+        assert listed(client)[1]['category']['name'] == 'Кино'
+
+    def test_rebuild_command(self, client, title):
+        TitleListing.objects.all().delete()
+        call_command('rebuild_title_listing')
+        assert listed(client) == expected([title])
@@ -0,0 +1,131 @@
+import os
+import subprocess
+import sys
+
+import pytest
+from django.conf import settings as django_settings
+from django.core.cache import cache
+from prometheus_client import REGISTRY
+
+from api.authentication import user_cache
+
+WORKER_SCRIPT = (
+    'import os\n'
+    'from api.metrics import cache_lookup, mark_worker\n'
+    'cache_lookup("user", True)\n'
+    'mark_worker()\n'
+    'print(os.getpid())\n'
+)
+SCRAPE_SCRIPT = (
+    'from prometheus_client import generate_latest\n'
+    'from api.metrics import get_registry\n'
+    'print(generate_latest(get_registry()).decode())\n'
+)
+
+
+@pytest.fixture(autouse=True)
+def metrics(settings):
+    settings.METRICS = True
+    settings.METRICS_TOKEN = ''
+    cache.clear()
+    user_cache.clear()
+    yield
+    cache.clear()
+    user_cache.clear()
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def run(script, directory):
+    env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=str(directory))
+    return subprocess.run(
+        [sys.executable, '-c', script], env=env, check=True,
+        cwd=django_settings.BASE_DIR, stdout=subprocess.PIPE,
+    ).stdout.decode()
+
+
+class TestMetrics:
+
+    @pytest.mark.django_db
+    def test_request_metrics(self, client, title):
+        labels = {'route': 'api:titles-detail', 'method': 'GET'}
+        requests = sample(
+            'yamdb_http_requests_total', status='200', **labels
+        )
+        queries = sample(
+            'yamdb_db_queries_per_request_sum', route=labels['route']
+        )
+        response = client.get(f'/api/v1/titles/{title.id}/')
+        assert response.status_code == 200
+        assert sample(
+            'yamdb_http_requests_total', status='200', **labels
+        ) == requests + 1, (
+            'Проверьте, что запросы считаются по имени маршрута и статусу'
+        )
+        assert sample(
+            'yamdb_http_request_duration_seconds_count', **labels
+        ) >= 1
+        assert sample(
+            'yamdb_db_queries_per_request_sum', route=labels['route']
+        ) > queries, 'Проверьте, что считаются SQL-запросы'
+
+    @pytest.mark.django_db
+    def test_unmatched_route(self, client):
+        before = sample(
+            'yamdb_http_requests_total',
+            route='unmatched', method='GET', status='404',
+        )
+        client.get('/api/v1/no-such-route/')
+        assert sample(
+            'yamdb_http_requests_total',
+            route='unmatched', method='GET', status='404',
+        ) == before + 1, (
+            'Проверьте, что запросы без маршрута не плодят ряды по путям'
+        )
+
+    @pytest.mark.django_db
+    def test_cache_lookups(self, client, title):
+        hits = sample('yamdb_cache_lookups_total', cache='response',
+                      result='hit')
+        misses = sample('yamdb_cache_lookups_total', cache='response',
+                        result='miss')
+        client.get('/api/v1/titles/')
+        client.get('/api/v1/titles/')
+        assert sample('yamdb_cache_lookups_total', cache='response',
+                      result='miss') == misses + 1
+        assert sample('yamdb_cache_lookups_total', cache='response',
+                      result='hit') == hits + 1, (
+            'Проверьте, что считаются попадания в кэш ответов'
+        )
+
+    @pytest.mark.django_db
+    def test_endpoint(self, settings, client):
+        response = client.get('/metrics/')
+        assert response.status_code == 200
+        assert b'yamdb_http_requests_total' in response.content
+        settings.METRICS_TOKEN = 'secret'
+        assert client.get('/metrics/').status_code == 401, (
+            'Проверьте, что с METRICS_TOKEN метрики отдаются только с токеном'
+        )
+        response = client.get(
+            '/metrics/', HTTP_AUTHORIZATION='Bearer secret'
+        )
+        assert response.status_code == 200
+        settings.METRICS = False
+        assert client.get('/metrics/').status_code == 404, (
+            'Проверьте, что без METRICS метрики не отдаются'
+        )
+
+    def test_multiprocess(self, tmp_path):
+        pids = [run(WORKER_SCRIPT, tmp_path).strip() for _ in range(2)]
+        output = run(SCRAPE_SCRIPT, tmp_path)
+        assert (
+            'yamdb_cache_lookups_total{cache="user",result="hit"} 2.0'
+            in output
+        ), 'Проверьте, что счётчики воркеров складываются'
+        for pid in pids:
+            assert f'yamdb_worker_start_time_seconds{{pid="{pid}"}}' in (
+                output
+            ), 'Проверьте, что каждый воркер виден в метриках'
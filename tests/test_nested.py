@@ -0,0 +1,91 @@
+import pytest
+from django.db import IntegrityError, connection
+from django.test.utils import CaptureQueriesContext
+
+from api.views import ReviewViewSet
+from reviews.models import Review, Title
+
+
+@pytest.mark.django_db
+class TestNestedRoutes:
+
+    @pytest.fixture
+    def review(self, title, another_user):
+        return Review.objects.create(
+            title=title, author=another_user, text='text', score=7
+        )
+
+    def test_missing_parents_return_404(self, user_client, title, review):
+        other = Title.objects.create(
+            name='Аватар', year=2009, category=title.category
+        )
+        assert user_client.get(
+            f'/api/v1/titles/{other.id + 1}/reviews/'
+        ).status_code == 404
+        assert user_client.get(
+            f'/api/v1/titles/{other.id}/reviews/'
+        ).status_code == 200, (
+            'Проверьте, что пустой список отзывов существующего произведения '
+            'не возвращает 404'
+        )
+        url = f'/api/v1/titles/{other.id}/reviews/{review.id}/comments/'
+        assert user_client.get(url).status_code == 404, (
+            'Проверьте, что комментарии доступны только по отзыву '
+            'своего произведения'
+        )
+        assert user_client.post(url, {'text': 'a'}).status_code == 404
+
+    def test_comment_parent_is_resolved_once(self, user_client, title, review):
+        url = f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(url, {'text': 'comment'})
+        assert response.status_code == 201
+        selects = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+        ]
+        assert len(selects) == 1, (
+            'Проверьте, что родители комментария находятся одним запросом'
+        )
+
+    def test_duplicate_review_is_rejected_by_constraint(
+        self, user_client, title
+    ):
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        data = {'text': 'text', 'score': 5}
+        assert user_client.post(url, data).status_code == 201
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(url, data)
+        assert response.status_code == 400
+        assert response.data == {'non_field_errors': [
+            'Можно оставить только один отзыв на проиведение.'
+        ]}
+        statements = [query['sql'] for query in context.captured_queries]
+        insert = next(
+            index for index, sql in enumerate(statements)
+            if sql.startswith('INSERT')
+        )
+        selects = [
+            sql for sql in statements[:insert] if sql.startswith('SELECT')
+        ]
+        assert len(selects) == 1, (
+            'Проверьте, что дубликат ловит ограничение unique_review, '
+            'а не отдельная проверка перед вставкой'
+        )
+        assert Review.objects.count() == 1
+        title.refresh_from_db()
+        assert title.rating == 5
+
+    @pytest.mark.django_db(transaction=True)
+    def test_other_integrity_errors_are_not_duplicates(
+        self, user_client, title, monkeypatch
+    ):
+        # Произведение удалено между загрузкой и вставкой отзыва.
+        monkeypatch.setattr(
+            ReviewViewSet, 'get_parent', lambda view: Title(pk=title.pk + 1)
+        )
+        with pytest.raises(IntegrityError):
+            user_client.post(
+                f'/api/v1/titles/{title.id}/reviews/',
+                {'text': 'text', 'score': 5},
+            )
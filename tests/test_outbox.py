@@ -0,0 +1,95 @@
+from datetime import timedelta
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.utils import timezone
+
+from users.models import OutboxEmail
+from users.outbox import enqueue_email, send_batch
+
+
+class FailingBackend(EmailBackend):
+
+    def send_messages(self, messages):
+        if any('fail' in message.to[0] for message in messages):
+            raise ConnectionError('mail server is down')
+        return super().send_messages(messages)
+
+
+class CountingBackend(EmailBackend):
+    """Как SMTP: повторный open() у открытого соединения ничего не делает."""
+    opened = 0
+    is_open = False
+
+    def open(self):
+        if self.is_open:
+            return False
+        self.is_open = True
+        CountingBackend.opened += 1
+        return True
+
+    def close(self):
+        self.is_open = False
+
+
+@pytest.mark.django_db
+class TestOutbox:
+
+    def test_signup_only_queues_email(self, client):
+        response = client.post(
+            '/api/v1/auth/signup/',
+            {'username': 'new_user', 'email': 'new@yamdb.fake'},
+        )
+        assert response.status_code == 200
+        assert mail.outbox == [], (
+            'Проверьте, что регистрация не отправляет письмо сама'
+        )
+        email = OutboxEmail.objects.get()
+        assert email.recipient == 'new@yamdb.fake'
+        assert 'new_user your confirmation_code' in email.body
+
+        call_command('send_emails')
+        assert [message.to for message in mail.outbox] == [
+            ['new@yamdb.fake']
+        ]
+        email.refresh_from_db()
+        assert email.sent is not None
+
+    def test_batches_reuse_connection(self, settings):
+        settings.EMAIL_BACKEND = 'tests.test_outbox.CountingBackend'
+        CountingBackend.opened = 0
+        for i in range(5):
+            enqueue_email('subject', 'text', f'user{i}@yamdb.fake')
+        call_command('send_emails', batch_size=2)
+        assert len(mail.outbox) == 5
+        assert CountingBackend.opened == 1, (
+            'Проверьте, что все пачки отправляются через одно соединение'
+        )
+        assert not OutboxEmail.objects.filter(sent__isnull=True).exists()
+
+    def test_failed_email_is_retried_with_backoff(self):
+        enqueue_email('subject', 'text', 'ok@yamdb.fake')
+        failing = enqueue_email('subject', 'text', 'fail@yamdb.fake')
+        connection = FailingBackend()
+
+        assert send_batch(connection=connection) == (1, 1)
+        failing.refresh_from_db()
+        assert failing.sent is None
+        assert failing.attempts == 1
+        assert 'mail server is down' in failing.last_error
+        assert failing.next_attempt > timezone.now(), (
+            'Проверьте, что неудачное письмо откладывается'
+        )
+        assert send_batch(connection=connection) == (0, 0)
+
+        OutboxEmail.objects.update(
+            next_attempt=timezone.now() - timedelta(seconds=1)
+        )
+        assert send_batch(connection=connection) == (0, 1)
+        failing.refresh_from_db()
+        assert failing.attempts == 2
+        assert send_batch(connection=connection, max_attempts=2) == (0, 0), (
+            'Проверьте, что после max_attempts письмо больше не отправляется'
+        )
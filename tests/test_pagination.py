@@ -0,0 +1,94 @@
+import json
+
+from base64 import urlsafe_b64encode
+
+import pytest
+
+from reviews.listing import rebuild_title_listing
+from reviews.models import Comment, Review, Title
+
+
+@pytest.mark.django_db
+class TestKeysetPagination:
+
+    def walk(self, client, url):
+        ids, pages = [], []
+        while url:
+            response = client.get(url)
+            assert response.status_code == 200
+            assert 'count' not in response.data, (
+                'Проверьте, что курсорная пагинация не считает COUNT(*)'
+            )
+            ids += [item['id'] for item in response.data['results']]
+            pages.append(response.data)
+            url = response.data['next']
+        return ids, pages
+
+    def test_titles_cursor_walks_all_pages(self, user_client, category):
+        Title.objects.bulk_create(
+            Title(name=f'Title {i}', year=2000, category=category)
+            for i in range(25)
+        )
+        rebuild_title_listing()
+        expected = sorted(Title.objects.values_list('id', flat=True))
+        ids, pages = self.walk(user_client, '/api/v1/titles/?cursor=')
+        assert ids == expected, (
+            'Проверьте, что курсор обходит все произведения по порядку'
+        )
+        assert len(pages) == 3
+        assert pages[0]['previous'] is None
+
+        response = user_client.get(pages[-1]['previous'])
+        assert [item['id'] for item in response.data['results']] == (
+            expected[10:20]
+        ), 'Проверьте ссылку `previous` курсорной пагинации'
+
+    def test_reviews_and_comments_cursor(self, user, user_client, title,
+                                         django_user_model):
+        django_user_model.objects.bulk_create(
+            django_user_model(username=f'u{i}', email=f'u{i}@yamdb.fake')
+            for i in range(12)
+        )
+        authors = django_user_model.objects.filter(username__startswith='u')
+        Review.objects.bulk_create(
+            Review(title=title, author=author, text='t', score=5)
+            for author in authors
+        )
+        url = f'/api/v1/titles/{title.id}/reviews/?cursor='
+        ids, _ = self.walk(user_client, url)
+        assert ids == sorted(
+            Review.objects.filter(title=title).values_list('id', flat=True)
+        )
+
+        review = Review.objects.first()
+        Comment.objects.bulk_create(
+            Comment(review_id=review, author=user, text=str(i))
+            for i in range(11)
+        )
+        url = (
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/?cursor='
+        )
+        ids, pages = self.walk(user_client, url)
+        assert len(ids) == 11 and len(pages) == 2
+
+    def test_page_number_is_default(self, user_client, title):
+        response = user_client.get('/api/v1/titles/')
+        assert response.data['count'] == 1, (
+            'Проверьте, что без `cursor` используется постраничная пагинация'
+        )
+
+    def test_invalid_cursor(self, user_client, title):
+        response = user_client.get('/api/v1/titles/?cursor=garbage')
+        assert response.status_code == 404
+
+    @pytest.mark.parametrize('value', ['abc', {}, None, [1], '2021-13-45'])
+    def test_tampered_cursor(self, user_client, title, value):
+        for url in ('/api/v1/titles/', f'/api/v1/titles/{title.id}/reviews/'):
+            for length in range(1, 4):
+                cursor = urlsafe_b64encode(json.dumps(
+                    {'p': [value] * length, 'r': 0}
+                ).encode()).decode()
+                response = user_client.get(f'{url}?cursor={cursor}')
+                assert response.status_code == 404, (
+                    'Проверьте, что подделанный курсор приводит к ответу 404'
+                )
@@ -0,0 +1,64 @@
+import pytest
+
+from api.mixins import get_eager_loading_plan
+from api.serializers import (
+    CommentSerializer, ReviewSerializer, TitleGETSerializer, TitleSerializer,
+)
+from reviews.models import Comment, Genre, Review, Title
+
+
+@pytest.mark.django_db
+class TestListQueries:
+
+    @pytest.fixture
+    def catalog(self, category, genre, django_user_model):
+        other_genre = Genre.objects.create(name='Комедия', slug='comedy')
+        users = [
+            django_user_model.objects.create(
+                username=f'u{i}', email=f'u{i}@yamdb.fake'
+            )
+            for i in range(10)
+        ]
+        titles = []
+        for i in range(10):
+            title = Title.objects.create(
+                name=f'Title {i}', year=2000, category=category
+            )
+            title.genre.add(genre, other_genre)
+            titles.append(title)
+        Review.objects.bulk_create(
+            Review(title=titles[0], author=user, text='t', score=5)
+            for user in users
+        )
+        review = Review.objects.filter(title=titles[0]).first()
+        Comment.objects.bulk_create(
+            Comment(review_id=review, author=user, text='t') for user in users
+        )
+        return titles[0], review
+
+    def test_plan_follows_serializer_fields(self):
+        assert get_eager_loading_plan(TitleGETSerializer) == (
+            ('category',), ('genre',)
+        )
+        assert get_eager_loading_plan(TitleSerializer) == (
+            ('category',), ('genre',)
+        )
+        assert get_eager_loading_plan(ReviewSerializer) == (('author',), ())
+        assert get_eager_loading_plan(CommentSerializer) == (('author',), ())
+
+    @pytest.mark.parametrize('url, queries', [
+        ('/api/v1/titles/', 2),
+        ('/api/v1/titles/{title}/', 2),
+        ('/api/v1/titles/{title}/reviews/', 2),
+        ('/api/v1/titles/{title}/reviews/{review}/', 1),
+        ('/api/v1/titles/{title}/reviews/{review}/comments/', 2),
+    ])
+    def test_query_count_does_not_depend_on_page(
+        self, url, queries, catalog, user_client,
+        django_assert_num_queries
+    ):
+        title, review = catalog
+        url = url.format(title=title.id, review=review.id)
+        with django_assert_num_queries(queries):
+            response = user_client.get(url)
+        assert response.status_code == 200
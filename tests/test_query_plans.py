@@ -0,0 +1,115 @@
+import re
+
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Comment, Genre, Review, Title
+
+SIZES = {
+    'users': 200, 'categories': 10, 'genres': 20, 'titles': 500,
+    'reviews': 5000, 'comments': 10000,
+}
+# Полный проход таблицы без индекса: `SCAN TABLE t` в SQLite до 3.36,
+# `SCAN t` после и `Seq Scan` в PostgreSQL.
+SQLITE_FULL_SCAN = re.compile(r'^SCAN (TABLE )?\w+( AS \w+)?$')
+
+
+@pytest.fixture
+def dataset():
+    cache.clear()
+    call_command('generate_data', stdout=StringIO(), seed=1, **SIZES)
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            # На маленьких таблицах PostgreSQL выбирает Seq Scan и при
+            # подходящем индексе: запрещаем его, чтобы Seq Scan в плане
+            # означал, что индекса нет.
+            cursor.execute('ANALYZE')
+            cursor.execute('SET enable_seqscan = off')
+        else:
+            cursor.execute('ANALYZE')
+    yield
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SET enable_seqscan = on')
+    cache.clear()
+
+
+def full_scans(sql):
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(f'EXPLAIN {sql}')
+            return [
+                row[0] for row in cursor.fetchall() if 'Seq Scan' in row[0]
+            ]
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return [
+            row[-1] for row in cursor.fetchall()
+            if SQLITE_FULL_SCAN.match(row[-1])
+        ]
+
+
+def assert_indexed(run):
+    with CaptureQueriesContext(connection) as context:
+        run()
+    selects = [
+        query['sql'] for query in context.captured_queries
+        if query['sql'].startswith('SELECT')
+    ]
+    assert selects
+    for sql in selects:
+        assert not full_scans(sql), (
+            f'Проверьте, что запрос читает таблицы по индексу: {sql}'
+        )
+
+
+def get_ok(client, url):
+    response = client.get(url)
+    assert response.status_code == 200, response.content
+    return response
+
+
+@pytest.mark.django_db
+class TestQueryPlans:
+
+    def test_reviews(self, client, dataset):
+        review = Review.objects.order_by('title', 'id').last()
+        url = f'/api/v1/titles/{review.title_id}/reviews/'
+        assert_indexed(lambda: get_ok(client, url))
+        assert_indexed(lambda: get_ok(client, f'{url}{review.id}/'))
+
+    def test_comments(self, client, dataset):
+        comment = Comment.objects.order_by('review_id', 'id').last()
+        review = comment.review_id
+        url = f'/api/v1/titles/{review.title_id}/reviews/{review.id}/comments/'
+        assert_indexed(lambda: get_ok(client, url))
+
+    def test_title_filters(self, client, dataset):
+        category = Category.objects.order_by('id').first()
+        genre = Genre.objects.order_by('id').first()
+        for params in (
+            f'category={category.slug}',
+            f'category={category.slug}&year=2000',
+            f'genre={genre.slug}',
+        ):
+            assert_indexed(
+                lambda: get_ok(client, f'/api/v1/titles/?{params}')
+            )
+
+    def test_author_activity(self, dataset):
+        author = get_user_model().objects.order_by('id').first()
+        category = Category.objects.order_by('id').first()
+        assert_indexed(lambda: list(
+            Review.objects.filter(author=author).order_by('-pub_date')[:10]
+        ))
+        assert_indexed(lambda: list(
+            Comment.objects.filter(author=author).order_by('-pub_date')[:10]
+        ))
+        assert_indexed(lambda: list(
+            Title.objects.filter(category=category, year=2000)
+        ))
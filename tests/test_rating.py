@@ -0,0 +1,128 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Review, Title, TitleScores
+
+
+@pytest.mark.django_db
+class TestTitleRating:
+
+    def reviews_url(self, title):
+        return f'/api/v1/titles/{title.id}/reviews/'
+
+    def test_rating_follows_reviews(self, user_client, another_user_client,
+                                    admin_client, title):
+        user_client.post(self.reviews_url(title), {'text': 'a', 'score': 4})
+        response = another_user_client.post(
+            self.reviews_url(title), {'text': 'b', 'score': 9}
+        )
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (13, 2), (
+            'Проверьте, что создание отзыва обновляет сумму и число оценок'
+        )
+        assert title.rating == 6.5
+
+        review_url = f'{self.reviews_url(title)}{response.data["id"]}/'
+        another_user_client.patch(review_url, {'score': 1})
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (5, 2), (
+            'Проверьте, что изменение оценки обновляет рейтинг'
+        )
+
+        admin_client.delete(review_url)
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (4, 1), (
+            'Проверьте, что удаление отзыва обновляет рейтинг'
+        )
+
+        response = admin_client.get(f'/api/v1/titles/{title.id}/')
+        assert response.data['rating'] == 4, (
+            'Проверьте, что `rating` берётся из сохранённого значения'
+        )
+
+    def test_rating_empty_after_last_review_deleted(self, user, title):
+        review = Review.objects.create(
+            title=title, author=user, text='a', score=7
+        )
+        Review.objects.filter(pk=review.pk).delete()
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (0, 0)
+        assert title.rating is None, (
+            'Проверьте, что без отзывов рейтинг равен `None`'
+        )
+
+    def test_title_delete_skips_rating_updates(self, django_user_model):
+        title = Title.objects.create(name='Титаник', year=1997)
+        authors = [
+            django_user_model.objects.create(
+                username=f'author{number}', email=f'author{number}@yamdb.fake'
+            )
+            for number in range(20)
+        ]
+        for author in authors:
+            Review.objects.create(
+                title=title, author=author, text='a', score=5
+            )
+        with CaptureQueriesContext(connection) as context:
+            title.delete()
+        assert len(context.captured_queries) <= 7, (
+            'Проверьте, что число запросов при удалении произведения не '
+            'зависит от числа его отзывов'
+        )
+        updates = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('UPDATE')
+        ]
+        assert updates == [], (
+            'Проверьте, что при удалении произведения рейтинг и гистограмма '
+            'оценок не пересчитываются для каждого удаляемого отзыва'
+        )
+        review = Review.objects.create(
+            title=Title.objects.create(name='Аватар', year=2009),
+            author=authors[0], text='a', score=5,
+        )
+        review.delete()
+        assert Title.objects.get(pk=review.title_id).rating_count == 0, (
+            'Проверьте, что удаление отдельного отзыва обновляет рейтинг'
+        )
+        assert TitleScores.objects.get(pk=review.title_id).count == 0
+
+    def test_recalculate_ratings_repairs_drift(self, user, another_user,
+                                               title):
+        Review.objects.bulk_create([
+            Review(title=title, author=user, text='a', score=3),
+            Review(title=title, author=another_user, text='b', score=8),
+        ])
+        call_command('recalculate_ratings')
+        title = Title.objects.get(pk=title.pk)
+        assert (title.rating_sum, title.rating_count) == (11, 2), (
+            'Проверьте, что команда `recalculate_ratings` исправляет рейтинг'
+        )
+        assert title.rating == 5.5
+
+
+@pytest.mark.django_db(databases=[DEFAULT_DB_ALIAS, 'replica'])
+def test_rating_follows_review_database():
+    author = get_user_model().objects.db_manager('replica').create(
+        username='replica', email='replica@yamdb.fake'
+    )
+    title = Title.objects.using('replica').create(name='Реплика', year=2000)
+    review = Review.objects.using('replica').create(
+        title=title, author=author, text='a', score=6
+    )
+    review.score = 8
+    review.save(using='replica')
+    title = Title.objects.using('replica').get(pk=title.pk)
+    assert (title.rating_sum, title.rating_count) == (8, 1), (
+        'Проверьте, что рейтинг обновляется в базе, где сохранён отзыв'
+    )
+    scores = TitleScores.objects.using('replica').get(pk=title.pk)
+    assert scores.histogram[8] == 1 and scores.count == 1, (
+        'Проверьте, что гистограмма оценок обновляется в базе отзыва'
+    )
+    review.delete()
+    title = Title.objects.using('replica').get(pk=title.pk)
+    assert (title.rating_sum, title.rating_count) == (0, 0)
@@ -0,0 +1,80 @@
+import datetime
+import decimal
+import uuid
+
+from io import BytesIO
+
+import pytest
+from rest_framework.exceptions import ErrorDetail, ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from api.parsers import FastJSONParser
+from api.renderers import FastJSONRenderer, orjson
+
+BACKENDS = ['json'] + (['orjson'] if orjson is not None else [])
+
+DATA = {
+    'count': 2,
+    'next': 'http://testserver/api/v1/titles/?page=2',
+    'results': [
+        {
+            'id': 1, 'name': 'Титаник «1997»', 'year': 1997,
+            'rating': 7.5, 'description': None, 'big': 2 ** 70,
+            'genre': [{'name': 'Драма', 'slug': 'drama'}],
+            'separators': 'a b c', 'quote': '"\\/\t',
+            'pub_date': datetime.datetime(
+                2021, 1, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc
+            ),
+            'date': datetime.date(2021, 1, 1),
+            'decimal': decimal.Decimal('1.5'), 'uuid': uuid.UUID(int=1),
+            'error': ErrorDetail('Обязательное поле.', code='required'),
+            1: (True, False),
+        },
+    ],
+}
+
+
+def backend_class(base, backend):
+    return type(base.__name__, (base,), {'backend': backend})
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+class TestFastJSONRenderer:
+
+    def test_output_is_identical(self, backend):
+        renderer = backend_class(FastJSONRenderer, backend)()
+        assert renderer.render(DATA) == JSONRenderer().render(DATA), (
+            'Проверьте, что вывод совпадает с JSONRenderer байт в байт'
+        )
+        assert renderer.render(None) == b''
+        for media_type in ('application/json; indent=2', None):
+            context = {} if media_type else {'indent': 4}
+            assert renderer.render(
+                DATA, media_type, context
+            ) == JSONRenderer().render(DATA, media_type, context)
+
+    def test_parser_is_identical(self, backend):
+        parser = backend_class(FastJSONParser, backend)()
+        body = JSONRenderer().render(DATA)
+        assert parser.parse(BytesIO(body)) == JSONParser().parse(
+            BytesIO(body)
+        )
+        for body in (b'{"a": NaN}', b'{"a":', b'\xff'):
+            with pytest.raises(ParseError):
+                parser.parse(BytesIO(body))
+        body = '{"name": "Титаник"}'.encode('cp1251')
+        assert parser.parse(
+            BytesIO(body), parser_context={'encoding': 'cp1251'}
+        ) == {'name': 'Титаник'}
+
+
+@pytest.mark.django_db
+class TestRendererSettings:
+
+    def test_api_uses_fast_renderer(self, client, title):
+        response = client.get(f'/api/v1/titles/{title.id}/')
+        assert isinstance(
+            response.accepted_renderer, FastJSONRenderer
+        ), 'Проверьте, что FastJSONRenderer подключён в REST_FRAMEWORK'
+        assert response.content == JSONRenderer().render(response.data)
@@ -0,0 +1,116 @@
+import pytest
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS, router
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.authentication import user_cache
+from api.routers import pin_primary, use_replicas
+from reviews.models import Category
+
+DATABASES = [DEFAULT_DB_ALIAS, 'replica']
+
+
+@pytest.fixture(autouse=True)
+def replicas(settings, tmp_path):
+    settings.DATABASE_REPLICAS = ['replica']
+    # Привязку к основной базе нужно хранить в общем для процессов кэше.
+    settings.CACHES = {'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': str(tmp_path),
+    }}
+    cache.clear()
+    user_cache.clear()
+    yield
+    cache.clear()
+    user_cache.clear()
+
+
+def token_client(user):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}'
+    )
+    return client
+
+
+def category_slugs(client):
+    response = client.get('/api/v1/categories/')
+    assert response.status_code == 200, response.data
+    return {item['slug'] for item in response.data['results']}
+
+
+class TestReplicaRouter:
+
+    def test_routing(self):
+        assert router.db_for_read(Category) == DEFAULT_DB_ALIAS, (
+            'Проверьте, что вне запросов чтения идут в основную базу'
+        )
+        with use_replicas():
+            assert router.db_for_read(Category) == 'replica'
+            primary, replicated = Category(), Category()
+            primary._state.db = DEFAULT_DB_ALIAS
+            replicated._state.db = 'replica'
+            assert router.db_for_write(
+                Category, instance=replicated
+            ) == DEFAULT_DB_ALIAS, (
+                'Проверьте, что объекты с реплики сохраняются в основную базу'
+            )
+            with pin_primary():
+                assert router.db_for_read(Category) == DEFAULT_DB_ALIAS
+            assert router.db_for_read(Category) == 'replica'
+            assert router.allow_relation(primary, replicated)
+
+    def test_no_replicas(self, settings):
+        settings.DATABASE_REPLICAS = []
+        with use_replicas():
+            assert router.db_for_read(Category) == DEFAULT_DB_ALIAS
+
+
+@pytest.mark.django_db(databases=DATABASES)
+class TestReplicaRouting:
+
+    def test_reads_go_to_replica(self, user, category):
+        Category.objects.using('replica').create(
+            name='Реплика', slug='replica'
+        )
+        assert category_slugs(token_client(user)) == {'replica'}, (
+            'Проверьте, что безопасные запросы к API читают с реплики'
+        )
+        assert category_slugs(APIClient()) == {'film'}, (
+            'Проверьте, что общий кэш ответов заполняется из основной базы'
+        )
+
+    def test_process_local_cache_is_rejected(self, settings):
+        settings.CACHES = {'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }}
+        with pytest.raises(ImproperlyConfigured):
+            APIClient().get('/api/v1/categories/')
+
+    def test_sticky_after_write(self, admin, user, monkeypatch):
+        admin_client = token_client(admin)
+        response = admin_client.post(
+            '/api/v1/categories/', {'name': 'Кино', 'slug': 'cinema'}
+        )
+        assert response.status_code == 201, (
+            'Проверьте, что пользователь, которого ещё нет на реплике, '
+            'находится в основной базе'
+        )
+        assert category_slugs(admin_client) == {'cinema'}, (
+            'Проверьте, что после записи клиент читает из основной базы'
+        )
+        assert category_slugs(token_client(user)) == set(), (
+            'Проверьте, что остальные клиенты читают с реплики'
+        )
+        cache.clear()
+        assert category_slugs(admin_client) == set(), (
+            'Проверьте, что привязка к основной базе ограничена по времени'
+        )
+
+        monkeypatch.setattr('api.middleware.STICKY_SECONDS', 0)
+        admin_client.post(
+            '/api/v1/categories/', {'name': 'Книги', 'slug': 'books'}
+        )
+        assert category_slugs(admin_client) == set()
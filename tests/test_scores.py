@@ -0,0 +1,95 @@
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Review, Title, TitleScores
+
+
+def stats(client, title):
+    response = client.get(f'/api/v1/titles/{title.id}/stats/')
+    assert response.status_code == 200, response.data
+    return response.json()
+
+
+def histogram(**counts):
+    return {str(score): counts.get(f's{score}', 0) for score in range(1, 11)}
+
+
+@pytest.mark.django_db
+class TestTitleScores:
+
+    def reviews_url(self, title):
+        return f'/api/v1/titles/{title.id}/reviews/'
+
+    def test_stats_follow_reviews(self, client, user_client,
+                                  another_user_client, admin_client, title):
+        assert stats(client, title) == {
+            'title': title.id, 'count': 0, 'mean': None, 'median': None,
+            'histogram': histogram(),
+        }, 'Проверьте, что у произведения без отзывов пустая статистика'
+
+        user_client.post(self.reviews_url(title), {'text': 'a', 'score': 4})
+        response = another_user_client.post(
+            self.reviews_url(title), {'text': 'b', 'score': 9}
+        )
+        data = stats(client, title)
+        assert data['histogram'] == histogram(s4=1, s9=1), (
+            'Проверьте, что создание отзыва обновляет гистограмму'
+        )
+        assert (data['count'], data['mean'], data['median']) == (2, 6.5, 6.5)
+
+        review_url = f'{self.reviews_url(title)}{response.data["id"]}/'
+        another_user_client.patch(review_url, {'score': 1})
+        assert stats(client, title)['histogram'] == histogram(s1=1, s4=1), (
+            'Проверьте, что изменение оценки переносит её в гистограмме'
+        )
+
+        admin_client.delete(review_url)
+        data = stats(client, title)
+        assert data['histogram'] == histogram(s4=1), (
+            'Проверьте, что удаление отзыва обновляет гистограмму'
+        )
+        assert (data['count'], data['mean'], data['median']) == (1, 4, 4)
+
+    def test_single_lookup(self, client, title, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            stats(client, title)
+
+    def test_median(self, title):
+        scores = TitleScores(title=title, score_2=1, score_7=2, score_10=1)
+        assert scores.median == 7
+        scores.score_1 = 1
+        assert scores.median == 7
+        scores.score_1 = 2
+        assert scores.median == 4.5, (
+            'Проверьте, что при чётном количестве медиана — среднее двух'
+        )
+
+    def test_move_and_delete(self, user, title):
+        other = Title.objects.create(name='Другое', year=2000)
+        review = Review.objects.create(
+            title=title, author=user, text='a', score=5
+        )
+        review = Review.objects.get(pk=review.pk)
+        review.title = other
+        review.save()
+        assert TitleScores.objects.get(pk=title.pk).count == 0
+        assert TitleScores.objects.get(pk=other.pk).histogram[5] == 1, (
+            'Проверьте, что перенос отзыва переносит оценку'
+        )
+        other.delete()
+        assert not TitleScores.objects.filter(pk=other.pk).exists()
+
+    def test_unknown_title(self, client):
+        assert client.get('/api/v1/titles/0/stats/').status_code == 404
+        assert client.get('/api/v1/titles/x/stats/').status_code == 404
+
+    def test_rebuild(self, user, another_user, title):
+        Review.objects.bulk_create([
+            Review(title=title, author=user, text='a', score=3),
+            Review(title=title, author=another_user, text='b', score=3),
+        ])
+        assert TitleScores.objects.get(pk=title.pk).count == 0
+        call_command('recalculate_ratings')
+        assert TitleScores.objects.get(pk=title.pk).histogram[3] == 2, (
+            'Проверьте, что `recalculate_ratings` пересобирает гистограммы'
+        )
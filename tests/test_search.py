@@ -0,0 +1,86 @@
+import pytest
+from django.db import connection
+
+from reviews.models import Title
+from reviews.search import FTS_TABLE, has_search_index, search_titles
+
+
+@pytest.mark.django_db
+class TestTitleSearch:
+
+    @pytest.fixture
+    def titles(self, category):
+        return [
+            Title.objects.create(
+                name='Война и мир', year=1869, category=category,
+                description='Роман-эпопея о войне 1812 года'
+            ),
+            Title.objects.create(
+                name='Мир Дикого Запада', year=2016, category=category,
+                description='Сериал о парке развлечений'
+            ),
+            Title.objects.create(
+                name='Титаник', year=1997, category=category,
+                description='Фильм о войне человека со стихией'
+            ),
+        ]
+
+    def search(self, client, query):
+        response = client.get('/api/v1/titles/', {'search': query})
+        assert response.status_code == 200
+        return [item['name'] for item in response.data['results']]
+
+    def test_search_uses_fts_index(self):
+        assert has_search_index(connection), (
+            'Проверьте, что миграции создают индекс полнотекстового поиска'
+        )
+        sql = str(search_titles(Title.objects.all(), 'мир').query)
+        assert FTS_TABLE in sql and 'LIKE' not in sql.upper()
+
+    def test_search_by_word_prefixes(self, user_client, titles):
+        assert set(self.search(user_client, 'мир')) == {
+            'Война и мир', 'Мир Дикого Запада'
+        }, 'Проверьте, что поиск находит слово в любом месте названия'
+        assert self.search(user_client, 'войн мир') == ['Война и мир'], (
+            'Проверьте, что слова запроса ищутся по префиксу и все сразу'
+        )
+        assert self.search(user_client, 'ТИТАН') == ['Титаник']
+        assert self.search(user_client, '"*:') == [
+            'Война и мир', 'Мир Дикого Запада', 'Титаник'
+        ], 'Проверьте, что запрос без слов не фильтрует произведения'
+
+    def test_search_is_ranked(self, user_client, titles):
+        assert self.search(user_client, 'войн')[0] == 'Война и мир', (
+            'Проверьте, что результаты упорядочены по релевантности'
+        )
+
+    def test_index_follows_changes(self, user_client, titles):
+        war, _, titanic = titles
+        titanic.name = 'Аватар'
+        titanic.save()
+        war.delete()
+        assert self.search(user_client, 'аватар') == ['Аватар']
+        assert self.search(user_client, 'титаник') == []
+        assert self.search(user_client, 'войн') == ['Аватар']
+
+    def test_name_filter(self, user_client, titles):
+        def names(value):
+            response = user_client.get('/api/v1/titles/', {'name': value})
+            return [item['name'] for item in response.data['results']]
+
+        assert names('Запад') == ['Мир Дикого Запада']
+        assert names('итани') == ['Титаник'], (
+            'Проверьте, что фильтр `name` ищет подстроку в названии'
+        )
+        assert names('стихией') == [], (
+            'Проверьте, что фильтр `name` не ищет по описанию'
+        )
+
+    def test_search_with_cursor_pagination(self, user_client, titles):
+        url = '/api/v1/titles/?search=войн&cursor='
+        names = []
+        while url:
+            response = user_client.get(url)
+            names += [item['name'] for item in response.data['results']]
+            url = response.data['next']
+        assert set(names) == {'Война и мир', 'Титаник'}
@@ -0,0 +1,127 @@
+import pytest
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+from api.throttling import SignupIPThrottle, SlidingWindowThrottle
+
+SIGNUP_URL = '/api/v1/auth/signup/'
+TOKEN_URL = '/api/v1/auth/token/'
+
+
+@pytest.fixture(autouse=True)
+def rates(settings):
+    settings.REST_FRAMEWORK = {
+        **settings.REST_FRAMEWORK,
+        'DEFAULT_THROTTLE_RATES': {
+            'signup_ip': '5/min', 'signup_username': '2/min',
+            'token_ip': '5/min', 'token_username': '2/min',
+        },
+    }
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [6000.0]
+    monkeypatch.setattr(SlidingWindowThrottle, 'timer', lambda self: now[0])
+    return now
+
+
+def signup(client, username, ip='10.0.0.1'):
+    return client.post(
+        SIGNUP_URL, {'username': username, 'email': f'{username}@yamdb.fake'},
+        REMOTE_ADDR=ip,
+    )
+
+
+@pytest.mark.django_db
+class TestAuthThrottling:
+
+    def test_username_limit(self, client, clock, django_assert_num_queries):
+        for ip in ('10.0.0.1', '10.0.0.2'):
+            response = client.post(
+                TOKEN_URL, {'username': 'victim', 'confirmation_code': 'x'},
+                REMOTE_ADDR=ip,
+            )
+            assert response.status_code == 404
+        with django_assert_num_queries(0):
+            response = client.post(
+                TOKEN_URL, {'username': 'victim', 'confirmation_code': 'x'},
+                REMOTE_ADDR='10.0.0.3',
+            )
+        assert response.status_code == 429, (
+            'Проверьте, что подбор кода для одного username ограничен '
+            'с любых адресов'
+        )
+        assert int(response['Retry-After']) >= 1, (
+            'Проверьте, что в ответе 429 есть заголовок Retry-After'
+        )
+        response = client.post(
+            TOKEN_URL, {'username': 'other', 'confirmation_code': 'x'},
+            REMOTE_ADDR='10.0.0.3',
+        )
+        assert response.status_code == 404
+
+    def test_username_is_normalized(self, client, clock):
+        for username in ('victim', ' victim'):
+            response = client.post(
+                TOKEN_URL, {'username': username, 'confirmation_code': 'x'},
+                REMOTE_ADDR='10.0.0.1',
+            )
+            assert response.status_code == 404
+        for username in ('  victim', 'victim\t', ' victim '):
+            response = client.post(
+                TOKEN_URL, {'username': username, 'confirmation_code': 'x'},
+                REMOTE_ADDR='10.0.0.2',
+            )
+            assert response.status_code == 429, (
+                'Проверьте, что пробелы вокруг username не дают новый '
+                'счётчик запросов'
+            )
+
+    def test_ip_limit(self, client, clock):
+        for number in range(5):
+            assert signup(client, f'user{number}').status_code == 200
+        with_token = APIClient()
+        with_token.credentials(HTTP_AUTHORIZATION='Bearer invalid')
+        response = signup(with_token, 'user5')
+        assert response.status_code == 429, (
+            'Проверьте, что регистрация ограничена по адресу клиента'
+        )
+        assert signup(client, 'user5', ip='10.0.0.2').status_code == 200
+
+    def test_sliding_window(self, client, clock):
+        for number in range(5):
+            signup(client, f'user{number}')
+        response = signup(client, 'late')
+        assert response.status_code == 429
+        # В следующем окне вклад прошлого убывает постепенно.
+        clock[0] += 60
+        assert signup(client, 'late').status_code == 429, (
+            'Проверьте, что окно скользящее, а не сбрасывается целиком'
+        )
+        clock[0] += int(response['Retry-After'])
+        assert signup(client, 'late').status_code == 200, (
+            'Проверьте, что после Retry-After запрос проходит'
+        )
+
+    def test_retry_after(self, rf, clock):
+        throttle = SignupIPThrottle()
+        request = rf.post(SIGNUP_URL, REMOTE_ADDR='10.0.0.9')
+        for _ in range(5):
+            assert throttle.allow_request(request, None)
+        assert not throttle.allow_request(request, None)
+        # До конца окна 60 секунд, и ещё 20, пока вклад шести
+        # запросов прошлого окна не опустится до четырёх.
+        assert throttle.wait() == 80, (
+            'Проверьте, что Retry-After учитывает убывание прошлого окна'
+        )
+
+    def test_disabled(self, client, settings, clock):
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {},
+        }
+        for number in range(10):
+            assert signup(client, f'user{number}').status_code == 200
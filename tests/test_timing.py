@@ -0,0 +1,121 @@
+import logging
+
+import pytest
+from django.core.cache import cache
+
+from api.serializers import CategorySerializer
+from api.timing import (
+    RequestTimings, _untimed, collect, time_serializer, timed,
+)
+
+
+@pytest.fixture(autouse=True)
+def server_timing(settings):
+    settings.SERVER_TIMING = True
+    settings.SLOW_REQUEST_MS = 10 ** 6
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def metrics(header):
+    return {item.split(';')[0]: item for item in header.split(', ')}
+
+
+class TestServerTiming:
+
+    @pytest.mark.django_db
+    def test_header_for_staff(self, admin_client, title):
+        response = admin_client.get('/api/v1/titles/')
+        assert response.status_code == 200
+        assert 'Server-Timing' in response, (
+            'Проверьте, что администратору отдаётся заголовок Server-Timing'
+        )
+        header = metrics(response['Server-Timing'])
+        for name in ('db', 'serialize', 'render', 'total'):
+            assert name in header, (
+                f'Проверьте, что в Server-Timing есть этап `{name}`'
+            )
+        assert 'queries"' in header['db']
+
+    @pytest.mark.django_db
+    def test_write_is_timed(self, admin_client):
+        response = admin_client.post(
+            '/api/v1/categories/', data={'name': 'Фильм', 'slug': 'film'}
+        )
+        assert response.status_code == 201
+        header = metrics(response['Server-Timing'])
+        for name in ('validate', 'serialize'):
+            assert name in header, (
+                f'Проверьте, что в Server-Timing есть этап `{name}` '
+                'для записи'
+            )
+
+    @pytest.mark.django_db
+    def test_no_header_for_users(self, user_client, title):
+        response = user_client.get('/api/v1/titles/')
+        assert response.status_code == 200
+        assert 'Server-Timing' not in response, (
+            'Проверьте, что Server-Timing не отдаётся обычным пользователям'
+        )
+
+    @pytest.mark.django_db
+    def test_slow_request_log(self, settings, caplog, user_client, title):
+        settings.SLOW_REQUEST_MS = 0
+        with caplog.at_level(logging.WARNING, logger='api.slow_requests'):
+            response = user_client.get('/api/v1/titles/')
+        assert response.status_code == 200
+        records = [
+            record for record in caplog.records
+            if record.name == 'api.slow_requests'
+        ]
+        assert len(records) == 1, (
+            'Проверьте, что медленный запрос пишется в журнал'
+        )
+        message = records[0].getMessage()
+        assert message.startswith('GET /api/v1/titles/ 200 ')
+        assert 'SELECT' in message, (
+            'Проверьте, что в журнал пишутся самые долгие SQL-запросы'
+        )
+
+    @pytest.mark.django_db
+    def test_disabled(self, settings, caplog, admin_client, title):
+        settings.SERVER_TIMING = False
+        settings.SLOW_REQUEST_MS = 0
+        response = admin_client.get('/api/v1/titles/')
+        assert response.status_code == 200
+        assert 'Server-Timing' not in response, (
+            'Проверьте, что без SERVER_TIMING замеры отключены'
+        )
+        assert not [
+            record for record in caplog.records
+            if record.name == 'api.slow_requests'
+        ]
+        assert timed('render') is _untimed
+
+
+class TestRequestTimings:
+
+    def test_measure(self):
+        timings = RequestTimings(top_statements=2)
+        with collect(timings):
+            with timed('serialize'):
+                with timed('serialize'):
+                    pass
+            for sql in ('SELECT 1', 'SELECT 2', 'SELECT 3'):
+                timings(lambda *args: None, sql, (), False, {})
+        assert timed('serialize') is _untimed
+        assert timings.queries == 3
+        assert len(timings.slowest()) == 2, (
+            'Проверьте, что хранятся только самые долгие запросы'
+        )
+        header = metrics(timings.header(0.1))
+        assert list(header) == ['db', 'serialize', 'total']
+        assert header['total'] == 'total;dur=100.0'
+
+    def test_serializer_untouched_outside_collect(self):
+        serializer = CategorySerializer()
+        assert time_serializer(serializer) is serializer
+        assert 'to_representation' not in vars(serializer), (
+            'Проверьте, что без замеров сериализатор не меняется'
+        )
@@ -0,0 +1,92 @@
+import pytest
+from django.core.cache import cache
+
+from api import trigram
+from api.trigram import TrigramIndex, get_trigrams, similarity
+from reviews.models import Genre
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+class TestTrigramIndex:
+
+    def test_trigrams_match_pg_trgm(self):
+        assert get_trigrams('Cat') == {'  c', ' ca', 'cat', 'at '}
+        assert similarity(get_trigrams('dramma'), get_trigrams('drama')) > 0.6
+
+    def test_search_tolerates_typos(self):
+        index = TrigramIndex([
+            (1, 'Драма', 'drama'),
+            (2, 'Комедия', 'comedy'),
+            (3, 'Мелодрама', 'melodrama'),
+        ])
+        found = [pk for pk, _ in index.search('dramma')]
+        assert found[0] == 1, (
+            'Проверьте, что поиск находит слово с опечаткой'
+        )
+        assert 2 not in found
+        assert 3 in [pk for pk, _ in index.search('драм')], (
+            'Проверьте, что подстрока тоже находится'
+        )
+
+
+@pytest.mark.django_db
+class TestFuzzyEndpoints:
+
+    def test_genres_and_categories(self, user_client, genre, category):
+        Genre.objects.create(name='Комедия', slug='comedy')
+        response = user_client.get('/api/v1/genres/', {'search': 'dramma'})
+        assert [item['slug'] for item in response.data['results']] == [
+            'drama'
+        ]
+        response = user_client.get('/api/v1/categories/', {'search': 'филм'})
+        assert [item['slug'] for item in response.data['results']] == [
+            'film'
+        ]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_index_follows_changes(self, user_client, genre):
+        user_client.get('/api/v1/genres/', {'search': 'horor'})
+        Genre.objects.create(name='Ужасы', slug='horror')
+        response = user_client.get('/api/v1/genres/', {'search': 'horor'})
+        assert [item['slug'] for item in response.data['results']] == [
+            'horror'
+        ], 'Проверьте, что индекс перестраивается после изменений'
+
+    def test_results_are_capped(self, user_client, genre, monkeypatch):
+        monkeypatch.setattr(trigram, 'MAX_RESULTS', 3)
+        Genre.objects.bulk_create([
+            Genre(name=f'Драма {number}', slug=f'drama-{number}')
+            for number in range(10)
+        ])
+        response = user_client.get('/api/v1/genres/', {'search': 'драма'})
+        assert response.data['count'] == 3, (
+            'Проверьте, что без PostgreSQL выдача ограничена '
+            '`TRIGRAM_MAX_RESULTS` самыми похожими строками'
+        )
+
+    def test_index_expires(self, user_client, genre, monkeypatch):
+        user_client.get('/api/v1/genres/', {'search': 'horor'})
+        # bulk_create не меняет версию: так ведёт себя воркер, который не
+        # видит смену версии в чужом кэше.
+        Genre.objects.bulk_create([Genre(name='Ужасы', slug='horror')])
+        monkeypatch.setattr(trigram, 'INDEX_TIMEOUT', 0)
+        response = user_client.get('/api/v1/genres/', {'search': 'horor'})
+        assert [item['slug'] for item in response.data['results']] == [
+            'horror'
+        ], 'Проверьте, что индекс перестраивается по истечении времени'
+
+    def test_users_search(self, admin_client, user, another_user):
+        response = admin_client.get('/api/v1/users/', {'search': 'TestUsr'})
+        assert {item['username'] for item in response.data['results']} == {
+            'TestUser', 'TestUserAnother'
+        }
+        response = admin_client.get(
+            '/api/v1/users/', {'search': 'TestUserAnothr'}
+        )
+        assert response.data['results'][0]['username'] == 'TestUserAnother'